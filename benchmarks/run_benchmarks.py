@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Benchmarks del explorador sobre árboles sintéticos reproducibles
+
+Mide sin interfaz gráfica la misma lógica que usan refresh_view
+(FileLister.list_directory), search_files (FileLister.search),
+paste_file (TransferEngine.paste) y delete_file (TrashManager /
+TreeRemover). Cada escenario corre en un proceso hijo para medir su
+pico de memoria por separado.
+
+Uso:
+    python3 benchmarks/run_benchmarks.py --output resultados.json
+    python3 benchmarks/run_benchmarks.py --save-baseline base.json
+    python3 benchmarks/run_benchmarks.py --baseline base.json --threshold 0.2
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from file_explorer import FileLister, TransferEngine, TreeRemover, TrashManager  # noqa: E402
+
+EXTENSIONS = ['.txt', '.py', '.jpg', '.png', '.mp3', '.pdf', '.zip', '.log', '']
+WORDS = ['informe', 'foto', 'datos', 'copia', 'notas', 'video', 'backup', 'proyecto']
+
+# Generadores de árboles (misma semilla -> mismo árbol)
+
+def random_name(rng, index):
+    return f"{rng.choice(WORDS)}_{index:07d}{rng.choice(EXTENSIONS)}"
+
+def make_flat(root, count, seed):
+    """Carpeta con count archivos vacíos y un 5 % de subcarpetas"""
+    rng = random.Random(seed)
+    os.makedirs(root)
+    for i in range(count):
+        path = os.path.join(root, random_name(rng, i))
+        if rng.random() < 0.05:
+            os.mkdir(path)
+        else:
+            open(path, 'wb').close()
+
+def make_deep(root, depth, width, files, seed):
+    """Árbol de depth niveles con width carpetas y files archivos por nivel"""
+    rng = random.Random(seed)
+    counter = 0
+    level = [root]
+    os.makedirs(root)
+    for _ in range(depth):
+        next_level = []
+        for parent in level:
+            for _ in range(files):
+                with open(os.path.join(parent, random_name(rng, counter)), 'wb') as f:
+                    f.write(b'x' * rng.randint(0, 512))
+                counter += 1
+            for w in range(width):
+                child = os.path.join(parent, f"nivel_{w}")
+                os.mkdir(child)
+                next_level.append(child)
+        level = next_level[:width * 4]  # Limitar la explosión combinatoria
+    return counter
+
+def make_tiny(root, dirs, files_per_dir, seed):
+    """Muchos archivos pequeños repartidos en carpetas"""
+    rng = random.Random(seed)
+    os.makedirs(root)
+    for d in range(dirs):
+        folder = os.path.join(root, f"carpeta_{d:04d}")
+        os.mkdir(folder)
+        for i in range(files_per_dir):
+            with open(os.path.join(folder, random_name(rng, i)), 'wb') as f:
+                f.write(rng.randbytes(rng.randint(1, 4096)))
+
+def make_sparse(root, count, size, seed):
+    """Pocos archivos grandes dispersos: bloques de datos separados por huecos"""
+    rng = random.Random(seed)
+    os.makedirs(root)
+    for i in range(count):
+        with open(os.path.join(root, f"disco_{i}.img"), 'wb') as f:
+            f.truncate(size)
+            for _ in range(8):
+                f.seek(rng.randrange(0, size - 65536))
+                f.write(rng.randbytes(65536))
+
+# Medición
+
+def measure(fn, repeat):
+    """Ejecuta fn repeat veces; devuelve tiempos en segundos y el último resultado"""
+    times = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return times, result
+
+def count_files(path):
+    """Archivos y carpetas bajo path, incluido el propio path"""
+    total = 1
+    for _, dirnames, filenames in os.walk(path):
+        total += len(dirnames) + len(filenames)
+    return total
+
+def summarize(times, units, unit_name):
+    """units es lo procesado en cada muestra: un número fijo o una lista paralela a times"""
+    ordered = sorted(times)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    median = statistics.median(ordered)
+    if isinstance(units, (list, tuple)):
+        rates = [n / t for n, t in zip(units, times) if t > 0]
+        throughput = statistics.median(rates) if rates else None
+    else:
+        throughput = units / median if median > 0 else None
+    return {
+        'runs': len(ordered),
+        'p50_ms': round(median * 1000, 3),
+        'p95_ms': round(p95 * 1000, 3),
+        'throughput': round(throughput, 1) if throughput is not None else None,
+        'throughput_unit': f'{unit_name}/s',
+    }
+
+def bench_flat(work, count, repeat):
+    root = os.path.join(work, f'flat_{count}')
+    make_flat(root, count, seed=count)
+    times, items = measure(lambda: FileLister.list_directory(root), repeat)
+    results = {'list_directory': summarize(times, len(items), 'entradas')}
+    times, matches = measure(lambda: FileLister.search(root, 'foto'), repeat)
+    results['search'] = summarize(times, count, 'entradas')
+    results['search']['matches'] = len(matches)
+    return results
+
+def bench_deep(work, repeat):
+    root = os.path.join(work, 'deep')
+    total = make_deep(root, depth=12, width=3, files=20, seed=42)
+    times, matches = measure(lambda: FileLister.search(root, 'datos'), repeat)
+    results = {'search': summarize(times, total, 'archivos')}
+    results['search']['matches'] = len(matches)
+    return results
+
+def bench_tiny(work, repeat):
+    root = os.path.join(work, 'tiny')
+    make_tiny(root, dirs=50, files_per_dir=200, seed=7)
+    total = 50 * 200
+    results = {}
+
+    times, _ = measure(lambda: FileLister.search(root, 'notas'), repeat)
+    results['search'] = summarize(times, total, 'archivos')
+
+    # paste_file (copiar): cada repetición copia a un destino nuevo
+    dest = os.path.join(work, 'tiny_dest')
+    os.makedirs(dest)
+    sources = [Path(root)]
+    times, _ = measure(lambda: TransferEngine().paste(sources, Path(dest), 'copy'), repeat)
+    results['paste_copy'] = summarize(times, total, 'archivos')
+
+    # paste_file (cortar) dentro del mismo sistema de archivos
+    copies = sorted(Path(dest).iterdir())
+    moved = os.path.join(work, 'tiny_moved')
+    os.makedirs(moved)
+    times, units = [], []
+    for source in copies:
+        units.append(count_files(source))
+        start = time.perf_counter()
+        TransferEngine().paste([source], Path(moved), 'cut')
+        times.append(time.perf_counter() - start)
+    results['paste_cut'] = summarize(times, units, 'archivos')
+
+    # delete_file: papelera (rename) y eliminación permanente
+    os.environ['XDG_DATA_HOME'] = os.path.join(work, 'xdg')
+    targets = sorted(Path(moved).iterdir())
+    half = len(targets) // 2 or 1
+    times, units = [], []
+    for target in targets[:half]:
+        units.append(count_files(target))
+        start = time.perf_counter()
+        TrashManager.trash(target)
+        times.append(time.perf_counter() - start)
+    results['delete_trash'] = summarize(times, units, 'archivos')
+    times, units = [], []
+    for target in targets[half:] or [os.path.join(work, 'xdg')]:
+        units.append(count_files(target))
+        start = time.perf_counter()
+        TreeRemover().remove(target)
+        times.append(time.perf_counter() - start)
+    results['delete_permanent'] = summarize(times, units, 'archivos')
+    return results
+
+def bench_sparse(work, repeat, size):
+    root = os.path.join(work, 'sparse')
+    make_sparse(root, count=3, size=size, seed=3)
+    total = 3 * size
+    results = {}
+    for name, preserve in (('paste_copy_preserve', True), ('paste_copy', False)):
+        dest = os.path.join(work, f'sparse_{name}')
+        os.makedirs(dest)
+        times = []
+        for _ in range(repeat):
+            target = tempfile.mkdtemp(dir=dest)
+            engine = TransferEngine(preserve=preserve)
+            start = time.perf_counter()
+            engine.paste([Path(root)], Path(target), 'copy')
+            times.append(time.perf_counter() - start)
+            shutil.rmtree(target)
+        results[name] = summarize(times, total / (1024 * 1024), 'MB')
+    return results
+
+def run_isolated(name, fn):
+    """Ejecuta el escenario en un proceso hijo y recoge su pico de RSS"""
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        status = 0
+        try:
+            payload = {'results': fn()}
+        except Exception as e:
+            payload = {'error': f'{type(e).__name__}: {e}'}
+            status = 1
+        with os.fdopen(write_fd, 'w') as f:
+            json.dump(payload, f)
+        os._exit(status)
+
+    os.close(write_fd)
+    with os.fdopen(read_fd) as f:
+        data = f.read()
+    _, _, rusage = os.wait4(pid, 0)
+    payload = json.loads(data) if data else {'error': 'el proceso terminó sin resultados'}
+    payload['peak_rss_kb'] = rusage.ru_maxrss
+    print(f"  {name}: {'error' if 'error' in payload else 'ok'} "
+          f"({rusage.ru_maxrss // 1024} MB RSS)", file=sys.stderr)
+    return payload
+
+def compare(current, baseline, threshold, min_delta_ms):
+    """Lista las métricas p50 que empeoran más que threshold respecto a la base
+
+    Un cambio también tiene que superar min_delta_ms en valor absoluto: en
+    operaciones de menos de un milisegundo un 25 % es ruido del planificador.
+    """
+    regressions = []
+    for scenario, data in current['scenarios'].items():
+        base = baseline.get('scenarios', {}).get(scenario, {}).get('results', {})
+        for op, metrics in data.get('results', {}).items():
+            old = base.get(op, {}).get('p50_ms')
+            new = metrics.get('p50_ms')
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            metrics['baseline_p50_ms'] = old
+            metrics['change'] = round(change, 3)
+            if change > threshold and new - old > min_delta_ms:
+                regressions.append(f"{scenario}.{op}: {old} ms -> {new} ms ({change:+.0%})")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks del explorador de archivos")
+    parser.add_argument('--output', help="Archivo JSON de resultados (por defecto stdout)")
+    parser.add_argument('--baseline', help="Resultados previos con los que comparar")
+    parser.add_argument('--save-baseline', metavar='RUTA', help="Guardar estos resultados como base")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="Empeoramiento relativo de p50 tolerado (0.25 = 25 %%)")
+    parser.add_argument('--min-delta', type=float, default=1.0, metavar='MS',
+                        help="Empeoramiento absoluto de p50 por debajo del cual no hay regresión")
+    parser.add_argument('--repeat', type=int, default=5, help="Repeticiones por medición")
+    parser.add_argument('--full', action='store_true', help="Incluir la carpeta de 1M de entradas")
+    parser.add_argument('--sparse-size', type=int, default=1024,
+                        help="Tamaño de cada archivo disperso en MB")
+    parser.add_argument('--only', nargs='*', help="Ejecutar solo estos escenarios")
+    parser.add_argument('--workdir', help="Carpeta donde generar los árboles")
+    parser.add_argument('--keep', action='store_true', help="No borrar los árboles al terminar")
+    args = parser.parse_args()
+
+    work = tempfile.mkdtemp(prefix='fe-bench-', dir=args.workdir)
+    repeat = max(1, args.repeat)
+    scenarios = {
+        'flat_10k': lambda: bench_flat(work, 10_000, repeat),
+        'flat_100k': lambda: bench_flat(work, 100_000, repeat),
+        'deep': lambda: bench_deep(work, repeat),
+        'tiny_files': lambda: bench_tiny(work, repeat),
+        'sparse_huge': lambda: bench_sparse(work, repeat, args.sparse_size * 1024 * 1024),
+    }
+    if args.full:
+        scenarios['flat_1m'] = lambda: bench_flat(work, 1_000_000, repeat)
+    if args.only:
+        scenarios = {name: fn for name, fn in scenarios.items() if name in args.only}
+
+    report = {
+        'python': sys.version.split()[0],
+        'platform': sys.platform,
+        'cpus': os.cpu_count(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'repeat': repeat,
+        'scenarios': {},
+    }
+    try:
+        print(f"Generando árboles en {work}", file=sys.stderr)
+        for name, fn in scenarios.items():
+            report['scenarios'][name] = run_isolated(name, fn)
+    finally:
+        if args.keep:
+            print(f"Árboles conservados en {work}", file=sys.stderr)
+        else:
+            shutil.rmtree(work, ignore_errors=True)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.threshold, args.min_delta)
+        report['regressions'] = regressions
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            f.write(text + '\n')
+
+    for line in regressions:
+        print(f"Regresión: {line}", file=sys.stderr)
+    failed = any('error' in data for data in report['scenarios'].values())
+    return 1 if regressions or failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,1567 +1,7635 @@
-import tkinter as tk
-from tkinter import ttk, filedialog, messagebox, simpledialog
-import os
-import subprocess
-import sys
-import threading
-import time
-from pathlib import Path
-import json
-import shutil
-import mimetypes
-from datetime import datetime
-import re
-
-class DependencyManager:
-    """Gestor de dependencias automático"""
-    
-    REQUIRED_PACKAGES = {
-        'apt': [
-            'python3-pil',          # Para imágenes
-            'python3-pil.imagetk',  # Para mostrar imágenes en tkinter
-            'vlc',                  # Para reproducir videos/audio
-            'eog',                  # Visor de imágenes
-            'evince',               # Para PDFs
-            'gedit',                # Editor de texto
-            'network-manager',      # Para WiFi
-            'pulseaudio-utils',     # Para control de volumen
-            'imagemagick',          # Para manipulación de imágenes
-            'ffmpeg',               # Para multimedia
-            'unzip',                # Para archivos comprimidos
-            'p7zip-full',           # Para más formatos comprimidos
-        ],
-        'pacman': [
-            'python-pillow',
-            'vlc',
-            'eog',
-            'evince',
-            'gedit',
-            'networkmanager',
-            'pulseaudio',
-            'imagemagick',
-            'ffmpeg',
-            'unzip',
-            'p7zip',
-        ],
-        'dnf': [
-            'python3-pillow',
-            'python3-pillow-tk',
-            'vlc',
-            'eog',
-            'evince',
-            'gedit',
-            'NetworkManager',
-            'pulseaudio-utils',
-            'ImageMagick',
-            'ffmpeg',
-            'unzip',
-            'p7zip',
-        ]
-    }
-    
-    @staticmethod
-    def detect_package_manager():
-        """Detecta el gestor de paquetes del sistema"""
-        managers = {
-            'apt': '/usr/bin/apt',
-            'pacman': '/usr/bin/pacman',
-            'dnf': '/usr/bin/dnf',
-            'yum': '/usr/bin/yum'
-        }
-        
-        for manager, path in managers.items():
-            if os.path.exists(path):
-                return manager
-        return None
-    
-    @staticmethod
-    def install_dependencies():
-        """Instala todas las dependencias necesarias"""
-        manager = DependencyManager.detect_package_manager()
-        if not manager:
-            messagebox.showerror("Error", "No se pudo detectar el gestor de paquetes")
-            return False
-        
-        packages = DependencyManager.REQUIRED_PACKAGES.get(manager, [])
-        if not packages:
-            messagebox.showwarning("Advertencia", f"Gestor de paquetes {manager} no soportado")
-            return False
-        
-        # Crear ventana de progreso
-        progress_window = tk.Toplevel()
-        progress_window.title("Instalando Dependencias")
-        progress_window.geometry("400x150")
-        progress_window.resizable(False, False)
-        
-        label = tk.Label(progress_window, text="Instalando dependencias necesarias...")
-        label.pack(pady=10)
-        
-        progress_bar = ttk.Progressbar(progress_window, mode='indeterminate')
-        progress_bar.pack(pady=10, padx=20, fill='x')
-        progress_bar.start()
-        
-        text_widget = tk.Text(progress_window, height=4, width=50)
-        text_widget.pack(pady=5, padx=20, fill='both', expand=True)
-        
-        def install_thread():
-            try:
-                # Actualizar repositorios
-                if manager == 'apt':
-                    subprocess.run(['sudo', 'apt', 'update'], check=True, 
-                                    capture_output=True, text=True)
-                    cmd = ['sudo', 'apt', 'install', '-y'] + packages
-                elif manager == 'pacman':
-                    subprocess.run(['sudo', 'pacman', '-Sy'], check=True,
-                                    capture_output=True, text=True)
-                    cmd = ['sudo', 'pacman', '-S', '--noconfirm'] + packages
-                elif manager == 'dnf':
-                    cmd = ['sudo', 'dnf', 'install', '-y'] + packages
-                
-                # Instalar paquetes
-                process = subprocess.Popen(cmd, stdout=subprocess.PIPE, 
-                                            stderr=subprocess.PIPE, text=True)
-                
-                while True:
-                    output = process.stdout.readline()
-                    if output == '' and process.poll() is not None:
-                        break
-                    if output:
-                        text_widget.insert(tk.END, output)
-                        text_widget.see(tk.END)
-                        text_widget.update()
-                
-                if process.returncode == 0:
-                    progress_bar.stop()
-                    label.config(text="¡Instalación completada!")
-                    messagebox.showinfo("Éxito", "Todas las dependencias se instalaron correctamente")
-                else:
-                    progress_bar.stop()
-                    label.config(text="Error en la instalación")
-                    messagebox.showerror("Error", "Hubo un problema instalando las dependencias")
-                
-            except Exception as e:
-                progress_bar.stop()
-                label.config(text="Error en la instalación")
-                messagebox.showerror("Error", f"Error: {str(e)}")
-            finally:
-                progress_window.destroy()
-        
-        thread = threading.Thread(target=install_thread)
-        thread.daemon = True
-        thread.start()
-        
-        return True
-
-class WiFiManager:
-    """Gestor de conexiones WiFi"""
-    
-    @staticmethod
-    def scan_networks():
-        """Escanea redes WiFi disponibles"""
-        try:
-            result = subprocess.run(['nmcli', 'dev', 'wifi', 'list'], 
-                                    capture_output=True, text=True, check=True)
-            networks = []
-            lines = result.stdout.strip().split('\n')[1:]  # Skip header
-            
-            for line in lines:
-                parts = line.split()
-                if len(parts) >= 2:
-                    ssid = parts[1] if parts[1] != '--' else 'Red oculta'
-                    signal = parts[5] if len(parts) > 5 else '0'
-                    security = 'WPA' if '*' in line else 'Abierta'
-                    networks.append({
-                        'ssid': ssid,
-                        'signal': signal,
-                        'security': security
-                    })
-            
-            return networks
-        except subprocess.CalledProcessError:
-            return []
-    
-    @staticmethod
-    def connect_to_network(ssid, password=None):
-        """Se conecta a una red WiFi"""
-        try:
-            if password:
-                cmd = ['nmcli', 'dev', 'wifi', 'connect', ssid, 'password', password]
-            else:
-                cmd = ['nmcli', 'dev', 'wifi', 'connect', ssid]
-            
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            return True, "Conectado exitosamente"
-        except subprocess.CalledProcessError as e:
-            return False, f"Error: {e.stderr}"
-    
-    @staticmethod
-    def disconnect():
-        """Desconecta de la red WiFi actual"""
-        try:
-            subprocess.run(['nmcli', 'dev', 'disconnect', 'wlan0'], 
-                            capture_output=True, text=True, check=True)
-            return True, "Desconectado"
-        except subprocess.CalledProcessError:
-            return False, "Error al desconectar"
-    
-    @staticmethod
-    def get_current_connection():
-        """Obtiene información de la conexión actual"""
-        try:
-            result = subprocess.run(['nmcli', 'dev', 'status'], 
-                                    capture_output=True, text=True, check=True)
-            lines = result.stdout.strip().split('\n')[1:]
-            
-            for line in lines:
-                parts = line.split()
-                if len(parts) >= 4 and 'wifi' in parts[1] and 'connected' in parts[2]:
-                    return parts[3]
-            return None
-        except subprocess.CalledProcessError:
-            return None
-
-class VolumeManager:
-    """Gestor de volumen del sistema"""
-    
-    @staticmethod
-    def get_volume():
-        """Obtiene el volumen actual"""
-        try:
-            result = subprocess.run(['pactl', 'get-sink-volume', '@DEFAULT_SINK@'], 
-                                    capture_output=True, text=True, check=True)
-            # Extraer porcentaje del resultado
-            match = re.search(r'(\d+)%', result.stdout)
-            if match:
-                return int(match.group(1))
-            return 50
-        except subprocess.CalledProcessError:
-            return 50
-    
-    @staticmethod
-    def set_volume(volume):
-        """Establece el volumen del sistema"""
-        try:
-            subprocess.run(['pactl', 'set-sink-volume', '@DEFAULT_SINK@', f'{volume}%'], 
-                            check=True)
-            return True
-        except subprocess.CalledProcessError:
-            return False
-    
-    @staticmethod
-    def toggle_mute():
-        """Alterna el estado de silencio"""
-        try:
-            subprocess.run(['pactl', 'set-sink-mute', '@DEFAULT_SINK@', 'toggle'], 
-                            check=True)
-            return True
-        except subprocess.CalledProcessError:
-            return False
-    
-    @staticmethod
-    def is_muted():
-        """Verifica si está silenciado"""
-        try:
-            result = subprocess.run(['pactl', 'get-sink-mute', '@DEFAULT_SINK@'], 
-                                    capture_output=True, text=True, check=True)
-            return 'yes' in result.stdout.lower()
-        except subprocess.CalledProcessError:
-            return False
-
-class FileOpener:
-    """Gestor para abrir diferentes tipos de archivos"""
-    
-    OPENERS = {
-        'image': ['eog', 'feh', 'gpicview', 'ristretto'],
-        'video': ['vlc', 'mpv', 'totem'],
-        'audio': ['vlc', 'audacious', 'rhythmbox'],
-        'pdf': ['evince', 'okular', 'mupdf'],
-        'text': ['gedit', 'kate', 'mousepad', 'nano'],
-        'archive': ['file-roller', 'ark', 'xarchiver']
-    }
-    
-    @staticmethod
-    def get_file_type(filepath):
-        """Determina el tipo de archivo"""
-        mime_type, _ = mimetypes.guess_type(filepath)
-        if not mime_type:
-            return 'unknown'
-        
-        if mime_type.startswith('image/'):
-            return 'image'
-        elif mime_type.startswith('video/'):
-            return 'video'
-        elif mime_type.startswith('audio/'):
-            return 'audio'
-        elif mime_type == 'application/pdf':
-            return 'pdf'
-        elif mime_type.startswith('text/'):
-            return 'text'
-        elif mime_type in ['application/zip', 'application/x-rar', 'application/x-7z-compressed']:
-            return 'archive'
-        else:
-            return 'unknown'
-    
-    @staticmethod
-    def open_file(filepath):
-        """Abre un archivo con la aplicación apropiada"""
-        file_type = FileOpener.get_file_type(filepath)
-        
-        if file_type == 'unknown':
-            # Usar xdg-open como fallback
-            try:
-                subprocess.Popen(['xdg-open', filepath])
-                return True
-            except:
-                return False
-        
-        openers = FileOpener.OPENERS.get(file_type, [])
-        
-        for opener in openers:
-            if shutil.which(opener):
-                try:
-                    subprocess.Popen([opener, filepath])
-                    return True
-                except:
-                    continue
-        
-        # Fallback a xdg-open
-        try:
-            subprocess.Popen(['xdg-open', filepath])
-            return True
-        except:
-            return False
-
-class FileExplorer:
-    """Explorador de archivos principal"""
-    
-    def __init__(self, root):
-        self.root = root
-        self.root.title("Explorador de Archivos Linux")
-        self.root.geometry("1000x700")
-        self.root.minsize(800, 600)
-        
-        # Variables
-        self.current_path = Path.home()
-        self.history = [self.current_path]
-        self.history_index = 0
-        self.bookmarks = []
-        self.clipboard = None
-        self.clipboard_operation = None  # 'copy' or 'cut'
-        
-        # Configurar estilo
-        self.setup_style()
-        
-        # Crear interfaz
-        self.create_menubar()
-        self.create_toolbar()
-        self.create_main_frame()
-        self.create_status_bar()
-        
-        # Cargar configuración
-        self.load_config()
-        
-        # Actualizar vista inicial
-        self.refresh_view()
-        
-        # Configurar eventos
-        self.setup_events()
-    
-    def setup_style(self):
-        """Configura el estilo de la aplicación"""
-        style = ttk.Style()
-        
-        # Configurar temas
-        available_themes = style.theme_names()
-        if 'clam' in available_themes:
-            style.theme_use('clam')
-        
-        # Personalizar colores
-        style.configure('Treeview', rowheight=25)
-        style.configure('Treeview.Heading', font=('Arial', 10, 'bold'))
-    
-    def create_menubar(self):
-        """Crea la barra de menú"""
-        menubar = tk.Menu(self.root)
-        self.root.config(menu=menubar)
-        
-        # Menú Archivo
-        file_menu = tk.Menu(menubar, tearoff=0)
-        menubar.add_cascade(label="Archivo", menu=file_menu)
-        file_menu.add_command(label="Nueva Carpeta", command=self.create_folder, accelerator="Ctrl+N")
-        file_menu.add_command(label="Nuevo Archivo", command=self.create_file)
-        file_menu.add_separator()
-        file_menu.add_command(label="Copiar", command=self.copy_file, accelerator="Ctrl+C")
-        file_menu.add_command(label="Cortar", command=self.cut_file, accelerator="Ctrl+X")
-        file_menu.add_command(label="Pegar", command=self.paste_file, accelerator="Ctrl+V")
-        file_menu.add_separator()
-        file_menu.add_command(label="Eliminar", command=self.delete_file, accelerator="Del")
-        file_menu.add_command(label="Renombrar", command=self.rename_file, accelerator="F2")
-        file_menu.add_separator()
-        file_menu.add_command(label="Propiedades", command=self.show_properties)
-        file_menu.add_separator()
-        file_menu.add_command(label="Salir", command=self.root.quit, accelerator="Ctrl+Q")
-        
-        # Menú Ver
-        view_menu = tk.Menu(menubar, tearoff=0)
-        menubar.add_cascade(label="Ver", menu=view_menu)
-        view_menu.add_command(label="Actualizar", command=self.refresh_view, accelerator="F5")
-        view_menu.add_command(label="Mostrar Archivos Ocultos", command=self.toggle_hidden_files)
-        view_menu.add_separator()
-        view_menu.add_command(label="Ir a Carpeta Personal", command=self.go_home)
-        view_menu.add_command(label="Ir a Escritorio", command=self.go_desktop)
-        view_menu.add_command(label="Ir a Documentos", command=self.go_documents)
-        view_menu.add_command(label="Ir a Descargas", command=self.go_downloads)
-        
-        # Menú Marcadores
-        bookmarks_menu = tk.Menu(menubar, tearoff=0)
-        menubar.add_cascade(label="Marcadores", menu=bookmarks_menu)
-        bookmarks_menu.add_command(label="Agregar Marcador", command=self.add_bookmark)
-        bookmarks_menu.add_command(label="Gestionar Marcadores", command=self.manage_bookmarks)
-        
-        # Menú Sistema
-        system_menu = tk.Menu(menubar, tearoff=0)
-        menubar.add_cascade(label="Sistema", menu=system_menu)
-        system_menu.add_command(label="Gestión WiFi", command=self.open_wifi_manager)
-        system_menu.add_command(label="Control de Volumen", command=self.open_volume_control)
-        system_menu.add_separator()
-        system_menu.add_command(label="Terminal", command=self.open_terminal)
-        system_menu.add_command(label="Monitor del Sistema", command=self.open_system_monitor)
-        
-        # Menú Ayuda
-        help_menu = tk.Menu(menubar, tearoff=0)
-        menubar.add_cascade(label="Ayuda", menu=help_menu)
-        help_menu.add_command(label="Instalar Dependencias", command=self.install_dependencies)
-        help_menu.add_command(label="Acerca de", command=self.show_about)
-    
-    def create_toolbar(self):
-        """Crea la barra de herramientas"""
-        toolbar_frame = ttk.Frame(self.root)
-        toolbar_frame.pack(fill='x', padx=5, pady=2)
-        
-        # Botones de navegación
-        ttk.Button(toolbar_frame, text="←", command=self.go_back, width=3).pack(side='left', padx=1)
-        ttk.Button(toolbar_frame, text="→", command=self.go_forward, width=3).pack(side='left', padx=1)
-        ttk.Button(toolbar_frame, text="↑", command=self.go_up, width=3).pack(side='left', padx=1)
-        ttk.Button(toolbar_frame, text="🏠", command=self.go_home, width=3).pack(side='left', padx=1)
-        ttk.Button(toolbar_frame, text="🔄", command=self.refresh_view, width=3).pack(side='left', padx=1)
-        
-        # Separador
-        ttk.Separator(toolbar_frame, orient='vertical').pack(side='left', fill='y', padx=5)
-        
-        # Barra de dirección
-        ttk.Label(toolbar_frame, text="Ruta:").pack(side='left', padx=2)
-        self.address_bar = ttk.Entry(toolbar_frame)
-        self.address_bar.pack(side='left', fill='x', expand=True, padx=2)
-        self.address_bar.bind('<Return>', self.navigate_to_address)
-        
-        # Botón ir
-        ttk.Button(toolbar_frame, text="Ir", command=self.navigate_to_address).pack(side='left', padx=2)
-        
-        # Separador
-        ttk.Separator(toolbar_frame, orient='vertical').pack(side='left', fill='y', padx=5)
-        
-        # Buscador
-        ttk.Label(toolbar_frame, text="Buscar:").pack(side='left', padx=2)
-        self.search_entry = ttk.Entry(toolbar_frame, width=20)
-        self.search_entry.pack(side='left', padx=2)
-        self.search_entry.bind('<Return>', self.search_files)
-        ttk.Button(toolbar_frame, text="🔍", command=self.search_files, width=3).pack(side='left', padx=1)
-    
-    def create_main_frame(self):
-        """Crea el marco principal con panel lateral y vista de archivos"""
-        # Frame principal con panel
-        main_paned = ttk.PanedWindow(self.root, orient='horizontal')
-        main_paned.pack(fill='both', expand=True, padx=5, pady=2)
-        
-        # Panel lateral
-        self.create_sidebar(main_paned)
-        
-        # Vista de archivos
-        self.create_file_view(main_paned)
-    
-    def create_sidebar(self, parent):
-        """Crea el panel lateral con accesos rápidos"""
-        sidebar_frame = ttk.Frame(parent)
-        parent.add(sidebar_frame, weight=1)
-        
-        # Título
-        ttk.Label(sidebar_frame, text="Accesos Rápidos", font=('Arial', 12, 'bold')).pack(pady=5)
-        
-        # Lista de accesos rápidos
-        self.sidebar_tree = ttk.Treeview(sidebar_frame, show='tree', selectmode='browse')
-        self.sidebar_tree.pack(fill='both', expand=True, padx=5, pady=5)
-        
-        # Poblar sidebar
-        self.populate_sidebar()
-        
-        # Eventos
-        self.sidebar_tree.bind('<Double-1>', self.on_sidebar_double_click)
-    
-    def populate_sidebar(self):
-        """Puebla el panel lateral con accesos rápidos"""
-        # Limpiar
-        for item in self.sidebar_tree.get_children():
-            self.sidebar_tree.delete(item)
-        
-        # Lugares comunes
-        places = [
-            ("🏠 Inicio", str(Path.home())),
-            ("🖥️ Escritorio", str(Path.home() / "Desktop")),
-            ("📁 Documentos", str(Path.home() / "Documents")),
-            ("⬇️ Descargas", str(Path.home() / "Downloads")),
-            ("🎵 Música", str(Path.home() / "Music")),
-            ("🖼️ Imágenes", str(Path.home() / "Pictures")),
-            ("🎬 Videos", str(Path.home() / "Videos")),
-            ("💾 Raíz", "/"),
-            ("🖴 Media", "/media"),
-            ("🔧 Temp", "/tmp"),
-        ]
-        
-        for name, path in places:
-            if os.path.exists(path):
-                self.sidebar_tree.insert('', 'end', text=name, values=(path,))
-        
-        # Separador
-        self.sidebar_tree.insert('', 'end', text="─" * 20, values=("",))
-        
-        # Marcadores
-        for bookmark in self.bookmarks:
-            name = f"⭐ {os.path.basename(bookmark)}"
-            self.sidebar_tree.insert('', 'end', text=name, values=(bookmark,))
-    
-    def create_file_view(self, parent):
-        """Crea la vista principal de archivos"""
-        file_frame = ttk.Frame(parent)
-        parent.add(file_frame, weight=3)
-        
-        # Treeview para archivos
-        columns = ('Nombre', 'Tamaño', 'Tipo', 'Modificado')
-        self.file_tree = ttk.Treeview(file_frame, columns=columns, show='tree headings')
-        
-        # Configurar columnas
-        self.file_tree.heading('#0', text='', anchor='w')
-        self.file_tree.column('#0', width=30, minwidth=30)
-        
-        for col in columns:
-            self.file_tree.heading(col, text=col, anchor='w')
-            if col == 'Nombre':
-                self.file_tree.column(col, width=300, minwidth=200)
-            elif col == 'Tamaño':
-                self.file_tree.column(col, width=100, minwidth=80)
-            elif col == 'Tipo':
-                self.file_tree.column(col, width=150, minwidth=100)
-            else:
-                self.file_tree.column(col, width=150, minwidth=120)
-        
-        # Scrollbars
-        v_scrollbar = ttk.Scrollbar(file_frame, orient='vertical', command=self.file_tree.yview)
-        h_scrollbar = ttk.Scrollbar(file_frame, orient='horizontal', command=self.file_tree.xview)
-        self.file_tree.configure(yscrollcommand=v_scrollbar.set, xscrollcommand=h_scrollbar.set)
-        
-        # Empaquetar
-        self.file_tree.pack(side='left', fill='both', expand=True)
-        v_scrollbar.pack(side='right', fill='y')
-        h_scrollbar.pack(side='bottom', fill='x')
-        
-        # Eventos
-        self.file_tree.bind('<Double-1>', self.on_file_double_click)
-        self.file_tree.bind('<Button-3>', self.show_context_menu)
-        
-        # Menú contextual
-        self.create_context_menu()
-    
-    def create_context_menu(self):
-        """Crea el menú contextual"""
-        self.context_menu = tk.Menu(self.root, tearoff=0)
-        self.context_menu.add_command(label="Abrir", command=self.open_selected_file)
-        self.context_menu.add_command(label="Abrir con...", command=self.open_with)
-        self.context_menu.add_separator()
-        self.context_menu.add_command(label="Cortar", command=self.cut_file)
-        self.context_menu.add_command(label="Copiar", command=self.copy_file)
-        self.context_menu.add_command(label="Pegar", command=self.paste_file)
-        self.context_menu.add_separator()
-        self.context_menu.add_command(label="Eliminar", command=self.delete_file)
-        self.context_menu.add_command(label="Renombrar", command=self.rename_file)
-        self.context_menu.add_separator()
-        self.context_menu.add_command(label="Propiedades", command=self.show_properties)
-    
-    def create_status_bar(self):
-        """Crea la barra de estado"""
-        self.status_bar = ttk.Frame(self.root)
-        self.status_bar.pack(fill='x', side='bottom')
-        
-        # Información de archivos
-        self.status_label = ttk.Label(self.status_bar, text="Listo")
-        self.status_label.pack(side='left', padx=5)
-        
-        # Separador
-        ttk.Separator(self.status_bar, orient='vertical').pack(side='right', fill='y', padx=5)
-        
-        # Control de volumen
-        volume_frame = ttk.Frame(self.status_bar)
-        volume_frame.pack(side='right', padx=5)
-        
-        ttk.Label(volume_frame, text="🔊").pack(side='left')
-        self.volume_scale = ttk.Scale(volume_frame, from_=0, to=100, orient='horizontal', 
-                                        length=100, command=self.on_volume_change)
-        self.volume_scale.pack(side='left', padx=2)
-        self.volume_scale.set(VolumeManager.get_volume())
-        
-        # WiFi status
-        self.wifi_label = ttk.Label(self.status_bar, text="📶 WiFi")
-        self.wifi_label.pack(side='right', padx=5)
-        self.wifi_label.bind('<Button-1>', lambda e: self.open_wifi_manager())
-        
-        # Actualizar estado WiFi
-        self.update_wifi_status()
-    
-    def setup_events(self):
-        """Configura los eventos de teclado"""
-        self.root.bind('<Control-n>', lambda e: self.create_folder())
-        self.root.bind('<Control-c>', lambda e: self.copy_file())
-        self.root.bind('<Control-x>', lambda e: self.cut_file())
-        self.root.bind('<Control-v>', lambda e: self.paste_file())
-        self.root.bind('<Delete>', lambda e: self.delete_file())
-        self.root.bind('<F2>', lambda e: self.rename_file())
-        self.root.bind('<F5>', lambda e: self.refresh_view())
-        self.root.bind('<Control-q>', lambda e: self.root.quit())
-        self.root.bind('<Alt-Left>', lambda e: self.go_back())
-        self.root.bind('<Alt-Right>', lambda e: self.go_forward())
-        self.root.bind('<Alt-Up>', lambda e: self.go_up())
-    
-    def refresh_view(self):
-        """Actualiza la vista de archivos"""
-        # Limpiar vista
-        for item in self.file_tree.get_children():
-            self.file_tree.delete(item)
-        
-        # Actualizar barra de dirección
-        self.address_bar.delete(0, tk.END)
-        self.address_bar.insert(0, str(self.current_path))
-        
-        try:
-            # Obtener archivos y carpetas
-            items = []
-            
-            # Primero las carpetas
-            for item in self.current_path.iterdir():
-                if item.name.startswith('.') and not getattr(self, 'show_hidden', False):
-                    continue
-                
-                try:
-                    stat = item.stat()
-                    size = self.format_size(stat.st_size) if item.is_file() else ""
-                    file_type = "Carpeta" if item.is_dir() else self.get_file_type(item)
-                    modified = datetime.fromtimestamp(stat.st_mtime).strftime('%Y-%m-%d %H:%M')
-                    
-                    items.append({
-                        'name': item.name,
-                        'path': str(item),
-                        'is_dir': item.is_dir(),
-                        'size': size,
-                        'type': file_type,
-                        'modified': modified,
-                        'icon': '📁' if item.is_dir() else self.get_file_icon(item)
-                    })
-                except (PermissionError, OSError):
-                    continue
-            
-            # Ordenar: carpetas primero, luego por nombre
-            items.sort(key=lambda x: (not x['is_dir'], x['name'].lower()))
-            
-            # Insertar en el treeview
-            for item in items:
-                self.file_tree.insert('', 'end', 
-                                    text=item['icon'],
-                                    values=(item['name'], item['size'], item['type'], item['modified']),
-                                    tags=('directory' if item['is_dir'] else 'file',))
-            
-            # Actualizar contador de archivos
-            total_items = len(items)
-            dirs = sum(1 for item in items if item['is_dir'])
-            files = total_items - dirs
-            self.status_label.config(text=f"{total_items} elementos ({dirs} carpetas, {files} archivos)")
-            
-        except PermissionError:
-            messagebox.showerror("Error", "No tiene permisos para acceder a esta carpeta")
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al cargar la carpeta: {str(e)}")
-    
-    def get_file_icon(self, filepath):
-        """Obtiene el icono apropiado para un archivo"""
-        file_type = FileOpener.get_file_type(str(filepath))
-        icons = {
-            'image': '🖼️',
-            'video': '🎬',
-            'audio': '🎵',
-            'pdf': '📄',
-            'text': '📝',
-            'archive': '📦',
-            'unknown': '📄'
-        }
-        return icons.get(file_type, '📄')
-    
-    def get_file_type(self, filepath):
-        """Obtiene una descripción del tipo de archivo"""
-        if filepath.is_dir():
-            return "Carpeta"
-        
-        suffix = filepath.suffix.lower()
-        types = {
-            '.txt': 'Archivo de texto',
-            '.pdf': 'Documento PDF',
-            '.doc': 'Documento Word',
-            '.docx': 'Documento Word',
-            '.jpg': 'Imagen JPEG',
-            '.jpeg': 'Imagen JPEG',
-            '.png': 'Imagen PNG',
-            '.gif': 'Imagen GIF',
-            '.mp4': 'Video MP4',
-            '.avi': 'Video AVI',
-            '.mp3': 'Audio MP3',
-            '.wav': 'Audio WAV',
-            '.zip': 'Archivo ZIP',
-            '.tar': 'Archivo TAR',
-            '.gz': 'Archivo comprimido',
-            '.py': 'Archivo Python',
-            '.js': 'Archivo JavaScript',
-            '.html': 'Página web',
-            '.css': 'Hoja de estilo',
-        }
-        return types.get(suffix, f'Archivo {suffix[1:].upper()}' if suffix else 'Archivo')
-    
-    def format_size(self, size):
-        """Formatea el tamaño de archivo en formato legible"""
-        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-            if size < 1024.0:
-                return f"{size:.1f} {unit}"
-            size /= 1024.0
-        return f"{size:.1f} PB"
-    
-    # Métodos de navegación
-    def go_back(self):
-        """Va hacia atrás en el historial"""
-        if self.history_index > 0:
-            self.history_index -= 1
-            self.current_path = Path(self.history[self.history_index])
-            self.refresh_view()
-    
-    def go_forward(self):
-        """Va hacia adelante en el historial"""
-        if self.history_index < len(self.history) - 1:
-            self.history_index += 1
-            self.current_path = Path(self.history[self.history_index])
-            self.refresh_view()
-    
-    def go_up(self):
-        """Sube un nivel en la jerarquía de carpetas"""
-        if self.current_path.parent != self.current_path:
-            self.navigate_to_path(self.current_path.parent)
-    
-    def go_home(self):
-        """Va a la carpeta personal"""
-        self.navigate_to_path(Path.home())
-    
-    def go_desktop(self):
-        """Va al escritorio"""
-        desktop = Path.home() / "Desktop"
-        if desktop.exists():
-            self.navigate_to_path(desktop)
-    
-    def go_documents(self):
-        """Va a documentos"""
-        documents = Path.home() / "Documents"
-        if documents.exists():
-            self.navigate_to_path(documents)
-    
-    def go_downloads(self):
-        """Va a descargas"""
-        downloads = Path.home() / "Downloads"
-        if downloads.exists():
-            self.navigate_to_path(downloads)
-    
-    def navigate_to_path(self, path):
-        """Navega a una ruta específica"""
-        path = Path(path)
-        if path.exists() and path.is_dir():
-            self.current_path = path
-            
-            # Actualizar historial
-            if self.history_index < len(self.history) - 1:
-                self.history = self.history[:self.history_index + 1]
-            
-            if not self.history or self.history[-1] != path:
-                self.history.append(path)
-                self.history_index = len(self.history) - 1
-            
-            self.refresh_view()
-            return True
-        return False
-    
-    def navigate_to_address(self, event=None):
-        """Navega a la dirección ingresada en la barra"""
-        address = self.address_bar.get().strip()
-        if address:
-            success = self.navigate_to_path(address)
-            if not success:
-                messagebox.showerror("Error", f"No se puede acceder a: {address}")
-                self.address_bar.delete(0, tk.END)
-                self.address_bar.insert(0, str(self.current_path))
-    
-    # Eventos de archivos
-    def on_file_double_click(self, event):
-        """Maneja doble clic en archivos"""
-        selection = self.file_tree.selection()
-        if selection:
-            item = self.file_tree.item(selection[0])
-            filename = item['values'][0]
-            filepath = self.current_path / filename
-            
-            if filepath.is_dir():
-                self.navigate_to_path(filepath)
-            else:
-                self.open_file(filepath)
-    
-    def on_sidebar_double_click(self, event):
-        """Maneja doble clic en el panel lateral"""
-        selection = self.sidebar_tree.selection()
-        if selection:
-            item = self.sidebar_tree.item(selection[0])
-            path = item['values'][0] if item['values'] else None
-            if path and path != "":
-                self.navigate_to_path(path)
-    
-    def show_context_menu(self, event):
-        """Muestra el menú contextual"""
-        item = self.file_tree.identify_row(event.y)
-        if item:
-            self.file_tree.selection_set(item)
-            self.context_menu.post(event.x_root, event.y_root)
-    
-    def get_selected_files(self):
-        """Obtiene los archivos seleccionados"""
-        selection = self.file_tree.selection()
-        files = []
-        for item in selection:
-            filename = self.file_tree.item(item)['values'][0]
-            filepath = self.current_path / filename
-            files.append(filepath)
-        return files
-    
-    # Operaciones de archivos
-    def open_selected_file(self):
-        """Abre el archivo seleccionado"""
-        files = self.get_selected_files()
-        if files:
-            self.open_file(files[0])
-    
-    def open_file(self, filepath):
-        """Abre un archivo con la aplicación apropiada"""
-        if not FileOpener.open_file(str(filepath)):
-            messagebox.showerror("Error", f"No se pudo abrir el archivo: {filepath.name}")
-    
-    def open_with(self):
-        """Abre archivo con aplicación específica"""
-        files = self.get_selected_files()
-        if not files:
-            return
-        
-        app = simpledialog.askstring("Abrir con", "Ingrese el comando de la aplicación:")
-        if app:
-            try:
-                subprocess.Popen([app, str(files[0])])
-            except Exception as e:
-                messagebox.showerror("Error", f"Error al abrir con {app}: {str(e)}")
-    
-    def create_folder(self):
-        """Crea una nueva carpeta"""
-        name = simpledialog.askstring("Nueva Carpeta", "Nombre de la carpeta:")
-        if name:
-            new_folder = self.current_path / name
-            try:
-                new_folder.mkdir(exist_ok=False)
-                self.refresh_view()
-            except FileExistsError:
-                messagebox.showerror("Error", "Ya existe una carpeta con ese nombre")
-            except Exception as e:
-                messagebox.showerror("Error", f"Error al crear carpeta: {str(e)}")
-    
-    def create_file(self):
-        """Crea un nuevo archivo"""
-        name = simpledialog.askstring("Nuevo Archivo", "Nombre del archivo:")
-        if name:
-            new_file = self.current_path / name
-            try:
-                new_file.touch(exist_ok=False)
-                self.refresh_view()
-            except FileExistsError:
-                messagebox.showerror("Error", "Ya existe un archivo con ese nombre")
-            except Exception as e:
-                messagebox.showerror("Error", f"Error al crear archivo: {str(e)}")
-    
-    def copy_file(self):
-        """Copia archivos seleccionados"""
-        files = self.get_selected_files()
-        if files:
-            self.clipboard = files
-            self.clipboard_operation = 'copy'
-            self.status_label.config(text=f"Copiados {len(files)} elementos")
-    
-    def cut_file(self):
-        """Corta archivos seleccionados"""
-        files = self.get_selected_files()
-        if files:
-            self.clipboard = files
-            self.clipboard_operation = 'cut'
-            self.status_label.config(text=f"Cortados {len(files)} elementos")
-    
-    def paste_file(self):
-        """Pega archivos del portapapeles"""
-        if not self.clipboard:
-            return
-        
-        try:
-            for file_path in self.clipboard:
-                dest_path = self.current_path / file_path.name
-                
-                # Evitar sobrescribir
-                counter = 1
-                while dest_path.exists():
-                    name_parts = file_path.stem, counter, file_path.suffix
-                    if file_path.is_dir():
-                        dest_path = self.current_path / f"{name_parts[0]} ({name_parts[1]})"
-                    else:
-                        dest_path = self.current_path / f"{name_parts[0]} ({name_parts[1]}){name_parts[2]}"
-                    counter += 1
-                
-                if self.clipboard_operation == 'copy':
-                    if file_path.is_dir():
-                        shutil.copytree(file_path, dest_path)
-                    else:
-                        shutil.copy2(file_path, dest_path)
-                elif self.clipboard_operation == 'cut':
-                    shutil.move(str(file_path), str(dest_path))
-            
-            if self.clipboard_operation == 'cut':
-                self.clipboard = None
-                self.clipboard_operation = None
-            
-            self.refresh_view()
-            self.status_label.config(text="Operación completada")
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Error en la operación: {str(e)}")
-    
-    def delete_file(self):
-        """Elimina archivos seleccionados"""
-        files = self.get_selected_files()
-        if not files:
-            return
-        
-        file_list = "\n".join([f.name for f in files])
-        if messagebox.askyesno("Confirmar eliminación", 
-                                f"¿Está seguro de eliminar estos elementos?\n\n{file_list}"):
-            try:
-                for file_path in files:
-                    if file_path.is_dir():
-                        shutil.rmtree(file_path)
-                    else:
-                        file_path.unlink()
-                
-                self.refresh_view()
-                self.status_label.config(text=f"Eliminados {len(files)} elementos")
-                
-            except Exception as e:
-                messagebox.showerror("Error", f"Error al eliminar: {str(e)}")
-    
-    def rename_file(self):
-        """Renombra el archivo seleccionado"""
-        files = self.get_selected_files()
-        if not files:
-            return
-        
-        old_name = files[0].name
-        new_name = simpledialog.askstring("Renombrar", f"Nuevo nombre para '{old_name}':", 
-                                            initialvalue=old_name)
-        if new_name and new_name != old_name:
-            try:
-                new_path = files[0].parent / new_name
-                files[0].rename(new_path)
-                self.refresh_view()
-            except Exception as e:
-                messagebox.showerror("Error", f"Error al renombrar: {str(e)}")
-    
-    def show_properties(self):
-        """Muestra propiedades del archivo seleccionado"""
-        files = self.get_selected_files()
-        if not files:
-            return
-        
-        file_path = files[0]
-        try:
-            stat = file_path.stat()
-            
-            # Crear ventana de propiedades
-            props_window = tk.Toplevel(self.root)
-            props_window.title(f"Propiedades - {file_path.name}")
-            props_window.geometry("400x300")
-            props_window.resizable(False, False)
-            
-            # Información
-            info_frame = ttk.LabelFrame(props_window, text="Información General")
-            info_frame.pack(fill='x', padx=10, pady=5)
-            
-            ttk.Label(info_frame, text=f"Nombre: {file_path.name}").pack(anchor='w', padx=5, pady=2)
-            ttk.Label(info_frame, text=f"Tipo: {self.get_file_type(file_path)}").pack(anchor='w', padx=5, pady=2)
-            ttk.Label(info_frame, text=f"Ubicación: {file_path.parent}").pack(anchor='w', padx=5, pady=2)
-            
-            if file_path.is_file():
-                ttk.Label(info_frame, text=f"Tamaño: {self.format_size(stat.st_size)}").pack(anchor='w', padx=5, pady=2)
-            
-            # Fechas
-            dates_frame = ttk.LabelFrame(props_window, text="Fechas")
-            dates_frame.pack(fill='x', padx=10, pady=5)
-            
-            created = datetime.fromtimestamp(stat.st_ctime).strftime('%Y-%m-%d %H:%M:%S')
-            modified = datetime.fromtimestamp(stat.st_mtime).strftime('%Y-%m-%d %H:%M:%S')
-            accessed = datetime.fromtimestamp(stat.st_atime).strftime('%Y-%m-%d %H:%M:%S')
-            
-            ttk.Label(dates_frame, text=f"Creado: {created}").pack(anchor='w', padx=5, pady=2)
-            ttk.Label(dates_frame, text=f"Modificado: {modified}").pack(anchor='w', padx=5, pady=2)
-            ttk.Label(dates_frame, text=f"Accedido: {accessed}").pack(anchor='w', padx=5, pady=2)
-            
-            # Permisos
-            perms_frame = ttk.LabelFrame(props_window, text="Permisos")
-            perms_frame.pack(fill='x', padx=10, pady=5)
-            
-            mode = stat.st_mode
-            permissions = []
-            if mode & 0o400: permissions.append("Lectura (propietario)")
-            if mode & 0o200: permissions.append("Escritura (propietario)")
-            if mode & 0o100: permissions.append("Ejecución (propietario)")
-            if mode & 0o040: permissions.append("Lectura (grupo)")
-            if mode & 0o020: permissions.append("Escritura (grupo)")
-            if mode & 0o010: permissions.append("Ejecución (grupo)")
-            if mode & 0o004: permissions.append("Lectura (otros)")
-            if mode & 0o002: permissions.append("Escritura (otros)")
-            if mode & 0o001: permissions.append("Ejecución (otros)")
-            
-            for perm in permissions:
-                ttk.Label(perms_frame, text=f"• {perm}").pack(anchor='w', padx=5, pady=1)
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al obtener propiedades: {str(e)}")
-    
-    # Búsqueda
-    def search_files(self, event=None):
-        """Busca archivos en la carpeta actual"""
-        query = self.search_entry.get().strip()
-        if not query:
-            self.refresh_view()  # Restaurar vista normal
-            return
-        
-        # Limpiar vista
-        for item in self.file_tree.get_children():
-            self.file_tree.delete(item)
-        
-        try:
-            matches = []
-            for item in self.current_path.rglob(f"*{query}*"):
-                if item.name.startswith('.') and not getattr(self, 'show_hidden', False):
-                    continue
-                
-                try:
-                    stat = item.stat()
-                    size = self.format_size(stat.st_size) if item.is_file() else ""
-                    file_type = "Carpeta" if item.is_dir() else self.get_file_type(item)
-                    modified = datetime.fromtimestamp(stat.st_mtime).strftime('%Y-%m-%d %H:%M')
-                    
-                    matches.append({
-                        'name': str(item.relative_to(self.current_path)),
-                        'path': str(item),
-                        'is_dir': item.is_dir(),
-                        'size': size,
-                        'type': file_type,
-                        'modified': modified,
-                        'icon': '📁' if item.is_dir() else self.get_file_icon(item)
-                    })
-                except (PermissionError, OSError):
-                    continue
-            
-            # Mostrar resultados
-            for match in matches:
-                self.file_tree.insert('', 'end',
-                                    text=match['icon'],
-                                    values=(match['name'], match['size'], match['type'], match['modified']),
-                                    tags=('directory' if match['is_dir'] else 'file',))
-            
-            self.status_label.config(text=f"Encontrados {len(matches)} elementos para '{query}'")
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Error en la búsqueda: {str(e)}")
-        # Insertar resultados
-            matches.sort(key=lambda x: (not x['is_dir'], x['name'].lower()))
-            for match in matches:
-                self.file_tree.insert('', 'end',
-                                    text=match['icon'],
-                                    values=(match['name'], match['size'], match['type'], match['modified']),
-                                    tags=('directory' if match['is_dir'] else 'file',))
-            
-            self.status_label.config(text=f"Encontrados {len(matches)} elementos para '{query}'")
-            
-        except Exception as e:
-            messagebox.showerror("Error", f"Error en la búsqueda: {str(e)}")
-    
-    # Marcadores
-    def add_bookmark(self):
-        """Añade la carpeta actual a marcadores"""
-        if str(self.current_path) not in self.bookmarks:
-            self.bookmarks.append(str(self.current_path))
-            self.save_config()
-            self.populate_sidebar()
-            messagebox.showinfo("Marcador", f"Marcador añadido: {self.current_path.name}")
-        else:
-            messagebox.showinfo("Marcador", "Esta carpeta ya está en marcadores")
-    
-    def manage_bookmarks(self):
-        """Abre ventana para gestionar marcadores"""
-        if not self.bookmarks:
-            messagebox.showinfo("Marcadores", "No hay marcadores guardados")
-            return
-        
-        # Crear ventana
-        bookmarks_window = tk.Toplevel(self.root)
-        bookmarks_window.title("Gestionar Marcadores")
-        bookmarks_window.geometry("500x300")
-        bookmarks_window.resizable(True, True)
-        
-        # Lista de marcadores
-        frame = ttk.Frame(bookmarks_window)
-        frame.pack(fill='both', expand=True, padx=10, pady=10)
-        
-        ttk.Label(frame, text="Marcadores guardados:", font=('Arial', 12, 'bold')).pack(anchor='w', pady=(0, 5))
-        
-        listbox = tk.Listbox(frame, selectmode='single')
-        listbox.pack(fill='both', expand=True, pady=(0, 10))
-        
-        # Poblar lista
-        for bookmark in self.bookmarks:
-            display_name = f"{os.path.basename(bookmark)} ({bookmark})"
-            listbox.insert(tk.END, display_name)
-        
-        # Botones
-        button_frame = ttk.Frame(frame)
-        button_frame.pack(fill='x')
-        
-        def go_to_bookmark():
-            selection = listbox.curselection()
-            if selection:
-                bookmark_path = self.bookmarks[selection[0]]
-                if os.path.exists(bookmark_path):
-                    self.navigate_to_path(bookmark_path)
-                    bookmarks_window.destroy()
-                else:
-                    messagebox.showerror("Error", "El marcador ya no existe")
-        
-        def remove_bookmark():
-            selection = listbox.curselection()
-            if selection:
-                removed_bookmark = self.bookmarks.pop(selection[0])
-                listbox.delete(selection[0])
-                self.save_config()
-                self.populate_sidebar()
-                messagebox.showinfo("Marcador", f"Marcador eliminado: {os.path.basename(removed_bookmark)}")
-        
-        ttk.Button(button_frame, text="Ir a", command=go_to_bookmark).pack(side='left', padx=(0, 5))
-        ttk.Button(button_frame, text="Eliminar", command=remove_bookmark).pack(side='left', padx=5)
-        ttk.Button(button_frame, text="Cerrar", command=bookmarks_window.destroy).pack(side='right')
-    
-    # Gestión WiFi
-    def open_wifi_manager(self):
-        """Abre el gestor de WiFi"""
-        wifi_window = tk.Toplevel(self.root)
-        wifi_window.title("Gestión WiFi")
-        wifi_window.geometry("600x400")
-        wifi_window.resizable(True, True)
-        
-        # Frame principal
-        main_frame = ttk.Frame(wifi_window)
-        main_frame.pack(fill='both', expand=True, padx=10, pady=10)
-        
-        # Estado actual
-        status_frame = ttk.LabelFrame(main_frame, text="Estado Actual")
-        status_frame.pack(fill='x', pady=(0, 10))
-        
-        current_conn = WiFiManager.get_current_connection()
-        status_text = f"Conectado a: {current_conn}" if current_conn else "Desconectado"
-        self.wifi_status_label = ttk.Label(status_frame, text=status_text, font=('Arial', 11))
-        self.wifi_status_label.pack(pady=10)
-        
-        # Botones de control
-        control_frame = ttk.Frame(status_frame)
-        control_frame.pack(pady=5)
-        
-        ttk.Button(control_frame, text="Escanear Redes", 
-                    command=lambda: self.scan_wifi_networks(networks_tree)).pack(side='left', padx=5)
-        ttk.Button(control_frame, text="Desconectar", 
-                    command=lambda: self.disconnect_wifi(wifi_window)).pack(side='left', padx=5)
-        
-        # Lista de redes
-        networks_frame = ttk.LabelFrame(main_frame, text="Redes Disponibles")
-        networks_frame.pack(fill='both', expand=True, pady=(0, 10))
-        
-        # Treeview para redes
-        columns = ('SSID', 'Señal', 'Seguridad')
-        networks_tree = ttk.Treeview(networks_frame, columns=columns, show='headings', height=10)
-        
-        # Configurar columnas
-        for col in columns:
-            networks_tree.heading(col, text=col)
-            if col == 'SSID':
-                networks_tree.column(col, width=250, minwidth=200)
-            elif col == 'Señal':
-                networks_tree.column(col, width=100, minwidth=80)
-            else:
-                networks_tree.column(col, width=120, minwidth=100)
-        
-        # Scrollbar
-        scrollbar = ttk.Scrollbar(networks_frame, orient='vertical', command=networks_tree.yview)
-        networks_tree.configure(yscrollcommand=scrollbar.set)
-        
-        networks_tree.pack(side='left', fill='both', expand=True)
-        scrollbar.pack(side='right', fill='y')
-        
-        # Evento doble clic
-        networks_tree.bind('<Double-1>', lambda e: self.connect_to_wifi(networks_tree, wifi_window))
-        
-        # Botones inferiores
-        button_frame = ttk.Frame(main_frame)
-        button_frame.pack(fill='x')
-        
-        ttk.Button(button_frame, text="Conectar", 
-                    command=lambda: self.connect_to_wifi(networks_tree, wifi_window)).pack(side='left', padx=5)
-        ttk.Button(button_frame, text="Actualizar", 
-                    command=lambda: self.scan_wifi_networks(networks_tree)).pack(side='left', padx=5)
-        ttk.Button(button_frame, text="Cerrar", command=wifi_window.destroy).pack(side='right')
-        
-        # Escanear redes al abrir
-        self.scan_wifi_networks(networks_tree)
-    
-    def scan_wifi_networks(self, tree_widget):
-        """Escanea y muestra redes WiFi"""
-        # Limpiar lista
-        for item in tree_widget.get_children():
-            tree_widget.delete(item)
-        
-        def scan_thread():
-            networks = WiFiManager.scan_networks()
-            
-            # Actualizar en el hilo principal
-            def update_ui():
-                for network in networks:
-                    signal_bars = "📶" * min(4, int(network['signal']) // 25 + 1)
-                    tree_widget.insert('', 'end', values=(
-                        network['ssid'],
-                        f"{signal_bars} {network['signal']}%",
-                        network['security']
-                    ))
-                
-                if not networks:
-                    tree_widget.insert('', 'end', values=("No se encontraron redes", "", ""))
-            
-            tree_widget.after(0, update_ui)
-        
-        thread = threading.Thread(target=scan_thread)
-        thread.daemon = True
-        thread.start()
-    
-    def connect_to_wifi(self, tree_widget, parent_window):
-        """Conecta a la red WiFi seleccionada"""
-        selection = tree_widget.selection()
-        if not selection:
-            messagebox.showwarning("Advertencia", "Seleccione una red para conectar")
-            return
-        
-        item = tree_widget.item(selection[0])
-        ssid = item['values'][0]
-        security = item['values'][2]
-        
-        if ssid == "No se encontraron redes":
-            return
-        
-        password = None
-        if 'WPA' in security or 'WEP' in security:
-            password = simpledialog.askstring("Contraseña WiFi", 
-                                                f"Ingrese la contraseña para '{ssid}':", 
-                                                show='*', parent=parent_window)
-            if password is None:  # Usuario canceló
-                return
-        
-        # Crear ventana de progreso
-        progress_window = tk.Toplevel(parent_window)
-        progress_window.title("Conectando...")
-        progress_window.geometry("300x100")
-        progress_window.resizable(False, False)
-        progress_window.transient(parent_window)
-        progress_window.grab_set()
-        
-        ttk.Label(progress_window, text=f"Conectando a {ssid}...").pack(pady=10)
-        progress_bar = ttk.Progressbar(progress_window, mode='indeterminate')
-        progress_bar.pack(pady=10, padx=20, fill='x')
-        progress_bar.start()
-        
-        def connect_thread():
-            success, message = WiFiManager.connect_to_network(ssid, password)
-            
-            def update_result():
-                progress_bar.stop()
-                progress_window.destroy()
-                
-                if success:
-                    messagebox.showinfo("Éxito", f"Conectado exitosamente a {ssid}")
-                    self.update_wifi_status()
-                    parent_window.destroy()
-                else:
-                    messagebox.showerror("Error", f"No se pudo conectar: {message}")
-            
-            progress_window.after(0, update_result)
-        
-        thread = threading.Thread(target=connect_thread)
-        thread.daemon = True
-        thread.start()
-    
-    def disconnect_wifi(self, parent_window):
-        """Desconecta del WiFi actual"""
-        if messagebox.askyesno("Confirmar", "¿Desea desconectarse de la red WiFi?", parent=parent_window):
-            success, message = WiFiManager.disconnect()
-            if success:
-                messagebox.showinfo("Éxito", "Desconectado exitosamente")
-                self.update_wifi_status()
-                parent_window.destroy()
-            else:
-                messagebox.showerror("Error", f"Error al desconectar: {message}")
-    
-    def update_wifi_status(self):
-        """Actualiza el estado del WiFi en la barra de estado"""
-        current_conn = WiFiManager.get_current_connection()
-        if current_conn:
-            self.wifi_label.config(text=f"📶 {current_conn}")
-        else:
-            self.wifi_label.config(text="📶 Sin conexión")
-    
-    # Control de volumen
-    def open_volume_control(self):
-        """Abre el control de volumen avanzado"""
-        volume_window = tk.Toplevel(self.root)
-        volume_window.title("Control de Volumen")
-        volume_window.geometry("400x200")
-        volume_window.resizable(False, False)
-        
-        # Frame principal
-        main_frame = ttk.Frame(volume_window)
-        main_frame.pack(fill='both', expand=True, padx=20, pady=20)
-        
-        # Título
-        ttk.Label(main_frame, text="Control de Volumen del Sistema", 
-                    font=('Arial', 14, 'bold')).pack(pady=(0, 20))
-        
-        # Control de volumen
-        volume_frame = ttk.Frame(main_frame)
-        volume_frame.pack(fill='x', pady=10)
-        
-        ttk.Label(volume_frame, text="🔊 Volumen:", font=('Arial', 12)).pack(anchor='w')
-        
-        self.volume_var = tk.IntVar(value=VolumeManager.get_volume())
-        volume_scale = ttk.Scale(volume_frame, from_=0, to=100, orient='horizontal',
-                                variable=self.volume_var, length=300,
-                                command=self.on_volume_control_change)
-        volume_scale.pack(fill='x', pady=5)
-        
-        # Etiqueta de porcentaje
-        self.volume_percent_label = ttk.Label(volume_frame, text=f"{self.volume_var.get()}%", 
-                                            font=('Arial', 11))
-        self.volume_percent_label.pack()
-        
-        # Botones
-        button_frame = ttk.Frame(main_frame)
-        button_frame.pack(fill='x', pady=20)
-        
-        mute_text = "🔇 Dessilenciar" if VolumeManager.is_muted() else "🔇 Silenciar"
-        self.mute_button = ttk.Button(button_frame, text=mute_text, command=self.toggle_mute_advanced)
-        self.mute_button.pack(side='left')
-        
-        ttk.Button(button_frame, text="Cerrar", command=volume_window.destroy).pack(side='right')
-    
-    def on_volume_control_change(self, value):
-        """Maneja cambios en el control de volumen avanzado"""
-        volume = int(float(value))
-        VolumeManager.set_volume(volume)
-        self.volume_percent_label.config(text=f"{volume}%")
-        self.volume_scale.set(volume)  # Actualizar control en barra de estado
-    
-    def toggle_mute_advanced(self):
-        """Alterna silencio en control avanzado"""
-        VolumeManager.toggle_mute()
-        is_muted = VolumeManager.is_muted()
-        mute_text = "🔇 Dessilenciar" if is_muted else "🔇 Silenciar"
-        self.mute_button.config(text=mute_text)
-    
-    def on_volume_change(self, value):
-        """Maneja cambios en el control de volumen de la barra de estado"""
-        volume = int(float(value))
-        VolumeManager.set_volume(volume)
-    
-    # Herramientas del sistema
-    def open_terminal(self):
-        """Abre terminal en la carpeta actual"""
-        terminals = ['gnome-terminal', 'konsole', 'xfce4-terminal', 'lxterminal', 'xterm']
-        
-        for terminal in terminals:
-            if shutil.which(terminal):
-                try:
-                    if terminal in ['gnome-terminal', 'xfce4-terminal']:
-                        subprocess.Popen([terminal, '--working-directory', str(self.current_path)])
-                    elif terminal == 'konsole':
-                        subprocess.Popen([terminal, '--workdir', str(self.current_path)])
-                    else:
-                        subprocess.Popen([terminal], cwd=str(self.current_path))
-                    return
-                except:
-                    continue
-        
-        messagebox.showerror("Error", "No se pudo abrir terminal")
-    
-    def open_system_monitor(self):
-        """Abre monitor del sistema"""
-        monitors = ['gnome-system-monitor', 'ksysguard', 'xfce4-taskmanager', 'htop']
-        
-        for monitor in monitors:
-            if shutil.which(monitor):
-                try:
-                    if monitor == 'htop':
-                        # Abrir htop en terminal
-                        terminals = ['gnome-terminal', 'konsole', 'xfce4-terminal', 'xterm']
-                        for terminal in terminals:
-                            if shutil.which(terminal):
-                                if terminal == 'gnome-terminal':
-                                    subprocess.Popen([terminal, '--', 'htop'])
-                                elif terminal == 'konsole':
-                                    subprocess.Popen([terminal, '-e', 'htop'])
-                                else:
-                                    subprocess.Popen([terminal, '-e', 'htop'])
-                                return
-                    else:
-                        subprocess.Popen([monitor])
-                        return
-                except:
-                    continue
-        
-        messagebox.showerror("Error", "No se pudo abrir monitor del sistema")
-    
-    # Configuración
-    def toggle_hidden_files(self):
-        """Alterna mostrar archivos ocultos"""
-        self.show_hidden = not getattr(self, 'show_hidden', False)
-        self.refresh_view()
-        status = "mostrados" if self.show_hidden else "ocultos"
-        self.status_label.config(text=f"Archivos ocultos {status}")
-    
-    def load_config(self):
-        """Carga configuración desde archivo"""
-        config_file = Path.home() / '.file_explorer_config.json'
-        try:
-            if config_file.exists():
-                with open(config_file, 'r') as f:
-                    config = json.load(f)
-                    self.bookmarks = config.get('bookmarks', [])
-                    self.show_hidden = config.get('show_hidden', False)
-        except:
-            self.bookmarks = []
-            self.show_hidden = False
-    
-    def save_config(self):
-        """Guarda configuración a archivo"""
-        config_file = Path.home() / '.file_explorer_config.json'
-        try:
-            config = {
-                'bookmarks': self.bookmarks,
-                'show_hidden': getattr(self, 'show_hidden', False)
-            }
-            with open(config_file, 'w') as f:
-                json.dump(config, f, indent=2)
-        except Exception as e:
-            print(f"Error guardando configuración: {e}")
-    
-    # Instalación de dependencias
-    def install_dependencies(self):
-        """Instala dependencias necesarias"""
-        if messagebox.askyesno("Instalar Dependencias", 
-                                "¿Desea instalar todas las dependencias necesarias?\n" +
-                                "Esto incluye visores de imágenes, reproductores de video, " +
-                                "editores de texto y herramientas del sistema.\n\n" +
-                                "Se requieren permisos de administrador."):
-            DependencyManager.install_dependencies()
-    
-    # Acerca de
-    def show_about(self):
-        """Muestra información sobre la aplicación"""
-        about_text = """
-            Explorador de Archivos Linux v1.0
-
-            Diseñado especialmente para usuarios nuevos de Linux.
-
-            Características:
-            • Exploración completa de archivos y carpetas
-            • Gestión de WiFi integrada
-            • Control de volumen del sistema
-            • Instalación automática de dependencias
-            • Soporte para múltiples formatos de archivo
-            • Marcadores y accesos rápidos
-            • Búsqueda de archivos
-            • Terminal integrado
-
-            Desarrollado con Python y Tkinter
-            Autor: Asistente Claude
-
-            © 2024 - Software Libre
-        """
-        
-        messagebox.showinfo("Acerca de", about_text.strip())
-
-def main():
-    """Función principal"""
-    # Verificar que estamos en Linux
-    if sys.platform not in ['linux', 'linux2']:
-        print("Error: Esta aplicación está diseñada solo para sistemas Linux")
-        sys.exit(1)
-    
-    # Crear ventana principal
-    root = tk.Tk()
-    
-    # Configurar tema oscuro si está disponible
-    try:
-        root.tk.call('source', '/usr/share/themes/Adwaita-dark/gtk-3.0/gtk.css')
-    except:
-        pass
-    
-    # Crear aplicación
-    app = FileExplorer(root)
-    
-    # Configurar cierre
-    def on_closing():
-        app.save_config()
-        root.destroy()
-    
-    root.protocol("WM_DELETE_WINDOW", on_closing)
-    
-    # Centrar ventana
-    root.update_idletasks()
-    x = (root.winfo_screenwidth() // 2) - (root.winfo_width() // 2)
-    y = (root.winfo_screenheight() // 2) - (root.winfo_height() // 2)
-    root.geometry(f"+{x}+{y}")
-    
-    # Iniciar aplicación
-    root.mainloop()
-
-if __name__ == "__main__":
+import tkinter as tk
+from tkinter import ttk, filedialog, messagebox, simpledialog
+import tkinter.font as tkfont
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path, PurePath
+import json
+import shutil
+import mimetypes
+import stat
+from datetime import datetime
+import re
+import argparse
+import shlex
+import errno
+from urllib.parse import quote
+import hashlib
+import tarfile
+import zipfile
+import zlib
+import tempfile
+import collections
+import queue
+import struct
+import multiprocessing
+import codecs
+import bisect
+from array import array
+import ctypes
+import asyncio
+import cProfile
+import traceback
+import tracemalloc
+import ctypes.util
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+try:
+    from PIL import Image, ImageTk
+    from PIL.PngImagePlugin import PngInfo
+except ImportError:  # Pillow es opcional (python3-pil, python3-pil.imagetk)
+    Image = ImageTk = PngInfo = None
+
+def cache_path(*parts):
+    """Ruta dentro de la caché de la aplicación ($XDG_CACHE_HOME/linux-file-explorer)"""
+    base = os.environ.get('XDG_CACHE_HOME') or str(Path.home() / '.cache')
+    return os.path.join(base, 'linux-file-explorer', *parts)
+
+class Span:
+    """Intervalo medido por Profiler.span (usar con with)"""
+
+    __slots__ = ('name', 'items', 'start', 'capture')
+
+    def __init__(self, name):
+        self.name = name
+        self.items = 0        # Elementos procesados, para el rendimiento por elemento
+        self.capture = None
+
+    def __enter__(self):
+        self.capture = Profiler.take_capture(self.name)
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter_ns() - self.start
+        if self.capture:
+            Profiler.save_capture(*self.capture)
+        Profiler.record(self.name, elapsed, self.items)
+        return False
+
+class Profiler:
+    """Tiempos por fase de las operaciones frecuentes
+
+    Las operaciones abren intervalos con Profiler.span('refresh_view.scan')
+    o el decorador Profiler.timed; solo se acumulan contadores y las
+    últimas muestras, así que la medición está siempre activa. capture()
+    envuelve la siguiente ejecución de una operación en cProfile y guarda
+    el resultado como .pstats.
+    """
+
+    SAMPLES = 256  # Muestras recientes por operación para p50/p95
+
+    _lock = threading.Lock()
+    stats = {}
+    _captures = {}       # operación -> ruta .pstats pendiente
+    last_capture = None  # Ruta del último .pstats guardado
+
+    @staticmethod
+    def span(name):
+        return Span(name)
+
+    @classmethod
+    def timed(cls, name):
+        """Decorador: mide cada llamada a la función como una operación"""
+        def decorator(function):
+            def wrapper(*args, **kwargs):
+                with Span(name):
+                    return function(*args, **kwargs)
+            wrapper.__name__ = function.__name__
+            wrapper.__doc__ = function.__doc__
+            return wrapper
+        return decorator
+
+    @classmethod
+    def record(cls, name, elapsed_ns, items=0):
+        with cls._lock:
+            entry = cls.stats.get(name)
+            if entry is None:
+                entry = cls.stats[name] = {'count': 0, 'items': 0, 'total_ns': 0, 'max_ns': 0,
+                                           'samples': collections.deque(maxlen=cls.SAMPLES)}
+            entry['count'] += 1
+            entry['items'] += items
+            entry['total_ns'] += elapsed_ns
+            entry['max_ns'] = max(entry['max_ns'], elapsed_ns)
+            entry['samples'].append(elapsed_ns)
+
+    @classmethod
+    def snapshot(cls):
+        """Resumen por operación en milisegundos"""
+        with cls._lock:
+            entries = {name: (dict(entry), sorted(entry['samples'])) for name, entry in cls.stats.items()}
+        summary = {}
+        for name, (entry, samples) in entries.items():
+            summary[name] = {
+                'count': entry['count'],
+                'items': entry['items'],
+                'total_ms': entry['total_ns'] / 1e6,
+                'mean_ms': entry['total_ns'] / entry['count'] / 1e6,
+                'p50_ms': samples[len(samples) // 2] / 1e6,
+                'p95_ms': samples[min(len(samples) - 1, int(len(samples) * 0.95))] / 1e6,
+                'max_ms': entry['max_ns'] / 1e6,
+            }
+        return summary
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls.stats.clear()
+
+    @classmethod
+    def capture(cls, name, path=None):
+        """Perfila con cProfile la próxima ejecución de la operación; devuelve la ruta"""
+        path = path or cache_path('profiles', f"{name}-{time.strftime('%Y%m%d-%H%M%S')}.pstats")
+        with cls._lock:
+            cls._captures[name] = path
+        return path
+
+    @classmethod
+    def pending_captures(cls):
+        with cls._lock:
+            return dict(cls._captures)
+
+    @classmethod
+    def take_capture(cls, name):
+        if not cls._captures:  # Camino rápido sin bloqueo
+            return None
+        with cls._lock:
+            path = cls._captures.pop(name, None)
+        if path is None:
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:  # Ya hay otro perfilador activo en este hilo
+            return None
+        return profile, path
+
+    @classmethod
+    def save_capture(cls, profile, path):
+        profile.disable()
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            profile.dump_stats(path)
+            cls.last_capture = path
+        except OSError as e:
+            print(f"Error guardando el perfil {path}: {e}", file=sys.stderr)
+
+    @classmethod
+    def report(cls):
+        """Tabla de texto con las operaciones y los comandos externos"""
+        lines = [f"{'operación':<32} {'llamadas':>8} {'elementos':>10} {'total ms':>10} "
+                 f"{'p50 ms':>9} {'p95 ms':>9} {'máx ms':>9}"]
+        for name, entry in sorted(cls.snapshot().items()):
+            lines.append(f"{name:<32} {entry['count']:>8} {entry['items']:>10} {entry['total_ms']:>10.1f} "
+                         f"{entry['p50_ms']:>9.2f} {entry['p95_ms']:>9.2f} {entry['max_ms']:>9.2f}")
+        executor = CommandExecutor._instance
+        if executor:
+            lines.append("")
+            lines.append(f"{'comando':<32} {'llamadas':>8} {'errores':>10} {'total ms':>10} "
+                         f"{'p50 ≤ms':>9} {'p95 ≤ms':>9} {'máx ms':>9}")
+            for name, entry in sorted(executor.snapshot().items()):
+                lines.append(f"{name:<32} {entry['count']:>8} {entry['errors'] + entry['timeouts']:>10} "
+                             f"{entry['total_ms']:>10.1f} {executor.percentile(entry, 0.5):>9.0f} "
+                             f"{executor.percentile(entry, 0.95):>9.0f} {entry['max_ms']:>9.1f}")
+        return "\n".join(lines)
+
+class CommandStream:
+    """Salida línea a línea de un proceso de larga duración (nmcli monitor, ...)"""
+
+    def __init__(self, executor):
+        self.executor = executor
+        self.process = None
+        self.lines = queue.Queue()
+
+    def get(self, timeout=None):
+        """Siguiente línea; None al terminar el proceso y queue.Empty si vence el plazo"""
+        return self.lines.get(timeout=timeout)
+
+    @property
+    def returncode(self):
+        return self.process.returncode if self.process else None
+
+    def terminate(self):
+        def terminate():
+            if self.process and self.process.returncode is None:
+                try:
+                    self.process.terminate()
+                except ProcessLookupError:
+                    pass
+        self.executor.loop.call_soon_threadsafe(terminate)
+
+class CommandExecutor:
+    """Ejecutor central de comandos externos
+
+    Un bucle asyncio en un hilo propio lanza todos los procesos: cada
+    ejecución tiene tiempo límite, cada herramienta un máximo de procesos
+    simultáneos, las aplicaciones lanzadas sin esperar se recogen al
+    terminar (sin zombis) y se guarda un histograma de latencias por
+    nombre de comando.
+    """
+
+    DEFAULT_TIMEOUT = 30
+    DEFAULT_LIMIT = 4
+    LIMITS = {'nmcli': 2, 'pactl': 2, 'sudo': 1}
+    SUBCOMMAND_TOOLS = ('nmcli', 'pactl', 'sudo')  # Su subcomando forma parte del nombre
+    BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000)
+
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def instance(cls):
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+            return cls._instance
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._semaphores = {}
+        self._children = set()   # Tareas que esperan a los procesos lanzados
+        self._stats_lock = threading.Lock()
+        self.stats = {}          # nombre -> contadores e histograma
+        threading.Thread(target=self.loop.run_forever, name='command-executor', daemon=True).start()
+
+    @classmethod
+    def command_name(cls, argv):
+        """Nombre para las métricas: la herramienta y, en nmcli/pactl/sudo, su subcomando
+
+        Los demás argumentos (rutas de archivos, sobre todo) no entran en el
+        nombre: cada archivo abierto crearía una fila nueva en las métricas.
+        """
+        name = os.path.basename(argv[0])
+        if name in cls.SUBCOMMAND_TOOLS:
+            for arg in argv[1:]:
+                if re.fullmatch(r'[a-z][a-z0-9-]*', arg):
+                    return f'{name} {arg}'
+        return name
+
+    def _semaphore(self, argv):
+        # Solo se llama desde el hilo del bucle
+        tool = os.path.basename(argv[0])
+        if tool not in self._semaphores:
+            self._semaphores[tool] = asyncio.Semaphore(self.LIMITS.get(tool, self.DEFAULT_LIMIT))
+        return self._semaphores[tool]
+
+    def record(self, name, elapsed, outcome='ok'):
+        milliseconds = elapsed * 1000
+        with self._stats_lock:
+            entry = self.stats.setdefault(name, {
+                'count': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'errors': 0, 'timeouts': 0,
+                'buckets': [0] * (len(self.BUCKETS_MS) + 1)})
+            entry['count'] += 1
+            entry['total_ms'] += milliseconds
+            entry['max_ms'] = max(entry['max_ms'], milliseconds)
+            entry['buckets'][bisect.bisect_left(self.BUCKETS_MS, milliseconds)] += 1
+            if outcome == 'timeout':
+                entry['timeouts'] += 1
+            elif outcome == 'error':
+                entry['errors'] += 1
+
+    def snapshot(self):
+        """Copia de las métricas por comando"""
+        with self._stats_lock:
+            return {name: dict(entry, buckets=list(entry['buckets'])) for name, entry in self.stats.items()}
+
+    @classmethod
+    def percentile(cls, entry, fraction):
+        """Cota superior (ms) del cubo que contiene el percentil pedido"""
+        target = entry['count'] * fraction
+        seen = 0
+        for index, count in enumerate(entry['buckets']):
+            seen += count
+            if count and seen >= target:
+                return cls.BUCKETS_MS[index] if index < len(cls.BUCKETS_MS) else entry['max_ms']
+        return 0
+
+    async def _run(self, argv, name, timeout, input, cwd):
+        async with self._semaphore(argv):
+            start = time.perf_counter()
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *argv, cwd=cwd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                    stdin=subprocess.PIPE if input is not None else subprocess.DEVNULL)
+            except OSError:
+                self.record(name, time.perf_counter() - start, 'error')
+                raise
+            try:
+                stdout, stderr = await asyncio.wait_for(
+                    process.communicate(input.encode() if input is not None else None), timeout)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                self.record(name, time.perf_counter() - start, 'timeout')
+                raise subprocess.TimeoutExpired(argv, timeout)
+            self.record(name, time.perf_counter() - start, 'ok' if process.returncode == 0 else 'error')
+            return subprocess.CompletedProcess(argv, process.returncode,
+                                                stdout.decode('utf-8', errors='replace'),
+                                                stderr.decode('utf-8', errors='replace'))
+
+    def run(self, argv, name=None, timeout=DEFAULT_TIMEOUT, input=None, cwd=None, check=False):
+        """Ejecuta un comando y espera su salida (no llamar desde el hilo de la interfaz)"""
+        argv = [str(arg) for arg in argv]
+        coroutine = self._run(argv, name or self.command_name(argv), timeout, input, cwd)
+        result = asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+        if check and result.returncode != 0:
+            raise subprocess.CalledProcessError(result.returncode, argv, result.stdout, result.stderr)
+        return result
+
+    async def _spawn(self, argv, name, cwd):
+        start = time.perf_counter()
+        try:
+            process = await asyncio.create_subprocess_exec(*argv, cwd=cwd, stdin=subprocess.DEVNULL,
+                                                            start_new_session=True)
+        except OSError:
+            self.record(name, time.perf_counter() - start, 'error')
+            raise
+        self.record(name, time.perf_counter() - start)
+        # Esperar al proceso en el bucle evita que quede zombi al cerrarse
+        task = self.loop.create_task(process.wait())
+        self._children.add(task)
+        task.add_done_callback(self._children.discard)
+        return process.pid
+
+    def spawn(self, argv, name=None, cwd=None):
+        """Lanza una aplicación sin esperarla; lanza OSError si no se puede ejecutar"""
+        argv = [str(arg) for arg in argv]
+        coroutine = self._spawn(argv, name or self.command_name(argv), cwd)
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result(self.DEFAULT_TIMEOUT)
+
+    async def _start_stream(self, argv, name, stream, limited):
+        # El hueco de la herramienta se ocupa mientras viva el proceso
+        semaphore = self._semaphore(argv) if limited else None
+        if semaphore:
+            await semaphore.acquire()
+        start = time.perf_counter()
+        try:
+            process = await asyncio.create_subprocess_exec(*argv, stdin=subprocess.DEVNULL,
+                                                            stdout=subprocess.PIPE,
+                                                            stderr=subprocess.STDOUT)
+        except OSError:
+            self.record(name, time.perf_counter() - start, 'error')
+            if semaphore:
+                semaphore.release()
+            raise
+        self.record(name, time.perf_counter() - start)
+        stream.process = process
+
+        async def read():
+            try:
+                async for line in process.stdout:
+                    stream.lines.put(line.decode('utf-8', errors='replace').rstrip('\n'))
+            finally:
+                await process.wait()
+                if semaphore:
+                    semaphore.release()
+                stream.lines.put(None)
+
+        task = self.loop.create_task(read())
+        self._children.add(task)
+        task.add_done_callback(self._children.discard)
+
+    def stream(self, argv, name=None, limited=True):
+        """Lanza un proceso de larga duración y devuelve un CommandStream con su salida
+
+        Con limited=False no cuenta para el máximo por herramienta: los
+        monitores que viven toda la sesión (nmcli monitor, pactl subscribe)
+        dejarían a su herramienta con un hueco menos para siempre. Espera a
+        que haya hueco, así que no se debe llamar desde el hilo de la interfaz.
+        """
+        argv = [str(arg) for arg in argv]
+        stream = CommandStream(self)
+        coroutine = self._start_stream(argv, name or self.command_name(argv), stream, limited)
+        asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+        return stream
+
+class DependencyManager:
+    """Gestor de dependencias automático"""
+    
+    REQUIRED_PACKAGES = {
+        'apt': [
+            'python3-pil',          # Para imágenes
+            'python3-pil.imagetk',  # Para mostrar imágenes en tkinter
+            'vlc',                  # Para reproducir videos/audio
+            'eog',                  # Visor de imágenes
+            'evince',               # Para PDFs
+            'gedit',                # Editor de texto
+            'network-manager',      # Para WiFi
+            'pulseaudio-utils',     # Para control de volumen
+            'imagemagick',          # Para manipulación de imágenes
+            'ffmpeg',               # Para multimedia
+            'unzip',                # Para archivos comprimidos
+            'p7zip-full',           # Para más formatos comprimidos
+        ],
+        'pacman': [
+            'python-pillow',
+            'vlc',
+            'eog',
+            'evince',
+            'gedit',
+            'networkmanager',
+            'pulseaudio',
+            'imagemagick',
+            'ffmpeg',
+            'unzip',
+            'p7zip',
+        ],
+        'dnf': [
+            'python3-pillow',
+            'python3-pillow-tk',
+            'vlc',
+            'eog',
+            'evince',
+            'gedit',
+            'NetworkManager',
+            'pulseaudio-utils',
+            'ImageMagick',
+            'ffmpeg',
+            'unzip',
+            'p7zip',
+        ]
+    }
+    
+    @staticmethod
+    def detect_package_manager():
+        """Detecta el gestor de paquetes del sistema"""
+        managers = {
+            'apt': '/usr/bin/apt',
+            'pacman': '/usr/bin/pacman',
+            'dnf': '/usr/bin/dnf',
+            'yum': '/usr/bin/yum'
+        }
+        
+        for manager, path in managers.items():
+            if os.path.exists(path):
+                return manager
+        return None
+    
+    @staticmethod
+    def install_dependencies():
+        """Instala todas las dependencias necesarias"""
+        manager = DependencyManager.detect_package_manager()
+        if not manager:
+            messagebox.showerror("Error", "No se pudo detectar el gestor de paquetes")
+            return False
+        
+        packages = DependencyManager.REQUIRED_PACKAGES.get(manager, [])
+        if not packages:
+            messagebox.showwarning("Advertencia", f"Gestor de paquetes {manager} no soportado")
+            return False
+        
+        # Crear ventana de progreso
+        progress_window = tk.Toplevel()
+        progress_window.title("Instalando Dependencias")
+        progress_window.geometry("400x150")
+        progress_window.resizable(False, False)
+        
+        label = tk.Label(progress_window, text="Instalando dependencias necesarias...")
+        label.pack(pady=10)
+        
+        progress_bar = ttk.Progressbar(progress_window, mode='indeterminate')
+        progress_bar.pack(pady=10, padx=20, fill='x')
+        progress_bar.start()
+        
+        text_widget = tk.Text(progress_window, height=4, width=50)
+        text_widget.pack(pady=5, padx=20, fill='both', expand=True)
+        
+        def append_output(line):
+            text_widget.insert(tk.END, line + '\n')
+            text_widget.see(tk.END)
+        
+        def finish(success, message):
+            progress_bar.stop()
+            if success:
+                label.config(text="¡Instalación completada!")
+                messagebox.showinfo("Éxito", message)
+            else:
+                label.config(text="Error en la instalación")
+                messagebox.showerror("Error", message)
+            progress_window.destroy()
+        
+        events = queue.Queue()  # Tk solo se toca desde el hilo principal
+        
+        def poll():
+            while True:
+                try:
+                    kind, value = events.get_nowait()
+                except queue.Empty:
+                    break
+                if kind == 'line':
+                    append_output(value)
+                else:
+                    finish(*value)
+                    return
+            progress_window.after(100, poll)
+        
+        def install_thread():
+            executor = CommandExecutor.instance()
+            try:
+                # Actualizar repositorios
+                if manager == 'apt':
+                    executor.run(['sudo', 'apt', 'update'], timeout=600, check=True)
+                    cmd = ['sudo', 'apt', 'install', '-y'] + packages
+                elif manager == 'pacman':
+                    executor.run(['sudo', 'pacman', '-Sy'], timeout=600, check=True)
+                    cmd = ['sudo', 'pacman', '-S', '--noconfirm'] + packages
+                elif manager == 'dnf':
+                    cmd = ['sudo', 'dnf', 'install', '-y'] + packages
+                
+                # Instalar paquetes mostrando la salida según llega
+                stream = executor.stream(cmd)
+                while True:
+                    output = stream.get()
+                    if output is None:
+                        break
+                    events.put(('line', output))
+                
+                if stream.returncode == 0:
+                    result = (True, "Todas las dependencias se instalaron correctamente")
+                else:
+                    result = (False, "Hubo un problema instalando las dependencias")
+            except Exception as e:
+                result = (False, f"Error: {str(e)}")
+            events.put(('done', result))
+        
+        thread = threading.Thread(target=install_thread)
+        thread.daemon = True
+        thread.start()
+        poll()
+        
+        return True
+
+class WiFiManager:
+    """Servicio de estado de red y conexiones WiFi
+
+    El estado se mantiene al día leyendo los eventos de un único
+    `nmcli monitor`, sin consultas periódicas. La salida se pide en formato
+    conciso (-t -f), donde los ':' dentro de un campo llegan escapados, y
+    el último escaneo se reutiliza durante SCAN_TTL segundos.
+    """
+
+    SCAN_TTL = 30            # s durante los que un escaneo se considera reciente
+    RESTART_DELAY = 2.0      # s antes de relanzar `nmcli monitor` si termina
+
+    def __init__(self, nmcli='nmcli'):
+        self.nmcli = nmcli
+        self.available = shutil.which(nmcli) is not None
+        self.connection = None   # SSID/conexión WiFi activa
+        self.device = None       # Interfaz WiFi (p. ej. wlan0)
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._scan = None        # (instante, redes)
+        self._monitor_stream = None
+        self._stop = threading.Event()
+        self._started = False
+
+    @staticmethod
+    def split_terse(line):
+        """Divide una línea de `nmcli -t` respetando '\\:' y '\\\\'"""
+        fields, current, escaped = [], [], False
+        for char in line:
+            if escaped:
+                current.append(char)
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == ':':
+                fields.append(''.join(current))
+                current = []
+            else:
+                current.append(char)
+        fields.append(''.join(current))
+        return fields
+
+    def add_listener(self, callback):
+        """callback() se llama desde un hilo de fondo cuando cambia la conexión"""
+        self._listeners.append(callback)
+
+    def start(self):
+        if self._started or not self.available:
+            return
+        self._started = True
+        threading.Thread(target=self._monitor, daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+        if self._monitor_stream:
+            self._monitor_stream.terminate()
+
+    def _run(self, name, *args, timeout=30):
+        return CommandExecutor.instance().run([self.nmcli, *args], name=f'nmcli {name}', timeout=timeout)
+
+    def get_current_connection(self):
+        """Conexión WiFi conocida más reciente (no lanza procesos)"""
+        return self.connection
+
+    @Profiler.timed('WiFiManager.refresh')
+    def refresh(self):
+        """Lee el estado de los dispositivos (llamar solo desde hilos de fondo)"""
+        try:
+            output = self._run('device status', '-t', '-f', 'DEVICE,TYPE,STATE,CONNECTION', 'device', 'status',
+                               timeout=10).stdout
+        except (OSError, subprocess.SubprocessError):
+            return
+        connection = device = None
+        for line in output.splitlines():
+            fields = self.split_terse(line)
+            if len(fields) < 4 or fields[1] != 'wifi':
+                continue
+            device = device or fields[0]
+            if fields[2] == 'connected':
+                connection, device = fields[3], fields[0]
+                break
+        with self._lock:
+            changed = (connection, device) != (self.connection, self.device)
+            self.connection, self.device = connection, device
+        if changed:
+            for callback in self._listeners:
+                callback()
+
+    def _monitor(self):
+        while not self._stop.is_set():
+            self.refresh()
+            try:
+                self._monitor_stream = CommandExecutor.instance().stream([self.nmcli, 'monitor'],
+                                                                          limited=False)
+            except OSError:
+                return
+            ended = False
+            while not ended and not self._stop.is_set():
+                if self._monitor_stream.get() is None:
+                    break
+                # Una conexión genera una ráfaga de eventos: esperar a que acabe
+                while True:
+                    try:
+                        if self._monitor_stream.get(timeout=0.2) is None:
+                            ended = True
+                            break
+                    except queue.Empty:
+                        break
+                self.refresh()
+            self._stop.wait(self.RESTART_DELAY)
+
+    def cached_networks(self):
+        """Devuelve (redes, reciente) del último escaneo, o (None, False)"""
+        with self._lock:
+            if not self._scan:
+                return None, False
+            scanned_at, networks = self._scan
+        return networks, time.monotonic() - scanned_at < self.SCAN_TTL
+
+    @Profiler.timed('WiFiManager.scan_networks')
+    def scan_networks(self, rescan=False):
+        """Escanea redes WiFi disponibles (bloquea: usar desde un hilo)"""
+        networks, fresh = self.cached_networks()
+        if fresh and not rescan:
+            return networks
+        try:
+            result = self._run('device wifi list', '-t', '-f', 'IN-USE,BSSID,SSID,SIGNAL,SECURITY', 'device',
+                               'wifi', 'list', '--rescan', 'yes' if rescan else 'auto')
+        except (OSError, subprocess.SubprocessError):
+            return networks or []
+        if result.returncode != 0:
+            return networks or []
+
+        # Una misma red aparece una vez por punto de acceso: quedarse con la más fuerte.
+        # Las ocultas no tienen SSID que las agrupe: cada punto de acceso es una fila
+        best = {}
+        for line in result.stdout.splitlines():
+            fields = self.split_terse(line)
+            if len(fields) < 5:
+                continue
+            in_use, bssid, ssid, signal, security = fields[:5]
+            key = ssid or bssid
+            signal = int(signal) if signal.isdigit() else 0
+            in_use = in_use == '*' or key in best and best[key]['in_use']
+            if key not in best or signal > best[key]['signal']:
+                best[key] = {
+                    'ssid': ssid,
+                    'bssid': bssid,
+                    'hidden': not ssid,
+                    'signal': signal,
+                    'security': security if security and security != '--' else 'Abierta',
+                    'in_use': in_use
+                }
+            best[key]['in_use'] = in_use
+        networks = sorted(best.values(), key=lambda n: (not n['in_use'], -n['signal']))
+        with self._lock:
+            self._scan = (time.monotonic(), networks)
+        return networks
+
+    def connect_to_network(self, ssid, password=None, bssid=None):
+        """Se conecta a una red WiFi; con bssid, a una red oculta de ese punto de acceso"""
+        cmd = ['device', 'wifi', 'connect', ssid]
+        if password:
+            cmd += ['password', password]
+        if bssid:
+            cmd += ['bssid', bssid, 'hidden', 'yes']
+        try:
+            result = self._run('device wifi connect', *cmd, timeout=60)
+        except (OSError, subprocess.SubprocessError) as e:
+            return False, f"Error: {str(e)}"
+        if result.returncode != 0:
+            return False, f"Error: {result.stderr}"
+        return True, "Conectado exitosamente"
+
+    def disconnect(self):
+        """Desconecta de la red WiFi actual"""
+        try:
+            result = self._run('device disconnect', 'device', 'disconnect', self.device or 'wlan0')
+        except (OSError, subprocess.SubprocessError):
+            return False, "Error al desconectar"
+        if result.returncode != 0:
+            return False, "Error al desconectar"
+        return True, "Desconectado"
+
+class VolumeManager:
+    """Servicio de volumen del sistema en segundo plano
+
+    Los cambios del deslizador solo guardan el último valor; un hilo los
+    aplica con pactl como mucho MAX_RATE veces por segundo. El estado se
+    mantiene al día con un único `pactl subscribe` de larga duración en vez
+    de consultar periódicamente, así que ningún método bloquea la interfaz.
+    """
+
+    MAX_RATE = 20           # escrituras por segundo como máximo
+    ECHO_WINDOW = 0.3       # s en los que se ignoran los eventos de nuestras escrituras
+    RESTART_DELAY = 2.0     # s antes de relanzar `pactl subscribe` si termina
+
+    def __init__(self, pactl='pactl'):
+        self.pactl = pactl
+        self.volume = 50
+        self.muted = False
+        self.available = shutil.which(pactl) is not None
+        self._listeners = []
+        self._condition = threading.Condition()
+        self._pending_volume = None
+        self._pending_toggles = 0
+        self._last_write = 0.0
+        self._subscriber = None   # CommandStream de `pactl subscribe`
+        self._stop = threading.Event()
+        self._started = False
+
+    def add_listener(self, callback):
+        """callback() se llama desde un hilo de fondo cuando cambia el estado"""
+        self._listeners.append(callback)
+
+    def start(self):
+        if self._started or not self.available:
+            return
+        self._started = True
+        threading.Thread(target=self._writer, daemon=True).start()
+        threading.Thread(target=self._monitor, daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+        with self._condition:
+            self._condition.notify()
+        if self._subscriber:
+            self._subscriber.terminate()
+
+    def get_volume(self):
+        """Volumen conocido más reciente (no lanza procesos)"""
+        return self.volume
+
+    def is_muted(self):
+        return self.muted
+
+    def set_volume(self, volume):
+        """Encola un cambio de volumen; los valores intermedios se descartan"""
+        volume = max(0, min(150, int(volume)))
+        with self._condition:
+            if volume == self.volume and self._pending_volume is None:
+                return
+            self.volume = volume
+            self._pending_volume = volume
+            self._condition.notify()
+
+    def toggle_mute(self):
+        with self._condition:
+            self.muted = not self.muted
+            self._pending_toggles += 1
+            self._condition.notify()
+        self._notify()
+
+    def _run(self, *args):
+        return CommandExecutor.instance().run([self.pactl, *args], timeout=5)
+
+    def _writer(self):
+        while not self._stop.is_set():
+            with self._condition:
+                while self._pending_volume is None and not self._pending_toggles and not self._stop.is_set():
+                    self._condition.wait()
+                volume, self._pending_volume = self._pending_volume, None
+                toggle = self._pending_toggles % 2  # Dos alternancias se anulan
+                self._pending_toggles = 0
+            try:
+                if volume is not None:
+                    self._run('set-sink-volume', '@DEFAULT_SINK@', f'{volume}%')
+                if toggle:
+                    self._run('set-sink-mute', '@DEFAULT_SINK@', 'toggle')
+            except (OSError, subprocess.SubprocessError):
+                pass
+            self._last_write = time.monotonic()
+            # Limita la frecuencia; lo que llegue mientras tanto se agrupa
+            self._stop.wait(1.0 / self.MAX_RATE)
+
+    @Profiler.timed('VolumeManager.refresh')
+    def refresh(self):
+        """Lee el estado real con pactl (llamar solo desde hilos de fondo)"""
+        try:
+            volume_output = self._run('get-sink-volume', '@DEFAULT_SINK@').stdout
+            mute_output = self._run('get-sink-mute', '@DEFAULT_SINK@').stdout
+        except (OSError, subprocess.SubprocessError):
+            return
+        match = re.search(r'(\d+)%', volume_output)
+        with self._condition:
+            # No pisar un valor del deslizador que aún no se ha escrito
+            if (self._pending_volume is not None or self._pending_toggles
+                    or time.monotonic() - self._last_write < self.ECHO_WINDOW):
+                return
+            changed = False
+            if match and int(match.group(1)) != self.volume:
+                self.volume = int(match.group(1))
+                changed = True
+            muted = 'yes' in mute_output.lower()
+            if muted != self.muted:
+                self.muted = muted
+                changed = True
+        if changed:
+            self._notify()
+
+    def _notify(self):
+        for callback in self._listeners:
+            callback()
+
+    def _monitor(self):
+        while not self._stop.is_set():
+            self.refresh()
+            try:
+                self._subscriber = CommandExecutor.instance().stream([self.pactl, 'subscribe'],
+                                                                      limited=False)
+            except OSError:
+                return
+            ended = False
+            while not ended and not self._stop.is_set():
+                line = self._subscriber.get()
+                if line is None:
+                    break
+                lines = [line]
+                # Agrupar ráfagas de eventos en una sola lectura del estado
+                while True:
+                    try:
+                        line = self._subscriber.get(timeout=0.05)
+                    except queue.Empty:
+                        break
+                    if line is None:
+                        ended = True
+                        break
+                    lines.append(line)
+                if any(' on sink ' in line or ' on server' in line for line in lines):
+                    self.refresh()
+            self._stop.wait(self.RESTART_DELAY)
+
+class FileOpener:
+    """Gestor para abrir diferentes tipos de archivos"""
+    
+    OPENERS = {
+        'image': ['eog', 'feh', 'gpicview', 'ristretto'],
+        'video': ['vlc', 'mpv', 'totem'],
+        'audio': ['vlc', 'audacious', 'rhythmbox'],
+        'pdf': ['evince', 'okular', 'mupdf'],
+        'text': ['gedit', 'kate', 'mousepad', 'nano'],
+        'archive': ['file-roller', 'ark', 'xarchiver']
+    }
+    
+    @staticmethod
+    def get_file_type(filepath):
+        """Determina el tipo de archivo"""
+        mime_type, _ = mimetypes.guess_type(filepath)
+        if not mime_type:
+            return 'unknown'
+        
+        if mime_type.startswith('image/'):
+            return 'image'
+        elif mime_type.startswith('video/'):
+            return 'video'
+        elif mime_type.startswith('audio/'):
+            return 'audio'
+        elif mime_type == 'application/pdf':
+            return 'pdf'
+        elif mime_type.startswith('text/'):
+            return 'text'
+        elif mime_type in ['application/zip', 'application/x-rar', 'application/x-7z-compressed']:
+            return 'archive'
+        else:
+            return 'unknown'
+    
+    @staticmethod
+    @Profiler.timed('FileOpener.open_file')
+    def open_file(filepath):
+        """Abre un archivo con la aplicación apropiada"""
+        # Primero las asociaciones del escritorio (incluye mimeapps.list)
+        executor = CommandExecutor.instance()
+        index = DesktopEntryIndex.load(block=False)
+        if index is None:
+            # El índice aún se está precalentando: xdg-open lee las mismas asociaciones
+            try:
+                executor.spawn(['xdg-open', filepath])
+                return True
+            except OSError:
+                pass
+        else:
+            for desktop_id in DesktopEntryIndex.handlers(ContentSniffer.mime_type(filepath), index):
+                if DesktopEntryIndex.launch(desktop_id, filepath, index):
+                    return True
+        
+        file_type = FileOpener.get_file_type(filepath)
+        refined = ContentSniffer.refine(filepath, ContentSniffer.detect(filepath))
+        if refined:
+            file_type = refined[1]
+        
+        if file_type == 'unknown':
+            # Usar xdg-open como fallback
+            try:
+                executor.spawn(['xdg-open', filepath])
+                return True
+            except OSError:
+                return False
+        
+        openers = FileOpener.OPENERS.get(file_type, [])
+        
+        for opener in openers:
+            if shutil.which(opener):
+                try:
+                    executor.spawn([opener, filepath])
+                    return True
+                except OSError:
+                    continue
+        
+        # Fallback a xdg-open
+        try:
+            executor.spawn(['xdg-open', filepath])
+            return True
+        except OSError:
+            return False
+
+class FileLister:
+    """Listado y búsqueda de carpetas sin depender de Tk
+
+    La vista principal y benchmarks/run_benchmarks.py usan las mismas
+    funciones, así que las mediciones corresponden al código real.
+    """
+
+    ICONS = {
+        'image': '🖼️',
+        'video': '🎬',
+        'audio': '🎵',
+        'pdf': '📄',
+        'text': '📝',
+        'archive': '📦',
+        'executable': '⚙️',
+        'unknown': '📄'
+    }
+
+    TYPE_DESCRIPTIONS = {
+        '.txt': 'Archivo de texto',
+        '.pdf': 'Documento PDF',
+        '.doc': 'Documento Word',
+        '.docx': 'Documento Word',
+        '.jpg': 'Imagen JPEG',
+        '.jpeg': 'Imagen JPEG',
+        '.png': 'Imagen PNG',
+        '.gif': 'Imagen GIF',
+        '.mp4': 'Video MP4',
+        '.avi': 'Video AVI',
+        '.mp3': 'Audio MP3',
+        '.wav': 'Audio WAV',
+        '.zip': 'Archivo ZIP',
+        '.tar': 'Archivo TAR',
+        '.gz': 'Archivo comprimido',
+        '.py': 'Archivo Python',
+        '.js': 'Archivo JavaScript',
+        '.html': 'Página web',
+        '.css': 'Hoja de estilo',
+    }
+
+    @staticmethod
+    def format_size(size):
+        """Formatea el tamaño de archivo en formato legible"""
+        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
+            if size < 1024.0:
+                return f"{size:.1f} {unit}"
+            size /= 1024.0
+        return f"{size:.1f} PB"
+
+    @classmethod
+    def file_type(cls, filepath):
+        """Descripción del tipo según la extensión (sin tocar el disco)"""
+        suffix = os.path.splitext(str(filepath))[1].lower()
+        return cls.TYPE_DESCRIPTIONS.get(suffix, f'Archivo {suffix[1:].upper()}' if suffix else 'Archivo')
+
+    @classmethod
+    def file_icon(cls, filepath):
+        return cls.ICONS.get(FileOpener.get_file_type(str(filepath)), '📄')
+
+    @classmethod
+    def make_item(cls, name, path, st):
+        """Diccionario de la vista a partir de un único stat"""
+        is_dir = stat.S_ISDIR(st.st_mode)
+        is_file = stat.S_ISREG(st.st_mode)
+        return {
+            'name': name,
+            'path': path,
+            'is_dir': is_dir,
+            'bytes': st.st_size if is_file else 0,
+            'mtime': st.st_mtime,
+            'size': cls.format_size(st.st_size) if is_file else "",
+            'type': "Carpeta" if is_dir else cls.file_type(path),
+            'modified': datetime.fromtimestamp(st.st_mtime).strftime('%Y-%m-%d %H:%M'),
+            'icon': '📁' if is_dir else cls.file_icon(path)
+        }
+
+    @classmethod
+    def list_directory(cls, path, show_hidden=False):
+        """Elementos de una carpeta con un stat por entrada (os.scandir)"""
+        # Tres pasadas para poder medir por separado lectura, stat y clasificación
+        with Profiler.span('list_directory.scan') as span:
+            with os.scandir(path) as entries:
+                entries = [entry for entry in entries if show_hidden or not entry.name.startswith('.')]
+            span.items = len(entries)
+        with Profiler.span('list_directory.stat') as span:
+            stats = []
+            for entry in entries:
+                try:
+                    stats.append((entry, entry.stat()))
+                except OSError:
+                    continue
+            span.items = len(stats)
+        with Profiler.span('list_directory.classify') as span:
+            items = [cls.make_item(entry.name, entry.path, st) for entry, st in stats]
+            span.items = len(items)
+        return items
+
+    @classmethod
+    def search(cls, root, query, show_hidden=False):
+        """Busca recursivamente nombres que encajen con *query*"""
+        root = Path(root)
+        with Profiler.span('search.walk') as span:
+            found = []
+            for item in root.rglob(f"*{query}*"):
+                if item.name.startswith('.') and not show_hidden:
+                    continue
+                try:
+                    found.append((item, item.stat()))
+                except OSError:
+                    continue
+            span.items = len(found)
+        with Profiler.span('search.classify') as span:
+            matches = [cls.make_item(str(item.relative_to(root)), str(item), st) for item, st in found]
+            span.items = len(matches)
+        with Profiler.span('search.sort'):
+            matches.sort(key=lambda x: (not x['is_dir'], x['name'].lower()))
+        return matches
+
+class NameIndex:
+    """Nombres de un listado ordenados sin distinguir mayúsculas, para buscar por prefijo"""
+
+    def __init__(self, entries):
+        # entries: pares (nombre, valor); el valor suele ser el iid de la fila
+        pairs = sorted((name.casefold(), value) for name, value in entries)
+        self.keys = [key for key, _ in pairs]
+        self.values = [value for _, value in pairs]
+
+    def find(self, prefix, start=0):
+        """Posición del primer nombre desde start que empieza por prefix, o None
+
+        Las coincidencias son contiguas: si start ya no coincide se vuelve a
+        la primera, de modo que repetir la búsqueda las recorre en ciclo.
+        """
+        prefix = prefix.casefold()
+        first = bisect.bisect_left(self.keys, prefix)
+        index = max(first, start)
+        if index >= len(self.keys) or not self.keys[index].startswith(prefix):
+            index = first
+        if index < len(self.keys) and self.keys[index].startswith(prefix):
+            return index
+        return None
+
+class ListingCache:
+    """Listados recientes compartidos por todas las pestañas y paneles
+
+    Abrir la misma carpeta en dos paneles la lee una sola vez. Un listado
+    se reutiliza mientras no cambie el mtime de la carpeta y durante TTL
+    segundos como máximo, porque editar un archivo no cambia el mtime de
+    su carpeta.
+    """
+
+    MAX_ENTRIES = 8
+    TTL = 10.0
+    RACY_WINDOW = 1.0  # Carpetas modificadas hace menos no se guardan
+
+    def __init__(self):
+        self._entries = collections.OrderedDict()  # (ruta, ocultos) -> (mtime_ns, instante, elementos)
+        self._lock = threading.Lock()
+
+    def list_directory(self, path, show_hidden=False, force=False):
+        """Elementos de la carpeta, leídos de nuevo solo si hace falta"""
+        key = (str(path), show_hidden)
+        st = os.stat(path)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._entries.get(key)
+            if (cached and not force and cached[0] == st.st_mtime_ns
+                    and now - cached[1] < self.TTL):
+                self._entries.move_to_end(key)
+                return list(cached[2])
+
+        items = FileLister.list_directory(path, show_hidden)
+        # Un cambio en el mismo tic de reloj no movería el mtime: no arriesgar
+        if time.time() - st.st_mtime >= self.RACY_WINDOW:
+            with self._lock:
+                self._entries[key] = (st.st_mtime_ns, now, items)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.MAX_ENTRIES:
+                    self._entries.popitem(last=False)
+        return list(items)
+
+    def invalidate(self, path=None):
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                for key in [key for key in self._entries if key[0] == str(path)]:
+                    del self._entries[key]
+
+class FolderTree:
+    """Subcarpetas para el árbol del panel lateral
+
+    Solo se lee la carpeta que se expande, y el tipo de cada entrada sale
+    de readdir (d_type) sin hacer stat. Los resultados se guardan por ruta
+    y se invalidan cuando cambia el mtime de la carpeta.
+    """
+
+    MAX_ENTRIES = 4096
+
+    COMPLETIONS = 50
+
+    _cache = collections.OrderedDict()  # (ruta, ocultos) -> (mtime_ns, nombres, claves)
+    _lock = threading.Lock()
+
+    @classmethod
+    def cached(cls, path, show_hidden=False):
+        """(nombres, claves) si la carpeta está en caché y no cambió; si no, None"""
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        key = (path, show_hidden)
+        with cls._lock:
+            cached = cls._cache.get(key)
+            if cached and cached[0] == mtime:
+                cls._cache.move_to_end(key)
+                return cached[1], cached[2]
+        return None
+
+    @classmethod
+    @Profiler.timed('FolderTree.subdirectories')
+    def subdirectories(cls, path, show_hidden=False):
+        """Nombres ordenados de las subcarpetas de path"""
+        cached = cls.cached(path, show_hidden)
+        if cached:
+            return cached[0]
+        mtime = os.stat(path).st_mtime_ns
+        key = (path, show_hidden)
+
+        names = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.name.startswith('.') and not show_hidden:
+                    continue
+                try:
+                    # Con d_type solo los enlaces simbólicos necesitan stat
+                    if entry.is_dir():
+                        names.append(entry.name)
+                except OSError:
+                    continue
+        names.sort(key=str.casefold)
+        keys = [name.casefold() for name in names]
+
+        with cls._lock:
+            cls._cache[key] = (mtime, names, keys)
+            cls._cache.move_to_end(key)
+            while len(cls._cache) > cls.MAX_ENTRIES:
+                cls._cache.popitem(last=False)
+        return names
+
+    @classmethod
+    def complete(cls, path, prefix, show_hidden=False, limit=COMPLETIONS):
+        """Subcarpetas que empiezan por prefix (sin distinguir mayúsculas)
+
+        Las claves están ordenadas: bisect encuentra el primer candidato y
+        basta recorrer mientras coincida el prefijo, también con 100k hijos.
+        """
+        cached = cls.cached(path, show_hidden)
+        if cached is None:
+            cls.subdirectories(path, show_hidden)
+            cached = cls.cached(path, show_hidden) or ([], [])
+        names, keys = cached
+        prefix = prefix.casefold()
+        matches = []
+        for index in range(bisect.bisect_left(keys, prefix), len(keys)):
+            if not keys[index].startswith(prefix) or len(matches) >= limit:
+                break
+            matches.append(names[index])
+        return matches
+
+class FrecencyDB:
+    """Carpetas visitadas ordenadas por frecuencia y antigüedad (como zoxide)
+
+    Cada visita suma 1 al rango de la carpeta; la puntuación multiplica el
+    rango según lo reciente del último acceso. Cuando la suma de rangos
+    supera MAX_TOTAL se envejece todo y se olvidan las entradas residuales.
+    """
+
+    MAX_TOTAL = 10000
+    SAVE_INTERVAL = 30
+
+    def __init__(self, path=None):
+        self.path = str(path or Path.home() / '.file_explorer_frecency.json')
+        self.entries = {}  # ruta -> [rango, último acceso]
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._saved_at = 0.0
+        try:
+            with open(self.path) as f:
+                for path, (rank, last) in json.load(f).items():
+                    # Une variantes guardadas antes de normalizar (.., barra final)
+                    entry = self.entries.setdefault(os.path.abspath(path), [0.0, last])
+                    entry[0] += rank
+                    entry[1] = max(entry[1], last)
+        except (OSError, ValueError, AttributeError, TypeError):
+            self.entries = {}
+
+    def add(self, path):
+        """Anota una visita"""
+        path = os.path.abspath(str(path))
+        now = time.time()
+        with self._lock:
+            entry = self.entries.setdefault(path, [0.0, now])
+            entry[0] += 1
+            entry[1] = now
+            if sum(rank for rank, _ in self.entries.values()) > self.MAX_TOTAL:
+                for key in list(self.entries):
+                    self.entries[key][0] *= 0.9
+                    if self.entries[key][0] < 1:
+                        del self.entries[key]
+            self._dirty = True
+        self.save()
+
+    @staticmethod
+    def score(entry, now):
+        rank, last = entry
+        age = now - last
+        if age < 3600:
+            return rank * 4
+        if age < 86400:
+            return rank * 2
+        if age < 604800:
+            return rank / 2
+        return rank / 4
+
+    @staticmethod
+    def matches(path, terms):
+        """Los términos aparecen en orden y el último en el nombre de la carpeta"""
+        haystack = path.casefold()
+        position = 0
+        for term in terms:
+            found = haystack.find(term, position)
+            if found < 0:
+                return False
+            position = found + len(term)
+        return terms[-1] in os.path.basename(haystack.rstrip('/'))
+
+    @staticmethod
+    def fuzzy(name, query):
+        """Las letras de query aparecen en orden dentro de name"""
+        letters = iter(name.casefold())
+        return all(char in letters for char in query)
+
+    def query(self, text, limit=20):
+        """Carpetas existentes que encajan con text, de más a menos puntuación"""
+        terms = text.casefold().split()
+        if not terms:
+            return []
+        now = time.time()
+        with self._lock:
+            candidates = sorted(self.entries.items(), key=lambda item: self.score(item[1], now), reverse=True)
+        results = [path for path, _ in candidates if self.matches(path, terms)]
+        if not results:
+            # Sin coincidencias literales: subsecuencia sobre el nombre de la carpeta
+            joined = "".join(terms)
+            results = [path for path, _ in candidates if self.fuzzy(os.path.basename(path), joined)]
+        existing = []
+        for path in results:
+            if os.path.isdir(path):
+                existing.append(path)
+                if len(existing) >= limit:
+                    break
+            else:
+                with self._lock:
+                    self.entries.pop(path, None)
+                    self._dirty = True
+        return existing
+
+    def save(self, force=False):
+        """Escribe la base de datos si cambió (como mucho cada SAVE_INTERVAL segundos)"""
+        with self._lock:
+            if not self._dirty or (not force and time.time() - self._saved_at < self.SAVE_INTERVAL):
+                return
+            data = json.dumps(self.entries)
+            self._dirty = False
+            self._saved_at = time.time()
+        try:
+            temp = f'{self.path}.{os.getpid()}'
+            with open(temp, 'w') as f:
+                f.write(data)
+            os.replace(temp, self.path)
+        except OSError:
+            pass
+
+class FolderSizes:
+    """Tamaño recursivo de carpetas con caché persistente por subcarpeta
+
+    Cada carpeta recorrida se guarda con la clave (dispositivo, inodo) y su
+    mtime_ns. Si el mtime no cambió se reutilizan la suma de sus archivos y
+    la lista de subcarpetas sin volver a listarla: medir de nuevo un árbol
+    ya visto cuesta un stat por carpeta y solo se releen las que cambiaron.
+    Reescribir un archivo sin crear ni borrar entradas no mueve el mtime de
+    su carpeta, así que ese crecimiento no se ve hasta el siguiente cambio.
+    """
+
+    MAX_ENTRIES = 200000
+    SAVE_INTERVAL = 30  # segundos entre escrituras de la caché
+    VIRTUAL = ('/proc', '/sys', '/dev', '/run')  # No se miden
+
+    # "dev:ino" -> [mtime_ns, bytes de sus archivos, archivos, subcarpetas, [[ino, bytes]] con enlaces duros]
+    _cache = None
+    _lock = threading.Lock()
+    _dirty = False
+    _saved_at = 0.0
+
+    @classmethod
+    def _load_cache(cls):
+        if cls._cache is None:
+            try:
+                with open(cache_path('folder-sizes.json')) as f:
+                    cls._cache = json.load(f)
+            except (OSError, ValueError):
+                cls._cache = {}
+        return cls._cache
+
+    @classmethod
+    def save_cache(cls, force=False):
+        """Escribe la caché si cambió (como mucho cada SAVE_INTERVAL segundos)"""
+        with cls._lock:
+            if not cls._dirty or (not force and time.time() - cls._saved_at < cls.SAVE_INTERVAL):
+                return
+            data = json.dumps(cls._cache)
+            cls._dirty = False
+            cls._saved_at = time.time()
+        try:
+            os.makedirs(cache_path(), exist_ok=True)
+            temp = cache_path(f'folder-sizes.json.{os.getpid()}')
+            with open(temp, 'w') as f:
+                f.write(data)
+            os.replace(temp, cache_path('folder-sizes.json'))
+        except OSError:
+            pass
+
+    @staticmethod
+    def _scan(folder, mtime_ns):
+        size = count = 0
+        subdirs = []
+        linked = []  # Se suman en measure, una vez por inodo en todo el árbol
+        try:
+            with os.scandir(folder) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.name)
+                        elif entry.is_file(follow_symlinks=False):
+                            st = entry.stat(follow_symlinks=False)
+                            if st.st_nlink > 1:
+                                linked.append([st.st_ino, st.st_size])
+                            else:
+                                size += st.st_size
+                                count += 1
+                    except OSError:
+                        continue
+        except OSError:
+            return None
+        return [mtime_ns, size, count, subdirs, linked]
+
+    @classmethod
+    def measure(cls, path, cancelled=None):
+        """Devuelve (bytes, archivos) del árbol, o None si se canceló
+
+        No sigue enlaces simbólicos ni entra en otros sistemas de archivos.
+        """
+        path = str(path)
+        if any(path == root or path.startswith(root + '/') for root in cls.VIRTUAL):
+            return None
+        try:
+            device = os.lstat(path).st_dev
+        except OSError:
+            return None
+
+        total = files = 0
+        inodes = set()  # Enlaces duros ya contados (todo el árbol está en device)
+        stack = [path]
+        with Profiler.span('FolderSizes.measure') as span:
+            while stack:
+                if cancelled and cancelled():
+                    return None
+                folder = stack.pop()
+                try:
+                    st = os.lstat(folder)
+                except OSError:
+                    continue
+                if st.st_dev != device:
+                    continue
+                key = f"{st.st_dev}:{st.st_ino}"
+                with cls._lock:
+                    entry = cls._load_cache().get(key)
+                if not entry or len(entry) < 5 or entry[0] != st.st_mtime_ns:
+                    # El mtime se toma antes de listar: un cambio a medias fuerza otra lectura
+                    entry = cls._scan(folder, st.st_mtime_ns)
+                    if entry is None:
+                        continue
+                    with cls._lock:
+                        cache = cls._load_cache()
+                        cache.pop(key, None)
+                        cache[key] = entry
+                        if len(cache) > cls.MAX_ENTRIES:
+                            del cache[next(iter(cache))]
+                        cls._dirty = True
+                total += entry[1]
+                files += entry[2]
+                for inode, size in entry[4]:
+                    if inode not in inodes:
+                        inodes.add(inode)
+                        total += size
+                        files += 1
+                stack.extend(os.path.join(folder, name) for name in entry[3])
+            span.items = files
+        return total, files
+
+class ContentSniffer:
+    """Detecta el tipo real de un archivo por sus primeros bytes
+
+    Solo se leen HEAD_SIZE bytes y el resultado se guarda por
+    (st_dev, st_ino, mtime), así que un archivo sin cambios no se vuelve a
+    leer. Los contenedores genéricos (ZIP) y el texto plano no corrigen una
+    extensión conocida: un .docx sigue siendo un documento Word.
+    """
+
+    HEAD_SIZE = 512
+    MAX_CACHE = 50000
+
+    # (offset, firma, descripción, categoría de FileOpener, genérico)
+    SIGNATURES = [
+        (0, b'\x7fELF', 'Ejecutable ELF', 'executable', False),
+        (0, b'\x89PNG\r\n\x1a\n', 'Imagen PNG', 'image', False),
+        (0, b'\xff\xd8\xff', 'Imagen JPEG', 'image', False),
+        (0, b'GIF87a', 'Imagen GIF', 'image', False),
+        (0, b'GIF89a', 'Imagen GIF', 'image', False),
+        (0, b'BM', 'Imagen BMP', 'image', False),
+        (0, b'II*\x00', 'Imagen TIFF', 'image', False),
+        (0, b'MM\x00*', 'Imagen TIFF', 'image', False),
+        (0, b'%PDF-', 'Documento PDF', 'pdf', False),
+        (0, b'PK\x03\x04', 'Archivo ZIP', 'archive', True),
+        (0, b'PK\x05\x06', 'Archivo ZIP', 'archive', True),
+        (0, b'\x1f\x8b', 'Archivo gzip', 'archive', False),
+        (0, b'\xfd7zXZ\x00', 'Archivo xz', 'archive', False),
+        (0, b'BZh', 'Archivo bzip2', 'archive', False),
+        (0, b'\x28\xb5\x2f\xfd', 'Archivo zstd', 'archive', False),
+        (0, b"7z\xbc\xaf'\x1c", 'Archivo 7z', 'archive', False),
+        (0, b'Rar!\x1a\x07', 'Archivo RAR', 'archive', False),
+        (257, b'ustar', 'Archivo TAR', 'archive', False),
+        (0, b'SQLite format 3\x00', 'Base de datos SQLite', 'unknown', False),
+        (0, b'ID3', 'Audio MP3', 'audio', False),
+        (0, b'\xff\xfb', 'Audio MP3', 'audio', False),
+        (0, b'fLaC', 'Audio FLAC', 'audio', False),
+        (0, b'OggS', 'Audio Ogg', 'audio', False),
+        (4, b'ftyp', 'Video MP4', 'video', False),
+        (0, b'\x1a\x45\xdf\xa3', 'Video Matroska', 'video', False),
+        (0, b'\xca\xfe\xba\xbe', 'Clase Java', 'executable', False),
+        (0, b'MZ', 'Ejecutable Windows', 'executable', False),
+    ]
+    RIFF_TYPES = {
+        b'WAVE': ('Audio WAV', 'audio'),
+        b'AVI ': ('Video AVI', 'video'),
+        b'WEBP': ('Imagen WEBP', 'image'),
+    }
+
+    MIME_TYPES = {
+        'Ejecutable ELF': 'application/x-executable',
+        'Imagen PNG': 'image/png',
+        'Imagen JPEG': 'image/jpeg',
+        'Imagen GIF': 'image/gif',
+        'Imagen BMP': 'image/bmp',
+        'Imagen TIFF': 'image/tiff',
+        'Imagen WEBP': 'image/webp',
+        'Documento PDF': 'application/pdf',
+        'Archivo ZIP': 'application/zip',
+        'Archivo gzip': 'application/gzip',
+        'Archivo xz': 'application/x-xz',
+        'Archivo bzip2': 'application/x-bzip2',
+        'Archivo zstd': 'application/zstd',
+        'Archivo 7z': 'application/x-7z-compressed',
+        'Archivo RAR': 'application/vnd.rar',
+        'Archivo TAR': 'application/x-tar',
+        'Base de datos SQLite': 'application/vnd.sqlite3',
+        'Audio MP3': 'audio/mpeg',
+        'Audio FLAC': 'audio/flac',
+        'Audio Ogg': 'audio/ogg',
+        'Audio WAV': 'audio/x-wav',
+        'Video MP4': 'video/mp4',
+        'Video Matroska': 'video/x-matroska',
+        'Video AVI': 'video/x-msvideo',
+        'Clase Java': 'application/x-java',
+        'Ejecutable Windows': 'application/x-msdownload',
+    }
+
+    _cache = collections.OrderedDict()  # (st_dev, st_ino, mtime_ns) -> resultado
+    _lock = threading.Lock()
+
+    @classmethod
+    def classify(cls, head):
+        """Devuelve (descripción, categoría, genérico) o None si no se reconoce"""
+        if not head:
+            return None
+        if head.startswith(b'RIFF') and head[8:12] in cls.RIFF_TYPES:
+            return cls.RIFF_TYPES[head[8:12]] + (False,)
+        if head.startswith(b'#!'):
+            interpreter = head[2:].split(b'\n', 1)[0].split()
+            if interpreter and os.path.basename(interpreter[0]) == b'env' and len(interpreter) > 1:
+                interpreter = interpreter[1:]
+            name = os.path.basename(interpreter[0]).decode('utf-8', 'replace') if interpreter else ''
+            return (f'Script de {name}' if name else 'Script', 'text', False)
+        is_text = FilePreview.decode_text(head)[0] is not None
+        for offset, magic, description, category, generic in cls.SIGNATURES:
+            if head.startswith(magic, offset):
+                # Firmas de 2-3 bytes como BM o MZ también empiezan textos normales
+                if len(magic) < 4 and is_text:
+                    break
+                return (description, category, generic)
+        if is_text:
+            return ('Archivo de texto', 'text', True)
+        return None
+
+    @classmethod
+    def detect(cls, path):
+        """Clasifica un archivo regular leyendo como mucho HEAD_SIZE bytes"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        if not stat.S_ISREG(st.st_mode):
+            return None  # FIFOs y dispositivos bloquearían la lectura
+        key = (st.st_dev, st.st_ino, st.st_mtime_ns)
+        with cls._lock:
+            if key in cls._cache:
+                cls._cache.move_to_end(key)
+                return cls._cache[key]
+
+        try:
+            fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+            try:
+                head = os.read(fd, cls.HEAD_SIZE)
+            finally:
+                os.close(fd)
+        except OSError:
+            return None
+        result = cls.classify(head)
+
+        with cls._lock:
+            cls._cache[key] = result
+            if len(cls._cache) > cls.MAX_CACHE:
+                cls._cache.popitem(last=False)
+        return result
+
+    @classmethod
+    def mime_type(cls, path):
+        """Tipo MIME por la extensión, corregido por el contenido si hace falta"""
+        mime = mimetypes.guess_type(str(path))[0]
+        refined = cls.refine(path, cls.detect(path))
+        if refined:
+            description, category = refined
+            mime = cls.MIME_TYPES.get(description, 'text/plain' if category == 'text' else mime)
+        return mime or 'application/octet-stream'
+
+    @staticmethod
+    def refine(path, sniffed):
+        """Devuelve (descripción, categoría) si el contenido corrige a la extensión"""
+        if not sniffed:
+            return None
+        description, category, generic = sniffed
+        if mimetypes.guess_type(str(path))[0] is None:
+            return description, category  # Sin extensión o extensión desconocida
+        if not generic and category != FileOpener.get_file_type(str(path)):
+            return description, category  # Extensión engañosa
+        return None
+
+class DesktopEntryIndex:
+    """Índice MIME -> aplicaciones a partir de los .desktop y mimeapps.list
+
+    Se construye una vez y se guarda en disco; se invalida cuando cambia el
+    mtime de algún directorio de aplicaciones o de un mimeapps.list, así que
+    abrir un archivo no recorre el PATH ni vuelve a leer los .desktop. Los
+    mtimes se comprueban como mucho cada CHECK_INTERVAL segundos.
+    """
+
+    FIELD_CODES = {'%f', '%F', '%u', '%U'}
+    DEPRECATED_CODES = {'%d', '%D', '%n', '%N', '%v', '%m'}
+    CHECK_INTERVAL = 5.0
+    CACHE_VERSION = 2  # Cambia cuando cambia el formato del índice guardado
+
+    _index = None
+    _stamp = None
+    _checked_at = 0.0
+    _lock = threading.Lock()
+    _warming = None  # Hilo que carga el índice en segundo plano
+
+    @staticmethod
+    def data_dirs():
+        home = os.environ.get('XDG_DATA_HOME') or str(Path.home() / '.local' / 'share')
+        system = os.environ.get('XDG_DATA_DIRS') or '/usr/local/share:/usr/share'
+        return [home] + [d for d in system.split(':') if d]
+
+    @classmethod
+    def application_dirs(cls):
+        return [os.path.join(d, 'applications') for d in cls.data_dirs()]
+
+    @classmethod
+    def mimeapps_files(cls):
+        """mimeapps.list en orden de prioridad"""
+        config_home = os.environ.get('XDG_CONFIG_HOME') or str(Path.home() / '.config')
+        config_dirs = os.environ.get('XDG_CONFIG_DIRS') or '/etc/xdg'
+        files = [os.path.join(config_home, 'mimeapps.list')]
+        files += [os.path.join(d, 'mimeapps.list') for d in config_dirs.split(':') if d]
+        files += [os.path.join(d, 'mimeapps.list') for d in cls.application_dirs()]
+        return files
+
+    @classmethod
+    def stamp(cls):
+        """mtimes de los directorios de aplicaciones (y subdirectorios) y de mimeapps.list"""
+        stamp = []
+        for directory in cls.application_dirs():
+            for root, dirs, _ in os.walk(directory):
+                try:
+                    stamp.append((root, os.stat(root).st_mtime_ns))
+                except OSError:
+                    pass
+        for path in cls.mimeapps_files():
+            try:
+                stamp.append((path, os.stat(path).st_mtime_ns))
+            except OSError:
+                pass
+        return stamp
+
+    @classmethod
+    def warm_up(cls):
+        """Carga el índice en un hilo de fondo si no se está cargando ya"""
+        if cls._warming is None or not cls._warming.is_alive():
+            cls._warming = threading.Thread(target=cls.load, daemon=True)
+            cls._warming.start()
+
+    @classmethod
+    def load(cls, block=True):
+        """Devuelve el índice, reconstruyéndolo solo si cambió algún mtime
+
+        Con block=False (hilo de la interfaz) nunca se construye aquí: si aún
+        no hay índice se lanza warm_up y se devuelve None, y si otro hilo lo
+        está recargando se devuelve el anterior.
+        """
+        if not block and cls._index is None:
+            cls.warm_up()
+            return None
+        if not cls._lock.acquire(blocking=block):
+            return cls._index
+        try:
+            now = time.monotonic()
+            if cls._index is not None and now - cls._checked_at < cls.CHECK_INTERVAL:
+                return cls._index
+            cls._checked_at = now
+            stamp = [list(entry) for entry in cls.stamp()]
+            if cls._index is not None and cls._stamp == stamp:
+                return cls._index
+            try:
+                with open(cache_path('desktop-index.json')) as f:
+                    cached = json.load(f)
+                if cached.get('version') == cls.CACHE_VERSION and cached.get('stamp') == stamp:
+                    cls._index, cls._stamp = cached['index'], stamp
+                    return cls._index
+            except (OSError, ValueError, KeyError):
+                pass
+
+            cls._index, cls._stamp = cls.build(), stamp
+            try:
+                os.makedirs(cache_path(), exist_ok=True)
+                with open(cache_path('desktop-index.json'), 'w') as f:
+                    json.dump({'version': cls.CACHE_VERSION, 'stamp': stamp, 'index': cls._index}, f)
+            except OSError:
+                pass
+            return cls._index
+        finally:
+            cls._lock.release()
+
+    @staticmethod
+    def parse_desktop_file(path):
+        """Lee el grupo [Desktop Entry] de un archivo .desktop"""
+        values = {}
+        in_entry = False
+        with open(path, encoding='utf-8', errors='replace') as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                if line.startswith('['):
+                    in_entry = line == '[Desktop Entry]'
+                    continue
+                if in_entry and '=' in line:
+                    key, value = line.split('=', 1)
+                    values[key.strip()] = value.strip()
+        return values
+
+    @staticmethod
+    def localized(values, key):
+        language = (os.environ.get('LC_MESSAGES') or os.environ.get('LANG') or '').split('.')[0]
+        for candidate in (f'{key}[{language}]', f"{key}[{language.split('_')[0]}]", key):
+            if candidate in values:
+                return values[candidate]
+        return None
+
+    @classmethod
+    def build(cls):
+        entries = {}
+        mime_map = {}
+        # El primer directorio (el del usuario) tiene prioridad
+        for directory in cls.application_dirs():
+            for root, _, files in os.walk(directory):
+                for filename in sorted(files):
+                    if not filename.endswith('.desktop'):
+                        continue
+                    path = os.path.join(root, filename)
+                    desktop_id = os.path.relpath(path, directory).replace(os.sep, '-')
+                    if desktop_id in entries:
+                        continue
+                    try:
+                        values = cls.parse_desktop_file(path)
+                    except OSError:
+                        continue
+                    entries[desktop_id] = None  # Ocupa el id aunque se descarte
+                    if (values.get('Type') != 'Application' or values.get('Hidden') == 'true'
+                            or not values.get('Exec')):
+                        continue
+                    try_exec = values.get('TryExec')
+                    if try_exec and not shutil.which(try_exec):
+                        continue
+                    entries[desktop_id] = {
+                        'name': cls.localized(values, 'Name') or desktop_id[:-8],
+                        'exec': values['Exec'],
+                        'terminal': values.get('Terminal') == 'true',
+                        'visible': values.get('NoDisplay') != 'true',
+                    }
+                    for mime in values.get('MimeType', '').split(';'):
+                        if mime:
+                            mime_map.setdefault(mime, []).append(desktop_id)
+
+        # De mayor a menor prioridad. Las predeterminadas de todos los archivos se
+        # encadenan en ese orden: vale la primera instalada (la especificación
+        # pasa al siguiente archivo si ninguna de uno lo está). En las
+        # asociaciones añadidas o eliminadas manda el archivo más prioritario
+        defaults, added, removed = {}, {}, {}
+        for path in cls.mimeapps_files():
+            try:
+                with open(path, encoding='utf-8', errors='replace') as f:
+                    section = None
+                    for line in f:
+                        line = line.strip()
+                        if line.startswith('['):
+                            section = {'[Default Applications]': defaults,
+                                        '[Added Associations]': added,
+                                        '[Removed Associations]': removed}.get(line)
+                        elif section is not None and '=' in line:
+                            mime, ids = line.split('=', 1)
+                            ids = [i for i in ids.split(';') if i]
+                            if section is defaults:
+                                defaults.setdefault(mime.strip(), []).extend(ids)
+                            else:
+                                section.setdefault(mime.strip(), ids)
+            except OSError:
+                continue
+
+        entries = {k: v for k, v in entries.items() if v}
+        return {'entries': entries, 'mime': mime_map, 'defaults': defaults,
+                'added': added, 'removed': removed}
+
+    @classmethod
+    def handlers(cls, mime, index=None):
+        """Ids de las aplicaciones para un tipo MIME, la predeterminada primero"""
+        index = index or cls.load()
+        entries = index['entries']
+        mimes = [mime] + (['text/plain'] if mime.startswith('text/') and mime != 'text/plain' else [])
+        result = []
+        for candidate in mimes:
+            removed = set(index['removed'].get(candidate, []))
+            default = next((i for i in index['defaults'].get(candidate, [])
+                            if i in entries and i not in removed), None)
+            for desktop_id in (([default] if default else []) + index['added'].get(candidate, [])
+                                + index['mime'].get(candidate, [])):
+                if desktop_id in entries and desktop_id not in removed and desktop_id not in result:
+                    result.append(desktop_id)
+        return result
+
+    @classmethod
+    def entry(cls, desktop_id, index=None):
+        return (index or cls.load())['entries'].get(desktop_id)
+
+    @classmethod
+    def all_applications(cls, index=None):
+        """(id, nombre) de las aplicaciones visibles, ordenadas por nombre"""
+        entries = (index or cls.load())['entries']
+        return sorted(((i, e['name']) for i, e in entries.items() if e['visible']),
+                        key=lambda item: item[1].lower())
+
+    @classmethod
+    def command_line(cls, entry, filepath):
+        """Expande los códigos de campo de Exec para un archivo"""
+        try:
+            parts = shlex.split(entry['exec'])
+        except ValueError:
+            parts = entry['exec'].split()
+        argv = []
+        substituted = False
+        for part in parts:
+            if part in cls.FIELD_CODES:
+                argv.append(Path(filepath).as_uri() if part in ('%u', '%U') else str(filepath))
+                substituted = True
+            elif part in cls.DEPRECATED_CODES or part in ('%i', '%k'):
+                continue
+            else:
+                part = part.replace('%c', entry['name'])
+                for code in ('%f', '%F', '%u', '%U'):
+                    if code in part:
+                        part = part.replace(code, str(filepath))
+                        substituted = True
+                argv.append(part.replace('%%', '%'))
+        if not substituted:
+            argv.append(str(filepath))
+        if entry['terminal']:
+            terminal = shutil.which('x-terminal-emulator') or shutil.which('xterm')
+            if terminal:
+                argv = [terminal, '-e'] + argv
+        return argv
+
+    @classmethod
+    def launch(cls, desktop_id, filepath, index=None):
+        entry = cls.entry(desktop_id, index)
+        if not entry:
+            return False
+        try:
+            CommandExecutor.instance().spawn(cls.command_line(entry, filepath), name=desktop_id)
+            return True
+        except OSError:
+            return False
+
+    @classmethod
+    def set_default(cls, mime, desktop_id):
+        """Guarda la aplicación predeterminada en el mimeapps.list del usuario"""
+        path = cls.mimeapps_files()[0]
+        lines = []
+        try:
+            with open(path, encoding='utf-8') as f:
+                lines = f.read().splitlines()
+        except OSError:
+            pass
+
+        section, inserted = None, False
+        result = []
+        for line in lines:
+            stripped = line.strip()
+            if stripped.startswith('['):
+                if section == '[Default Applications]' and not inserted:
+                    result.append(f'{mime}={desktop_id};')
+                    inserted = True
+                section = stripped
+            elif section == '[Default Applications]' and stripped.split('=', 1)[0].strip() == mime:
+                continue
+            result.append(line)
+        if not inserted:
+            if section != '[Default Applications]':
+                result.append('[Default Applications]')
+            result.append(f'{mime}={desktop_id};')
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(result) + '\n')
+        cls._checked_at = 0.0  # La próxima carga ve el cambio sin esperar
+
+class MediaInfo:
+    """Dimensiones y duración leídas solo de las cabeceras, sin decodificar
+
+    Los resultados se guardan en una caché persistente validada por
+    (tamaño, mtime_ns), así que ordenar una carpeta de fotos por resolución
+    no vuelve a abrir los archivos ya vistos.
+    """
+
+    EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp',
+                  '.wav', '.mp3', '.mp4', '.m4a', '.m4v', '.mov')
+    MAX_ENTRIES = 100000
+    SAVE_INTERVAL = 30  # segundos entre escrituras de la caché
+
+    JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+    MP3_BITRATES = {  # kbit/s por índice, capa III
+        1: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+        2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    }
+    MP3_SAMPLE_RATES = {
+        3: [44100, 48000, 32000],   # MPEG-1
+        2: [22050, 24000, 16000],   # MPEG-2
+        0: [11025, 12000, 8000],    # MPEG-2.5
+    }
+
+    _cache = None  # ruta -> [tamaño, mtime_ns, ancho, alto, duración]
+    _lock = threading.Lock()
+    _dirty = False
+    _saved_at = 0.0
+
+    @staticmethod
+    def is_media(path):
+        return str(path).lower().endswith(MediaInfo.EXTENSIONS)
+
+    @classmethod
+    def _load_cache(cls):
+        if cls._cache is None:
+            try:
+                with open(cache_path('media.json')) as f:
+                    cls._cache = json.load(f)
+            except (OSError, ValueError):
+                cls._cache = {}
+        return cls._cache
+
+    @classmethod
+    def save_cache(cls, force=False):
+        """Escribe la caché si cambió (como mucho cada SAVE_INTERVAL segundos)"""
+        with cls._lock:
+            if not cls._dirty or (not force and time.time() - cls._saved_at < cls.SAVE_INTERVAL):
+                return
+            data = json.dumps(cls._cache)
+            cls._dirty = False
+            cls._saved_at = time.time()
+        try:
+            os.makedirs(cache_path(), exist_ok=True)
+            temp = cache_path(f'media.json.{os.getpid()}')
+            with open(temp, 'w') as f:
+                f.write(data)
+            os.replace(temp, cache_path('media.json'))
+        except OSError:
+            pass
+
+    @classmethod
+    def get(cls, path):
+        """Devuelve (ancho, alto, duración) con None donde no aplica"""
+        path = str(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return (None, None, None)
+        with cls._lock:
+            entry = cls._load_cache().get(path)
+            if entry and entry[0] == st.st_size and entry[1] == st.st_mtime_ns:
+                return tuple(entry[2:])
+
+        try:
+            with open(path, 'rb') as f:
+                result = cls.parse(f, st.st_size)
+        except (OSError, struct.error, ValueError, IndexError, ZeroDivisionError):
+            result = (None, None, None)
+
+        with cls._lock:
+            cache = cls._load_cache()
+            cache.pop(path, None)
+            cache[path] = [st.st_size, st.st_mtime_ns, *result]
+            if len(cache) > cls.MAX_ENTRIES:
+                del cache[next(iter(cache))]
+            cls._dirty = True
+        return result
+
+    @classmethod
+    def parse(cls, f, size):
+        head = f.read(32)
+        if head.startswith(b'\x89PNG\r\n\x1a\n') and head[12:16] == b'IHDR':
+            width, height = struct.unpack('>II', head[16:24])
+            return (width, height, None)
+        if head.startswith(b'\xff\xd8'):
+            return cls._jpeg(f) + (None,)
+        if head[:6] in (b'GIF87a', b'GIF89a'):
+            width, height = struct.unpack('<HH', head[6:10])
+            return (width, height, None)
+        if head.startswith(b'BM') and len(head) >= 26:
+            width, height = struct.unpack('<ii', head[18:26])
+            return (width, abs(height), None)
+        if head.startswith(b'RIFF') and head[8:12] == b'WEBP':
+            return cls._webp(f) + (None,)
+        if head.startswith(b'RIFF') and head[8:12] == b'WAVE':
+            return (None, None, cls._wav(f))
+        if head[4:8] == b'ftyp':
+            return cls._mp4(f, size)
+        if head.startswith(b'ID3') or head[:2] in (b'\xff\xfb', b'\xff\xf3', b'\xff\xfa', b'\xff\xf2'):
+            return (None, None, cls._mp3(f, size))
+        return (None, None, None)
+
+    @classmethod
+    def _jpeg(cls, f):
+        # Recorre los segmentos saltando su contenido hasta el marcador SOF
+        f.seek(2)
+        for _ in range(1000):
+            byte = f.read(1)
+            while byte == b'\xff':
+                byte = f.read(1)
+            if not byte:
+                break
+            marker = byte[0]
+            if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+                continue
+            length = struct.unpack('>H', f.read(2))[0]
+            if marker in cls.JPEG_SOF:
+                height, width = struct.unpack('>xHH', f.read(5))
+                return (width, height)
+            if marker == 0xDA:
+                break
+            f.seek(length - 2, os.SEEK_CUR)
+        return (None, None)
+
+    @staticmethod
+    def _webp(f):
+        f.seek(12)
+        chunk = f.read(18)
+        if chunk[:4] == b'VP8X':
+            width = int.from_bytes(chunk[12:15], 'little') + 1
+            height = int.from_bytes(chunk[15:18], 'little') + 1
+            return (width, height)
+        if chunk[:4] == b'VP8 ':
+            f.seek(26)
+            width, height = struct.unpack('<HH', f.read(4))
+            return (width & 0x3FFF, height & 0x3FFF)
+        if chunk[:4] == b'VP8L':
+            bits = int.from_bytes(chunk[9:13], 'little')
+            return ((bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1)
+        return (None, None)
+
+    @staticmethod
+    def _wav(f):
+        f.seek(12)
+        byte_rate = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                return None
+            chunk_id, chunk_size = struct.unpack('<4sI', header)
+            if chunk_id == b'fmt ':
+                byte_rate = struct.unpack('<8xI', f.read(12))[0]
+                f.seek(chunk_size - 12 + (chunk_size & 1), os.SEEK_CUR)
+            elif chunk_id == b'data':
+                return chunk_size / byte_rate if byte_rate else None
+            else:
+                f.seek(chunk_size + (chunk_size & 1), os.SEEK_CUR)
+
+    @classmethod
+    def _mp3(cls, f, size):
+        f.seek(0)
+        header = f.read(10)
+        start = 0
+        if header.startswith(b'ID3'):
+            # Tamaño "synchsafe": 7 bits útiles por byte
+            start = 10 + sum((b & 0x7F) << (7 * (3 - i)) for i, b in enumerate(header[6:10]))
+        f.seek(start)
+        data = f.read(64 * 1024)
+        for position in range(len(data) - 4):
+            if data[position] != 0xFF or (data[position + 1] & 0xE0) != 0xE0:
+                continue
+            b1, b2, b3 = data[position + 1:position + 4]
+            version = (b1 >> 3) & 0x3
+            layer = (b1 >> 1) & 0x3
+            bitrate_index = b2 >> 4
+            rate_index = (b2 >> 2) & 0x3
+            if version == 1 or layer != 1 or bitrate_index in (0, 15) or rate_index == 3:
+                continue  # Sincronización falsa o capa distinta de III
+            sample_rate = cls.MP3_SAMPLE_RATES[version][rate_index]
+            bitrate = cls.MP3_BITRATES[1 if version == 3 else 2][bitrate_index] * 1000
+            samples = 1152 if version == 3 else 576
+            mono = (b3 >> 6) == 3
+            # Cabecera Xing/Info tras la información lateral: número de tramas exacto
+            side = (17 if mono else 32) if version == 3 else (9 if mono else 17)
+            xing = data[position + 4 + side:position + 4 + side + 12]
+            if xing[:4] in (b'Xing', b'Info') and struct.unpack('>I', xing[4:8])[0] & 1:
+                frames = struct.unpack('>I', xing[8:12])[0]
+                return frames * samples / sample_rate
+            vbri = data[position + 36:position + 36 + 18]
+            if vbri[:4] == b'VBRI':
+                frames = struct.unpack('>I', vbri[14:18])[0]
+                return frames * samples / sample_rate
+            return (size - start - position) * 8 / bitrate
+        return None
+
+    @staticmethod
+    def _mp4_atoms(f, start, end):
+        position = start
+        while position + 8 <= end:
+            f.seek(position)
+            atom_size, atom_type = struct.unpack('>I4s', f.read(8))
+            header = 8
+            if atom_size == 1:
+                atom_size = struct.unpack('>Q', f.read(8))[0]
+                header = 16
+            elif atom_size == 0:
+                atom_size = end - position
+            if atom_size < header:
+                return
+            yield atom_type, position + header, position + atom_size
+            position += atom_size
+
+    @classmethod
+    def _mp4(cls, f, size):
+        # Solo se leen las cabeceras de los átomos: moov/mvhd y trak/tkhd
+        width = height = duration = None
+        for atom_type, start, end in cls._mp4_atoms(f, 0, size):
+            if atom_type != b'moov':
+                continue
+            for child, child_start, child_end in cls._mp4_atoms(f, start, end):
+                if child == b'mvhd':
+                    f.seek(child_start)
+                    version = f.read(4)[0]
+                    if version == 1:
+                        timescale, length = struct.unpack('>16xIQ', f.read(28))
+                    else:
+                        timescale, length = struct.unpack('>8xII', f.read(16))
+                    duration = length / timescale if timescale else None
+                elif child == b'trak' and not width:
+                    for leaf, leaf_start, _ in cls._mp4_atoms(f, child_start, child_end):
+                        if leaf == b'tkhd':
+                            f.seek(leaf_start)
+                            version = f.read(1)[0]
+                            f.seek(leaf_start + (88 if version == 1 else 76))
+                            track_width, track_height = struct.unpack('>II', f.read(8))
+                            if track_width >> 16:
+                                width, height = track_width >> 16, track_height >> 16
+            break
+        return (width, height, duration)
+
+    @staticmethod
+    def format_dimensions(width, height):
+        return f"{width}×{height}" if width and height else ""
+
+    @staticmethod
+    def format_duration(seconds):
+        if seconds is None:
+            return ""
+        seconds = int(round(seconds))
+        hours, rest = divmod(seconds, 3600)
+        minutes, seconds = divmod(rest, 60)
+        return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+class TransferEngine:
+    """Motor de copia de archivos y carpetas
+
+    En modo preservación copia solo las zonas con datos de los archivos
+    dispersos (SEEK_DATA/SEEK_HOLE) y recrea los grupos de enlaces duros
+    siguiendo (st_dev, st_ino) durante el recorrido.
+    """
+
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, preserve=False, job=None):
+        self.preserve = preserve
+        self.job = job              # BackgroundJob opcional para progreso/cancelación
+        self.bytes_transferred = 0  # Bytes realmente escritos
+        self.apparent_size = 0      # Suma de st_size de lo copiado
+        self.files_copied = 0
+        self.hardlinks = 0
+        self._inodes = {}           # (st_dev, st_ino) -> ruta destino
+
+    @staticmethod
+    def unique_destination(destination, file_path):
+        """Ruta libre en destination para file_path: «nombre (n).ext» si ya existe"""
+        dest_path = destination / file_path.name
+        counter = 1
+        while dest_path.exists():
+            if file_path.is_dir():
+                dest_path = destination / f"{file_path.stem} ({counter})"
+            else:
+                dest_path = destination / f"{file_path.stem} ({counter}){file_path.suffix}"
+            counter += 1
+        return dest_path
+
+    def paste(self, sources, destination, operation):
+        """Copia ('copy') o mueve ('cut') sources a destination sin sobrescribir"""
+        for index, file_path in enumerate(sources):
+            if self.job:
+                self.job.report(f"Copiando {file_path.name}", index / len(sources))
+            dest_path = self.unique_destination(destination, file_path)
+
+            # Miembros de un archivo comprimido: extraer en streaming
+            location = None if file_path.exists() else ArchiveIndex.split_virtual_path(file_path)
+            if location:
+                ArchiveIndex.load(location[0]).extract(location[1], dest_path, self)
+            elif operation == 'copy':
+                self.copy(file_path, dest_path)
+            elif operation == 'cut':
+                self.move(file_path, dest_path)
+
+    def copy(self, src, dst):
+        """Copia un archivo o carpeta en dst"""
+        src, dst = str(src), str(dst)
+        if os.path.isdir(src) and not os.path.islink(src):
+            self.copy_tree(src, dst)
+        else:
+            self.copy_file(src, dst)
+
+    def move(self, src, dst):
+        """Mueve un archivo o carpeta, copiando si cambia el sistema de archivos"""
+        src, dst = str(src), str(dst)
+        if not self.preserve:
+            shutil.move(src, dst)
+            return
+        try:
+            os.rename(src, dst)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            self.copy(src, dst)
+            if os.path.isdir(src) and not os.path.islink(src):
+                shutil.rmtree(src)
+            else:
+                os.unlink(src)
+
+    def copy_tree(self, src, dst):
+        """Copia una carpeta de forma recursiva"""
+        if not self.preserve:
+            shutil.copytree(src, dst, copy_function=self._copy_plain)
+            return
+
+        os.makedirs(dst)
+        with os.scandir(src) as entries:
+            for entry in entries:
+                target = os.path.join(dst, entry.name)
+                if entry.is_symlink():
+                    os.symlink(os.readlink(entry.path), target)
+                elif entry.is_dir(follow_symlinks=False):
+                    self.copy_tree(entry.path, target)
+                else:
+                    self.copy_file(entry.path, target, entry.stat(follow_symlinks=False))
+        shutil.copystat(src, dst)
+
+    def copy_file(self, src, dst, st=None):
+        """Copia un único archivo"""
+        if not self.preserve:
+            self._copy_plain(src, dst)
+            return
+
+        if st is None:
+            st = os.lstat(src)
+
+        if os.path.islink(src):
+            os.symlink(os.readlink(src), dst)
+            return
+
+        # Enlaces duros: el primer miembro del grupo se copia, el resto se enlaza
+        if st.st_nlink > 1:
+            key = (st.st_dev, st.st_ino)
+            first_copy = self._inodes.get(key)
+            if first_copy is not None:
+                os.link(first_copy, dst)
+                self.hardlinks += 1
+                self.apparent_size += st.st_size
+                return
+            self._inodes[key] = dst
+
+        self._copy_sparse(src, dst, st.st_size)
+        shutil.copystat(src, dst)
+        self.files_copied += 1
+        self.apparent_size += st.st_size
+
+    def copy_stream(self, fsrc, dst):
+        """Copia desde un objeto archivo (p. ej. un miembro comprimido) en bloques"""
+        written = 0
+        with open(dst, 'wb') as fdst:
+            while True:
+                self._progress()
+                data = fsrc.read(self.CHUNK_SIZE)
+                if not data:
+                    break
+                fdst.write(data)
+                written += len(data)
+                self.bytes_transferred += len(data)
+        self.files_copied += 1
+        self.apparent_size += written
+
+    def _progress(self):
+        if self.job:
+            self.job.check_cancelled()
+            self.job.report(f"{self.bytes_transferred // (1024 * 1024)} MB transferidos")
+
+    def _copy_plain(self, src, dst, **kwargs):
+        """Copia con shutil.copy2 contabilizando el tamaño"""
+        self._progress()
+        size = os.path.getsize(src)
+        result = shutil.copy2(src, dst, **kwargs)
+        self.files_copied += 1
+        self.bytes_transferred += size
+        self.apparent_size += size
+        return result
+
+    def _copy_sparse(self, src, dst, size):
+        """Copia solo las zonas con datos y deja los huecos sin escribir"""
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            infd, outfd = fsrc.fileno(), fdst.fileno()
+            offset = 0
+            while offset < size:
+                try:
+                    data_start = os.lseek(infd, offset, os.SEEK_DATA)
+                    data_end = os.lseek(infd, data_start, os.SEEK_HOLE)
+                except OSError as e:
+                    if e.errno == errno.ENXIO:
+                        break  # Solo quedan huecos hasta el final
+                    if e.errno not in (errno.EINVAL, errno.EOPNOTSUPP):
+                        raise
+                    # El sistema de archivos no informa de huecos
+                    data_start, data_end = offset, size
+                self._copy_range(infd, outfd, data_start, data_end - data_start)
+                offset = data_end
+            # Extender hasta el tamaño aparente sin escribir el hueco final
+            os.ftruncate(outfd, size)
+
+    def _copy_range(self, infd, outfd, offset, length):
+        """Copia un rango de bytes en la misma posición del destino"""
+        end = offset + length
+        while offset < end:
+            self._progress()
+            chunk = min(self.CHUNK_SIZE, end - offset)
+            data = os.pread(infd, chunk, offset)
+            if not data:
+                break
+            os.pwrite(outfd, data, offset)
+            offset += len(data)
+            self.bytes_transferred += len(data)
+
+class ArchiveIndex:
+    """Índice de miembros de un zip/tar para navegarlo como carpeta virtual
+
+    Solo lee el directorio central (zip) o las cabeceras (tar) y guarda el
+    índice en disco, invalidado por tamaño y mtime del archivo. Para tar se
+    guarda además la posición de los datos de cada miembro, de modo que
+    extraer no requiere volver a recorrer las cabeceras.
+    """
+
+    EXTENSIONS = ('.zip', '.jar', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+
+    _memory = {}  # ruta -> ((tamaño, mtime_ns), índice)
+
+    def __init__(self, path, kind, members):
+        self.path = str(path)
+        self.kind = kind
+        self.members = {}       # nombre -> (tamaño, mtime, es_carpeta, offset de datos, nombre original)
+        self.children = {'': {}}  # carpeta -> {nombre base: nombre completo}
+        for member in members:
+            self._add(*member)
+
+    def _add(self, name, size, mtime, is_dir, offset):
+        raw = name  # Para abrir el miembro hace falta el nombre tal y como está guardado
+        while name.startswith('./'):
+            name = name[2:]
+        name = name.strip('/')
+        # Descartar nombres que escaparían de la carpeta de destino
+        if not name or any(part in ('', '.', '..') for part in name.split('/')):
+            return
+
+        self.members[name] = (size, mtime, is_dir, offset, raw)
+        parent, _, base = name.rpartition('/')
+        self.children.setdefault(parent, {})[base] = name
+        if is_dir:
+            self.children.setdefault(name, {})
+
+        # Registrar las carpetas implícitas (miembros 'a/b/c' sin entrada 'a/')
+        while parent and parent not in self.members:
+            self.members[parent] = (0, mtime, True, None, None)
+            grandparent, _, base = parent.rpartition('/')
+            self.children.setdefault(grandparent, {})[base] = parent
+            self.children.setdefault(parent, {})
+            parent = grandparent
+
+    def is_dir(self, inner):
+        """Indica si la ruta interna es una carpeta del archivo"""
+        return inner == '' or inner in self.members and self.members[inner][2]
+
+    def list_dir(self, inner):
+        """Devuelve [(nombre, tamaño, mtime, es_carpeta)] de una carpeta interna"""
+        entries = []
+        for base, name in self.children.get(inner, {}).items():
+            size, mtime, is_dir, _, _ = self.members[name]
+            entries.append((base, size, mtime, is_dir))
+        return entries
+
+    @staticmethod
+    def is_archive(path):
+        """Comprueba por la extensión si se puede navegar el archivo"""
+        return str(path).lower().endswith(ArchiveIndex.EXTENSIONS)
+
+    @staticmethod
+    def split_virtual_path(path):
+        """Separa /ruta/a.zip/dentro en (Path('/ruta/a.zip'), 'dentro')"""
+        path = Path(path)
+        for candidate in [path, *path.parents]:
+            if ArchiveIndex.is_archive(candidate) and candidate.is_file():
+                inner = path.relative_to(candidate).as_posix()
+                return candidate, '' if inner == '.' else inner
+        return None
+
+    @staticmethod
+    def _cache_file(path):
+        digest = hashlib.sha1(path.encode('utf-8', 'surrogateescape')).hexdigest()
+        return cache_path('archives', digest + '.json')
+
+    @classmethod
+    def load(cls, path, job=None):
+        """Devuelve el índice desde la caché o escaneando el archivo"""
+        return cls.load_cached(path) or cls.build(path, job)
+
+    @classmethod
+    def cached(cls, path):
+        """Devuelve el índice ya cargado en memoria si sigue vigente, o None
+
+        Solo cuesta un stat: es la comprobación que se hace desde la interfaz.
+        """
+        path = os.path.abspath(str(path))
+        st = os.stat(path)
+        cached = cls._memory.get(path)
+        if cached and cached[0] == (st.st_size, st.st_mtime_ns):
+            return cached[1]
+        return None
+
+    @classmethod
+    def load_cached(cls, path):
+        """Devuelve el índice en memoria o en disco si sigue vigente, o None"""
+        path = os.path.abspath(str(path))
+        st = os.stat(path)
+        key = (st.st_size, st.st_mtime_ns)
+        cached = cls._memory.get(path)
+        if cached and cached[0] == key:
+            return cached[1]
+
+        try:
+            with open(cls._cache_file(path), 'r') as f:
+                data = json.load(f)
+            if (data['size'], data['mtime_ns']) != key:
+                return None
+            index = cls(path, data['kind'], data['members'])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+        cls._memory[path] = (key, index)
+        return index
+
+    @classmethod
+    def build(cls, path, job=None):
+        """Escanea el archivo y guarda su índice en memoria y en disco"""
+        path = os.path.abspath(str(path))
+        st = os.stat(path)
+        key = (st.st_size, st.st_mtime_ns)
+
+        if zipfile.is_zipfile(path):
+            kind = 'zip'
+            members = cls._scan_zip(path)
+        else:
+            kind = 'tar'
+            members = cls._scan_tar(path, st.st_size, job)
+
+        index = cls(path, kind, members)
+        cls._memory[path] = (key, index)
+        try:
+            cache_file = cls._cache_file(path)
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            with open(cache_file, 'w') as f:
+                json.dump({'size': key[0], 'mtime_ns': key[1], 'kind': kind, 'members': members}, f)
+        except OSError:
+            pass
+        return index
+
+    @staticmethod
+    def _scan_zip(path):
+        # ZipFile solo lee el directorio central al abrir
+        members = []
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                try:
+                    mtime = time.mktime(info.date_time + (0, 0, -1))
+                except (OverflowError, ValueError):
+                    mtime = 0
+                members.append((info.filename, info.file_size, mtime, info.is_dir(), None))
+        return members
+
+    @staticmethod
+    def _scan_tar(path, total_size, job=None):
+        members = []
+        with open(path, 'rb') as raw, tarfile.open(fileobj=raw, mode='r:*') as archive:
+            while True:
+                info = archive.next()
+                if info is None:
+                    break
+                # No acumular TarInfo: con millones de miembros dispara la memoria
+                archive.members.clear()
+                if not (info.isreg() or info.isdir()):
+                    continue
+                offset = None if info.sparse else info.offset_data
+                members.append((info.name, info.size, info.mtime, info.isdir(), offset))
+                if job and len(members) % 500 == 0:
+                    job.check_cancelled()
+                    job.report(f"{len(members)} miembros leídos", raw.tell() / (total_size or 1))
+        return members
+
+    def _open(self):
+        if self.kind == 'zip':
+            return zipfile.ZipFile(self.path)
+        return tarfile.open(self.path, 'r:*')
+
+    def _open_member(self, archive, name):
+        size, _, _, offset, raw = self.members[name]
+        if self.kind == 'zip':
+            return archive.open(raw)
+        if offset is None:
+            return archive.extractfile(archive.getmember(raw))
+        # Saltar directamente a los datos usando la posición del índice
+        info = tarfile.TarInfo(name)
+        info.type = tarfile.REGTYPE
+        info.size = size
+        info.offset_data = offset
+        return archive.extractfile(info)
+
+    def extract(self, inner, dst, engine):
+        """Copia un miembro o una carpeta interna en dst a través del motor de copia"""
+        inner = inner.strip('/')
+        dst = str(dst)
+        with self._open() as archive:
+            if not self.is_dir(inner):
+                self._extract_file(archive, inner, dst, engine)
+                return
+
+            os.makedirs(dst)
+            prefix = inner + '/' if inner else ''
+            # Orden del archivo: en tar comprimido retroceder obliga a descomprimir de nuevo
+            for name, (size, mtime, is_dir, offset, _) in self.members.items():
+                if not name.startswith(prefix):
+                    continue
+                target = os.path.join(dst, name[len(prefix):])
+                if is_dir:
+                    os.makedirs(target, exist_ok=True)
+                else:
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    self._extract_file(archive, name, target, engine)
+
+    def _extract_file(self, archive, name, dst, engine):
+        mtime = self.members[name][1]
+        with self._open_member(archive, name) as src:
+            engine.copy_stream(src, dst)
+        os.utime(dst, (mtime, mtime))
+
+class ArchiveCreator:
+    """Creación de archivos zip/tar en streaming
+
+    En zip cada miembro se comprime con zlib en un hilo distinto (zlib libera
+    el GIL) sobre un temporal que pasa a disco si es grande; el hilo escritor
+    vuelca los resultados en orden. zipfile no admite datos ya comprimidos
+    por su API pública, así que las cabeceras (zip64 incluido) se escriben
+    aquí con struct. En tar la compresión se delega en pigz/xz/zstd
+    multihilo cuando están instalados.
+    """
+
+    CHUNK_SIZE = 1024 * 1024
+    SPOOL_SIZE = 1024 * 1024  # Miembros comprimidos menores quedan en memoria
+    ZIP64_LIMIT = 0xFFFFFFFF
+    ZIP_ENTRIES_LIMIT = 0xFFFF
+
+    LOCAL_HEADER = struct.Struct('<IHHHHHIIIHH')
+    CENTRAL_HEADER = struct.Struct('<IHHHHHHIIIHHHHHII')
+    END_RECORD = struct.Struct('<IHHHHIIH')
+    ZIP64_END_RECORD = struct.Struct('<IQHHIIQQQQ')
+    ZIP64_LOCATOR = struct.Struct('<IIQI')
+
+    FORMATS = ('zip', 'tar', 'tar.gz', 'tar.xz', 'tar.zst')
+
+    # Compresores externos multihilo; '{level}' se sustituye por el nivel
+    COMPRESSORS = {
+        'gz': ['pigz', '-{level}', '-c'],
+        'xz': ['xz', '-T0', '-{level}', '-c'],
+        'zst': ['zstd', '-T0', '-{level}', '-c', '-q'],
+    }
+
+    def __init__(self, sources, dst, archive_format='zip', level=6, job=None):
+        self.sources = [Path(p) for p in sources]
+        self.dst = str(dst)
+        self.format = archive_format
+        self.level = level
+        self.job = job
+        self.workers = min(32, os.cpu_count() or 1)
+        self.input_bytes = 0
+        self.members = 0
+
+    @staticmethod
+    def available_formats():
+        """Formatos que se pueden crear con lo instalado en el sistema"""
+        return [f for f in ArchiveCreator.FORMATS if f != 'tar.zst' or shutil.which('zstd')]
+
+    def collect(self):
+        """Devuelve [(ruta, nombre en el archivo, tipo, tamaño)] de la selección"""
+        entries = []
+        for source in self.sources:
+            base = source.parent
+            if source.is_dir() and not source.is_symlink():
+                for root, dirnames, filenames in os.walk(source):
+                    entries.append((root, os.path.relpath(root, base), 'dir', 0))
+                    for name in sorted(filenames) + [d for d in dirnames if os.path.islink(os.path.join(root, d))]:
+                        path = os.path.join(root, name)
+                        entries.append(self._entry(path, os.path.relpath(path, base)))
+                    dirnames[:] = sorted(d for d in dirnames if not os.path.islink(os.path.join(root, d)))
+            else:
+                entries.append(self._entry(str(source), source.name))
+        return entries
+
+    @staticmethod
+    def _entry(path, arcname):
+        st = os.lstat(path)
+        kind = 'link' if os.path.islink(path) else 'file'
+        return (path, arcname, kind, st.st_size if kind == 'file' else 0)
+
+    def create(self):
+        """Crea el archivo y devuelve (bytes de entrada, bytes de salida, segundos)"""
+        start = time.time()
+        entries = self.collect()
+        self.total_bytes = sum(entry[3] for entry in entries) or 1
+        try:
+            if self.format == 'zip':
+                self._create_zip(entries)
+            else:
+                self._create_tar(entries)
+        except BaseException:
+            try:
+                os.unlink(self.dst)
+            except OSError:
+                pass
+            raise
+        return self.input_bytes, os.path.getsize(self.dst), time.time() - start
+
+    def _progress(self, name):
+        if self.job:
+            self.job.check_cancelled()
+            self.job.report(f"{self.members} elementos: {name}", self.input_bytes / self.total_bytes)
+
+    def _compress_member(self, path):
+        """Comprime un archivo en deflate crudo; se ejecuta en el pool
+
+        Devuelve también el archivo abierto: si los datos no se dejan
+        comprimir, el escritor los copia desde ese mismo descriptor.
+        """
+        source = open(path, 'rb')
+        spool = tempfile.SpooledTemporaryFile(max_size=self.SPOOL_SIZE, dir=os.path.dirname(self.dst))
+        try:
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, -15)
+            crc = 0
+            size = 0
+            while True:
+                if self.job and self.job.cancel_event.is_set():
+                    raise JobCancelled()
+                chunk = source.read(self.CHUNK_SIZE)
+                if not chunk:
+                    break
+                crc = zlib.crc32(chunk, crc)
+                size += len(chunk)
+                spool.write(compressor.compress(chunk))
+            spool.write(compressor.flush())
+        except BaseException:
+            spool.close()
+            source.close()
+            raise
+        return source, spool, crc, size
+
+    def _create_zip(self, entries):
+        central = []  # Entradas del directorio central
+        with ThreadPoolExecutor(max_workers=self.workers) as pool, open(self.dst, 'wb') as out:
+            # Ventana acotada: el escritor no se queda atrás acumulando temporales
+            pending = collections.deque()
+            try:
+                for entry in entries:
+                    # zip no guarda enlaces: los que apuntan a archivos se comprimen como tales
+                    is_file = entry[2] == 'file' or entry[2] == 'link' and os.path.isfile(entry[0])
+                    future = pool.submit(self._compress_member, entry[0]) if is_file else None
+                    pending.append((entry, future))
+                    while len(pending) > self.workers * 2:
+                        self._write_zip_member(out, central, *pending.popleft())
+                while pending:
+                    self._write_zip_member(out, central, *pending.popleft())
+            finally:
+                for _, future in pending:
+                    if future and not future.cancel() and not future.exception():
+                        source, spool, _, _ = future.result()
+                        source.close()
+                        spool.close()
+            self._write_central_directory(out, central)
+
+    @staticmethod
+    def _dos_time(mtime):
+        moment = time.localtime(max(mtime, 315532800))  # zip no guarda fechas anteriores a 1980
+        date = (moment.tm_year - 1980) << 9 | moment.tm_mon << 5 | moment.tm_mday
+        clock = moment.tm_hour << 11 | moment.tm_min << 5 | moment.tm_sec // 2
+        return clock, date
+
+    def _write_zip_member(self, out, central, entry, future):
+        path, arcname, kind, _ = entry
+        self._progress(arcname)
+        if future is None and kind != 'dir':
+            return
+        st = os.stat(path)
+        name = arcname.replace(os.sep, '/') + ('/' if kind == 'dir' else '')
+        encoded = name.encode('utf-8', 'surrogateescape')
+        flags = 0x800 if not name.isascii() else 0  # Bit 11: nombre en UTF-8
+        offset = out.tell()
+
+        if future is None:
+            method, crc, size, compressed = 0, 0, 0, 0
+            data = None
+        else:
+            source, spool, crc, size = future.result()
+            compressed = spool.tell()
+            if compressed < size:
+                method, data = 8, spool
+                spool.seek(0)
+            else:
+                # Datos incompresibles: guardar tal cual desde el mismo descriptor
+                method, data, compressed = 0, source, size
+                source.seek(0)
+
+        zip64 = size >= self.ZIP64_LIMIT or compressed >= self.ZIP64_LIMIT
+        extra = struct.pack('<HHQQ', 1, 16, size, compressed) if zip64 else b''
+        clock, date = self._dos_time(st.st_mtime)
+        out.write(self.LOCAL_HEADER.pack(
+            0x04034b50, 45 if zip64 else 20, flags, method, clock, date, crc,
+            0xFFFFFFFF if zip64 else compressed, 0xFFFFFFFF if zip64 else size,
+            len(encoded), len(extra)))
+        out.write(encoded)
+        out.write(extra)
+        if data is not None:
+            try:
+                remaining = compressed
+                while remaining:
+                    chunk = data.read(min(self.CHUNK_SIZE, remaining))
+                    if not chunk:
+                        raise OSError(f"{path} cambió mientras se comprimía")
+                    out.write(chunk)
+                    remaining -= len(chunk)
+            finally:
+                source.close()
+                spool.close()
+
+        attributes = (st.st_mode & 0xFFFF) << 16 | (0x10 if kind == 'dir' else 0)
+        central.append((encoded, flags, method, clock, date, crc, compressed, size, offset, attributes))
+        self.members += 1
+        self.input_bytes += size
+
+    def _write_central_directory(self, out, central):
+        start = out.tell()
+        for encoded, flags, method, clock, date, crc, compressed, size, offset, attributes in central:
+            # En el directorio central el extra zip64 solo lleva los campos desbordados
+            values = [value for value in (size, compressed, offset) if value >= self.ZIP64_LIMIT]
+            extra = struct.pack(f'<HH{len(values)}Q', 1, 8 * len(values), *values) if values else b''
+            out.write(self.CENTRAL_HEADER.pack(
+                0x02014b50, 3 << 8 | 45, 45 if values else 20, flags, method, clock, date, crc,
+                self._zip32(compressed), self._zip32(size),
+                len(encoded), len(extra), 0, 0, 0, attributes, self._zip32(offset)))
+            out.write(encoded)
+            out.write(extra)
+        end = out.tell()
+        count, length = len(central), end - start
+
+        if count >= self.ZIP_ENTRIES_LIMIT or start >= self.ZIP64_LIMIT or length >= self.ZIP64_LIMIT:
+            out.write(self.ZIP64_END_RECORD.pack(0x06064b50, self.ZIP64_END_RECORD.size - 12,
+                                                 3 << 8 | 45, 45, 0, 0, count, count, length, start))
+            out.write(self.ZIP64_LOCATOR.pack(0x07064b50, 0, end, 1))
+        entries = 0xFFFF if count >= self.ZIP_ENTRIES_LIMIT else count
+        out.write(self.END_RECORD.pack(0x06054b50, 0, 0, entries, entries,
+                                       self._zip32(length), self._zip32(start), 0))
+
+    def _zip32(self, value):
+        """Campo de 32 bits: los valores desbordados se marcan y van en el extra zip64"""
+        return 0xFFFFFFFF if value >= self.ZIP64_LIMIT else value
+
+    def _create_tar(self, entries):
+        compression = self.format.partition('.')[2]
+        command = self.COMPRESSORS.get(compression)
+        if command and shutil.which(command[0]):
+            command = [arg.replace('{level}', str(self.level)) for arg in command]
+            with open(self.dst, 'wb') as out:
+                process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=out)
+                try:
+                    with tarfile.open(fileobj=process.stdin, mode='w|') as archive:
+                        self._add_tar_members(archive, entries)
+                finally:
+                    process.stdin.close()
+                    returncode = process.wait()
+            if returncode != 0:
+                raise OSError(f"{command[0]} terminó con código {returncode}")
+            return
+
+        if compression == 'gz':
+            archive = tarfile.open(self.dst, 'w:gz', compresslevel=self.level)
+        elif compression == 'xz':
+            archive = tarfile.open(self.dst, 'w:xz', preset=self.level)
+        elif compression:
+            raise OSError(f"No hay compresor disponible para .{compression}")
+        else:
+            archive = tarfile.open(self.dst, 'w')
+        with archive:
+            self._add_tar_members(archive, entries)
+
+    def _add_tar_members(self, archive, entries):
+        for path, arcname, kind, size in entries:
+            self._progress(arcname)
+            archive.add(path, arcname, recursive=False)
+            self.members += 1
+            self.input_bytes += size
+
+def generate_thumbnail(path, uri, mtime, out_path, fail_path, size):
+    """Genera una miniatura PNG freedesktop; se ejecuta en un proceso del pool"""
+    info = PngInfo()
+    info.add_text('Thumb::URI', uri)
+    info.add_text('Thumb::MTime', str(mtime))
+    info.add_text('Software', ThumbnailCache.APP_NAME)
+    try:
+        with Image.open(path) as img:
+            # En JPEG, draft() escala al decodificar (DCT) sin leer la imagen completa
+            img.draft('RGB', (size, size))
+            img.thumbnail((size, size))
+            if img.mode not in ('RGB', 'RGBA'):
+                img = img.convert('RGBA')
+            ThumbnailCache.save_png(img, out_path, info)
+        return out_path
+    except Exception:
+        # Registrar el fallo para no volver a intentarlo mientras no cambie el archivo
+        try:
+            ThumbnailCache.save_png(Image.new('RGBA', (1, 1)), fail_path, info)
+        except Exception:
+            pass
+        return None
+
+class ThumbnailCache:
+    """Miniaturas compartidas según la especificación freedesktop.org
+
+    Se guardan en $XDG_CACHE_HOME/thumbnails/normal como md5(URI).png y se
+    validan con Thumb::MTime, así que se comparten con otros gestores de
+    archivos. Se generan en un pool de procesos acotado y solo para las
+    celdas visibles.
+    """
+
+    SIZE = 128
+    APP_NAME = 'linux-file-explorer'
+    IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.webp', '.tif', '.tiff', '.ico')
+
+    def __init__(self, max_workers=None):
+        base = os.environ.get('XDG_CACHE_HOME') or str(Path.home() / '.cache')
+        self.normal_dir = os.path.join(base, 'thumbnails', 'normal')
+        self.fail_dir = os.path.join(base, 'thumbnails', 'fail', self.APP_NAME)
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self.results = queue.Queue()  # (ruta, miniatura o None) desde el pool
+        self._pool = None
+        self._pending = {}  # ruta -> future
+
+    @staticmethod
+    def available():
+        """Indica si Pillow está instalado"""
+        return Image is not None
+
+    @staticmethod
+    def uri_for(path):
+        return 'file://' + quote(os.path.abspath(str(path)))
+
+    @staticmethod
+    def save_png(img, out_path, info):
+        """Guarda de forma atómica con permisos 0600, como pide la especificación"""
+        os.makedirs(os.path.dirname(out_path), mode=0o700, exist_ok=True)
+        temp_path = f"{out_path}.{os.getpid()}.tmp"
+        img.save(temp_path, 'PNG', pnginfo=info)
+        os.chmod(temp_path, 0o600)
+        os.replace(temp_path, out_path)
+
+    @staticmethod
+    def read_png_text(path):
+        """Lee los bloques tEXt de un PNG sin decodificar la imagen"""
+        text = {}
+        try:
+            with open(path, 'rb') as f:
+                if f.read(8) != b'\x89PNG\r\n\x1a\n':
+                    return text
+                while True:
+                    header = f.read(8)
+                    if len(header) < 8:
+                        break
+                    length, chunk_type = struct.unpack('>I4s', header)
+                    if chunk_type in (b'IDAT', b'IEND'):
+                        break
+                    data = f.read(length)
+                    f.seek(4, 1)  # CRC
+                    if chunk_type == b'tEXt':
+                        key, _, value = data.partition(b'\0')
+                        text[key.decode('latin-1')] = value.decode('latin-1')
+        except OSError:
+            pass
+        return text
+
+    def lookup(self, path, mtime):
+        """Devuelve la ruta de la miniatura vigente, False si falló antes o None"""
+        name = hashlib.md5(self.uri_for(path).encode()).hexdigest() + '.png'
+        mtime = str(int(mtime))
+        candidate = os.path.join(self.normal_dir, name)
+        if self.read_png_text(candidate).get('Thumb::MTime') == mtime:
+            return candidate
+        if self.read_png_text(os.path.join(self.fail_dir, name)).get('Thumb::MTime') == mtime:
+            return False
+        return None
+
+    def request(self, path, mtime):
+        """Encola la generación de una miniatura si no está ya pendiente"""
+        path = str(path)
+        if not self.available() or path in self._pending:
+            return
+        if self._pool is None:
+            # spawn: los procesos hijos no heredan el estado de Tk
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                mp_context=multiprocessing.get_context('spawn'))
+        uri = self.uri_for(path)
+        name = hashlib.md5(uri.encode()).hexdigest() + '.png'
+        future = self._pool.submit(generate_thumbnail, path, uri, int(mtime),
+                                    os.path.join(self.normal_dir, name),
+                                    os.path.join(self.fail_dir, name), self.SIZE)
+        self._pending[path] = future
+        future.add_done_callback(lambda f: self._finished(path, f))
+
+    def _finished(self, path, future):
+        self._pending.pop(path, None)
+        if not future.cancelled():
+            self.results.put((path, None if future.exception() else future.result()))
+
+    def cancel_except(self, paths):
+        """Cancela las peticiones de celdas que ya no son visibles"""
+        for path, future in list(self._pending.items()):
+            if path not in paths and future.cancel():
+                self._pending.pop(path, None)
+
+    def has_pending(self):
+        return bool(self._pending) or not self.results.empty()
+
+    def shutdown(self):
+        if self._pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+class FilePreview:
+    """Vista previa acotada de archivos: texto, imagen reducida o volcado hex
+
+    Solo se leen los primeros bytes con pread, así que previsualizar un
+    archivo de 50 GB cuesta lo mismo que uno de 1 KB.
+    """
+
+    TEXT_BYTES = 64 * 1024
+    HEX_BYTES = 4 * 1024
+    IMAGE_SIZE = 320
+
+    @staticmethod
+    def compute(path, is_current=lambda: True):
+        """Devuelve un dict con 'kind' (text, image, hex, info) y su contenido"""
+        path = str(path)
+        if os.path.isdir(path):
+            try:
+                with os.scandir(path) as entries:
+                    count = sum(1 for _ in zip(range(10000), entries))
+            except OSError as e:
+                return {'kind': 'info', 'info': f"Carpeta sin acceso: {e.strerror}"}
+            more = "+" if count == 10000 else ""
+            return {'kind': 'info', 'info': f"Carpeta con {count}{more} elementos"}
+        if not os.path.isfile(path):
+            # FIFOs, dispositivos o miembros de archivos comprimidos: nunca leerlos
+            return {'kind': 'info', 'info': "Sin vista previa"}
+
+        if Image is not None and path.lower().endswith(ThumbnailCache.IMAGE_EXTENSIONS):
+            try:
+                with Image.open(path) as img:
+                    info = f"Imagen {img.width}×{img.height} ({img.format})"
+                    img.draft('RGB', (FilePreview.IMAGE_SIZE, FilePreview.IMAGE_SIZE))
+                    img.thumbnail((FilePreview.IMAGE_SIZE, FilePreview.IMAGE_SIZE))
+                    img.load()
+                    return {'kind': 'image', 'image': img.copy(), 'info': info}
+            except Exception:
+                pass  # Mostrarla como binario
+
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return {'kind': 'info', 'info': "Archivo vacío"}
+            if not is_current():
+                return None
+            head = os.pread(f.fileno(), FilePreview.TEXT_BYTES, 0)
+
+        truncated = size > len(head)
+        text, encoding = FilePreview.decode_text(head)
+        if text is not None:
+            info = f"Texto ({encoding})" + (f", primeros {len(head) // 1024} KB" if truncated else "")
+            return {'kind': 'text', 'text': text, 'info': info}
+        return {'kind': 'hex', 'text': FilePreview.hex_dump(head[:FilePreview.HEX_BYTES]),
+                'info': f"Binario, primeros {min(len(head), FilePreview.HEX_BYTES)} bytes"}
+
+    @staticmethod
+    def decode_text(data):
+        """Detecta la codificación; devuelve (texto, codificación) o (None, None) si es binario"""
+        for bom, encoding in ((codecs.BOM_UTF8, 'utf-8-sig'), (codecs.BOM_UTF16_LE, 'utf-16-le'),
+                                (codecs.BOM_UTF16_BE, 'utf-16-be')):
+            if data.startswith(bom):
+                decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+                return decoder.decode(data[len(bom):] if encoding != 'utf-8-sig' else data), encoding
+
+        if b'\0' in data:
+            return None, None
+        try:
+            # Incremental: el corte puede partir un carácter multibyte al final
+            return codecs.getincrementaldecoder('utf-8')().decode(data, final=False), 'utf-8'
+        except UnicodeDecodeError:
+            pass
+
+        # Sin UTF-8 válido: texto de 8 bits si casi no hay caracteres de control
+        controls = sum(1 for byte in data if byte < 32 and byte not in (9, 10, 13, 12, 27))
+        if controls > len(data) // 100:
+            return None, None
+        return data.decode('cp1252', errors='replace'), 'cp1252'
+
+    @staticmethod
+    def hex_dump(data, offset=0):
+        """Formatea bytes como volcado hexadecimal de 16 columnas"""
+        lines = []
+        for start in range(0, len(data), 16):
+            chunk = data[start:start + 16]
+            hex_part = ' '.join(f"{byte:02x}" for byte in chunk)
+            ascii_part = ''.join(chr(byte) if 32 <= byte < 127 else '.' for byte in chunk)
+            lines.append(f"{offset + start:08x}  {hex_part:<47}  |{ascii_part}|")
+        return '\n'.join(lines)
+
+class MappedFile:
+    """Archivo grande abierto para lectura por ventanas con índice de líneas incremental
+
+    El índice es disperso: por cada bloque de 64 KB guarda cuántos saltos de
+    línea hay antes de él, así que ocupa unos 5 MB para 20 GB. Se construye en
+    segundo plano. Todas las lecturas usan pread en vez de una proyección
+    mmap: si otro proceso trunca el archivo, leer más allá del final de una
+    proyección mata el proceso con SIGBUS, y pread solo devuelve menos bytes.
+    """
+
+    BLOCK_SIZE = 64 * 1024
+    READ_SIZE = 4 * 1024 * 1024
+    MAX_LINE = 4096  # Las líneas más largas se parten al mostrarlas
+    SEARCH_WINDOW = 4 * 1024 * 1024
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._file = open(self.path, 'rb')
+        self.size = os.fstat(self._file.fileno()).st_size
+        self.block_lines = array('Q', [0])  # saltos de línea antes de cada bloque
+        self.indexed_bytes = 0
+        self.total_lines = None  # Se conoce al terminar el índice
+        self.closed = False
+        self._lock = threading.Lock()  # Evita cerrar mientras se lee en otro hilo
+        self._stop = threading.Event()
+
+    def start_indexing(self):
+        """Construye el índice de líneas en un hilo"""
+        thread = threading.Thread(target=self._build_index)
+        thread.daemon = True
+        thread.start()
+
+    def _build_index(self):
+        lines = 0
+        offset = 0
+        last_byte = b'\n'
+        while offset < self.size and not self._stop.is_set():
+            data = self.read(offset, self.READ_SIZE)
+            if not data:
+                break
+            for start in range(0, len(data), self.BLOCK_SIZE):
+                lines += data.count(b'\n', start, start + self.BLOCK_SIZE)
+                self.block_lines.append(lines)
+            offset += len(data)
+            last_byte = data[-1:]
+            self.indexed_bytes = offset
+        if offset >= self.size:
+            self.total_lines = lines + (last_byte != b'\n')
+
+    def close(self):
+        self._stop.set()
+        with self._lock:
+            self.closed = True
+            self._file.close()
+
+    def check_size(self):
+        """Ajusta size si el archivo se truncó; devuelve True si cambió"""
+        with self._lock:
+            if self.closed:
+                return False
+            size = os.fstat(self._file.fileno()).st_size
+        if size >= self.size:
+            return False
+        self.size = size
+        return True
+
+    def read(self, offset, length):
+        """Bytes desde offset; menos (o ninguno) si el archivo es más corto"""
+        length = min(length, self.size - offset)
+        if offset < 0 or length <= 0:
+            return b''
+        with self._lock:
+            if self.closed:
+                return b''
+            return os.pread(self._file.fileno(), length, offset)
+
+    def line_start(self, line):
+        """Offset del comienzo de una línea (base 0) o None si aún no está indexada"""
+        if line <= 0 or not self.size:
+            return 0
+        block = bisect.bisect_left(self.block_lines, line) - 1
+        if block + 1 >= len(self.block_lines):
+            return None
+        # La línea empieza dentro del bloque: sus saltos están en esos 64 KB
+        start = block * self.BLOCK_SIZE
+        data = self.read(start, self.BLOCK_SIZE)
+        position = 0
+        for _ in range(line - self.block_lines[block]):
+            position = data.find(b'\n', position) + 1
+            if not position:
+                return min(start + len(data), self.size)  # Truncado desde que se indexó
+        return start + position
+
+    def line_number(self, offset):
+        """Número de línea (base 0) de un offset o None si aún no está indexado"""
+        block = offset // self.BLOCK_SIZE
+        if not self.size or block >= len(self.block_lines):
+            return None if self.size else 0
+        start = block * self.BLOCK_SIZE
+        return self.block_lines[block] + self.read(start, offset - start).count(b'\n')
+
+    def next_line(self, offset):
+        """Offset de la línea siguiente"""
+        data = self.read(offset, self.MAX_LINE)
+        if not data:
+            return self.size
+        position = data.find(b'\n')
+        return offset + (position + 1 if position >= 0 else len(data))
+
+    def line_start_of(self, offset):
+        """Comienzo de la línea que contiene el offset"""
+        if not self.size or offset <= 0:
+            return 0
+        offset = min(offset, self.size)
+        start = max(0, offset - self.MAX_LINE)
+        position = self.read(start, offset - start).rfind(b'\n')
+        return start + position + 1 if position >= 0 else start
+
+    def previous_line(self, offset):
+        """Offset de la línea anterior"""
+        return self.line_start_of(offset - 1) if offset > 0 else 0
+
+    def read_lines(self, offset, count):
+        """Devuelve [(offset, bytes)] de hasta count líneas desde offset"""
+        lines = []
+        while len(lines) < count and offset < self.size:
+            end = self.next_line(offset)
+            data = self.read(offset, end - offset)
+            if not data:
+                break
+            lines.append((offset, data))
+            offset = end
+        return lines
+
+    def find(self, needle, start, backward=False, cancel=None):
+        """Busca por ventanas de SEARCH_WINDOW bytes; devuelve el offset o -1"""
+        if not self.size or not needle:
+            return -1
+        overlap = len(needle) - 1  # Coincidencias que cruzan el borde de la ventana
+        if backward:
+            end = min(start, self.size)
+            while end > 0:
+                if self.closed or (cancel and cancel.is_set()):
+                    return -1
+                window_start = max(0, end - self.SEARCH_WINDOW)
+                position = self.read(window_start, end - window_start + overlap).rfind(needle)
+                if position >= 0:
+                    return window_start + position
+                end = window_start
+        else:
+            window_start = max(0, start)
+            while window_start < self.size:
+                if self.closed or (cancel and cancel.is_set()):
+                    return -1
+                data = self.read(window_start, self.SEARCH_WINDOW + overlap)
+                if not data:
+                    break
+                position = data.find(needle)
+                if position >= 0:
+                    return window_start + position
+                window_start += self.SEARCH_WINDOW
+        return -1
+
+class Inotify:
+    """Acceso mínimo a inotify(7) mediante ctypes"""
+
+    IN_MODIFY = 0x00000002
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+
+    _EVENT = struct.Struct('iIII')  # wd, mask, cookie, len
+    _libc = None
+
+    def __init__(self):
+        if Inotify._libc is None:
+            Inotify._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+
+    def add_watch(self, path, mask):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(str(path)), mask)
+        if wd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error), str(path))
+        return wd
+
+    def remove_watch(self, wd):
+        self._libc.inotify_rm_watch(self.fd, wd)
+
+    def read_events(self):
+        """Devuelve [(wd, mask, nombre)] pendientes sin bloquear"""
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        position = 0
+        while position + self._EVENT.size <= len(data):
+            wd, mask, _, length = self._EVENT.unpack_from(data, position)
+            position += self._EVENT.size
+            name = data[position:position + length].rstrip(b'\0')
+            position += length
+            events.append((wd, mask, os.fsdecode(name)))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+class LogFollower:
+    """Lee solo los bytes añadidos a un archivo que crece (tail -f)
+
+    Detecta truncado (el tamaño baja) y rotación (cambia el inodo de la
+    ruta). Las últimas líneas se guardan en un buffer circular y, si el
+    archivo crece más rápido de lo que se lee, se salta al final en vez de
+    acumular.
+    """
+
+    INITIAL_BYTES = 64 * 1024
+    MAX_CATCHUP = 4 * 1024 * 1024
+
+    def __init__(self, path, max_lines=10000):
+        self.path = str(path)
+        self.lines = collections.deque(maxlen=max_lines)
+        self._file = None
+        self._open(from_start=False)
+        self.poll()
+
+    def _open(self, from_start):
+        self._file = open(self.path, 'rb')
+        st = os.fstat(self._file.fileno())
+        self.inode = (st.st_dev, st.st_ino)
+        self.offset = 0 if from_start else max(0, st.st_size - self.INITIAL_BYTES)
+        # Empezando a mitad de archivo, la primera línea estaría cortada
+        self._skip_partial = self.offset > 0
+        self._partial = b''
+
+    def poll(self):
+        """Lee lo nuevo; devuelve (líneas nuevas, None|'truncated'|'rotated')"""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            st = None  # Rotado y aún sin recrear: seguir con el archivo abierto
+
+        if st and (st.st_dev, st.st_ino) != self.inode:
+            # Rotación: terminar el archivo antiguo y continuar con el nuevo
+            lines = self._read_new()
+            self._file.close()
+            self._open(from_start=True)
+            return lines + self._read_new(), 'rotated'
+
+        if os.fstat(self._file.fileno()).st_size < self.offset:
+            self.offset = 0
+            self._partial = b''
+            return self._read_new(), 'truncated'
+        return self._read_new(), None
+
+    def _read_new(self):
+        fd = self._file.fileno()
+        size = os.fstat(fd).st_size
+        if size - self.offset > self.MAX_CATCHUP:
+            self.offset = size - self.MAX_CATCHUP
+            self._partial = b''
+            self._skip_partial = True
+        if size <= self.offset:
+            return []
+
+        data = os.pread(fd, size - self.offset, self.offset)
+        self.offset += len(data)
+        data = self._partial + data
+        if self._skip_partial:
+            newline = data.find(b'\n')
+            if newline < 0:
+                self._partial = b''
+                return []
+            data = data[newline + 1:]
+            self._skip_partial = False
+        *complete, self._partial = data.split(b'\n')
+        lines = [line.rstrip(b'\r').decode('utf-8', errors='replace') for line in complete]
+        self.lines.extend(lines)
+        return lines
+
+    def close(self):
+        self._file.close()
+
+class FileViewerWindow:
+    """Visor integrado paginado de texto y hexadecimal para archivos grandes
+
+    Solo se decodifica la ventana visible; el desplazamiento se mide en
+    bytes, así que abrir un archivo de 20 GB es instantáneo aunque el índice
+    de líneas (para saltar a una línea) siga construyéndose.
+    """
+
+    FOLLOW_LINES = 5000       # Líneas que conserva el modo seguimiento
+    FOLLOW_INTERVAL = 100     # ms entre volcados de líneas nuevas
+
+    def __init__(self, app, path, mode='text', follow=False):
+        self.app = app
+        self.path = Path(path)
+        self.mapped = MappedFile(path)
+        self.mapped.start_indexing()
+        self.top = 0           # Offset del primer byte visible
+        self.match = None      # (offset, longitud) de la última coincidencia
+        self.search_cancel = threading.Event()
+        self.follower = None
+        self.inotify = None
+        self._follow_after = None
+
+        self.window = tk.Toplevel(app.root)
+        self.window.title(f"Visor - {self.path.name}")
+        self.window.geometry("900x600")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        # Barra de herramientas
+        self.toolbar = ttk.Frame(self.window)
+        self.toolbar.pack(fill='x', padx=5, pady=2)
+        self.mode = tk.StringVar(value=mode)
+        text_button = ttk.Radiobutton(self.toolbar, text="Texto", variable=self.mode, value='text',
+                                        command=self.on_mode_change)
+        text_button.pack(side='left')
+        hex_button = ttk.Radiobutton(self.toolbar, text="Hex", variable=self.mode, value='hex',
+                                        command=self.on_mode_change)
+        hex_button.pack(side='left')
+        ttk.Separator(self.toolbar, orient='vertical').pack(side='left', fill='y', padx=5)
+        ttk.Label(self.toolbar, text="Ir a:").pack(side='left')
+        self.goto_entry = ttk.Entry(self.toolbar, width=12)
+        self.goto_entry.pack(side='left', padx=2)
+        self.goto_entry.bind('<Return>', lambda e: self.goto())
+        ttk.Separator(self.toolbar, orient='vertical').pack(side='left', fill='y', padx=5)
+        ttk.Label(self.toolbar, text="Buscar:").pack(side='left')
+        self.search_entry = ttk.Entry(self.toolbar, width=25)
+        self.search_entry.pack(side='left', padx=2)
+        self.search_entry.bind('<Return>', lambda e: self.search())
+        previous_button = ttk.Button(self.toolbar, text="◀", width=3, command=lambda: self.search(backward=True))
+        previous_button.pack(side='left')
+        next_button = ttk.Button(self.toolbar, text="▶", width=3, command=self.search)
+        next_button.pack(side='left')
+        # Controles del modo paginado: sin proyección no hay nada que buscar ni saltar
+        self.paged_controls = (text_button, hex_button, self.goto_entry, self.search_entry,
+                                previous_button, next_button)
+        ttk.Separator(self.toolbar, orient='vertical').pack(side='left', fill='y', padx=5)
+        self.follow_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(self.toolbar, text="Seguir (tail -f)", variable=self.follow_var,
+                        command=self.on_follow_toggle).pack(side='left')
+
+        # Contenido
+        body = ttk.Frame(self.window)
+        body.pack(fill='both', expand=True, padx=5)
+        font = tkfont.Font(family='Monospace', size=10)
+        self.line_height = max(1, font.metrics('linespace'))
+        self.text = tk.Text(body, wrap='none', font=font, state='disabled')
+        self.text.tag_configure('match', background='yellow')
+        self.scrollbar = ttk.Scrollbar(body, orient='vertical', command=self.on_scrollbar)
+        self.text.pack(side='left', fill='both', expand=True)
+        self.scrollbar.pack(side='right', fill='y')
+
+        self.status_label = ttk.Label(self.window, text="")
+        self.status_label.pack(fill='x', padx=5, pady=2)
+
+        # Eventos
+        self.text.bind('<Configure>', lambda e: self.render())
+        self.text.bind('<Button-4>', lambda e: self.scroll(-3))
+        self.text.bind('<Button-5>', lambda e: self.scroll(3))
+        self.text.bind('<MouseWheel>', lambda e: self.scroll(-3 if e.delta > 0 else 3))
+        for widget in (self.window, self.text):
+            widget.bind('<Prior>', lambda e: self.scroll(-self.visible_rows()))
+            widget.bind('<Next>', lambda e: self.scroll(self.visible_rows()))
+            widget.bind('<Up>', lambda e: self.scroll(-1))
+            widget.bind('<Down>', lambda e: self.scroll(1))
+            widget.bind('<Control-Home>', lambda e: self.go_start())
+            widget.bind('<Control-End>', lambda e: self.go_end())
+        self.text.focus_set()
+
+        self.render()
+        self.update_status_loop()
+        if follow:
+            self.follow_var.set(True)
+            self.on_follow_toggle()
+
+    def visible_rows(self):
+        return max(1, self.text.winfo_height() // self.line_height)
+
+    def render(self):
+        """Vuelve a dibujar solo las filas visibles"""
+        if self.mapped.closed or self.follower:
+            return
+        if self.mapped.check_size():
+            self.top = self.mapped.line_start_of(min(self.top, self.mapped.size))
+        rows = self.visible_rows()
+        if self.mode.get() == 'hex':
+            self.top -= self.top % 16
+            data = self.mapped.read(self.top, rows * 16)
+            content = FilePreview.hex_dump(data, self.top)
+            end = self.top + len(data)
+        else:
+            lines = self.mapped.read_lines(self.top, rows)
+            content = '\n'.join(line.rstrip(b'\r\n').decode('utf-8', errors='replace') for _, line in lines)
+            end = lines[-1][0] + len(lines[-1][1]) if lines else self.top
+
+        self.text.config(state='normal')
+        self.text.delete('1.0', tk.END)
+        self.text.insert('1.0', content)
+        self.highlight_match()
+        self.text.config(state='disabled')
+
+        size = self.mapped.size or 1
+        self.scrollbar.set(self.top / size, end / size)
+        self.update_status()
+
+    def highlight_match(self):
+        if not self.match:
+            return
+        offset, length = self.match
+        if self.mode.get() == 'hex':
+            row = (offset - self.top) // 16 + 1
+            column = 10 + 3 * (offset % 16)
+            if row >= 1:
+                self.text.tag_add('match', f"{row}.{column}", f"{row}.{min(column + 3 * length - 1, 57)}")
+            return
+        line_start = self.mapped.line_start_of(offset)
+        if line_start == self.top:
+            column = len(self.mapped.read(line_start, offset - line_start).decode('utf-8', errors='replace'))
+            needle = self.mapped.read(offset, length).decode('utf-8', errors='replace')
+            self.text.tag_add('match', f"1.{column}", f"1.{column + len(needle)}")
+
+    def update_status(self):
+        if self.follower:
+            return
+        mapped = self.mapped
+        parts = [self.app.format_size(mapped.size)]
+        if mapped.total_lines is not None:
+            parts.append(f"{mapped.total_lines} líneas")
+        elif mapped.size:
+            parts.append(f"indexando líneas {mapped.indexed_bytes * 100 // mapped.size}%")
+        if self.mode.get() == 'hex':
+            parts.append(f"offset 0x{self.top:x}")
+        else:
+            line = mapped.line_number(self.top)
+            parts.append(f"línea {line + 1}" if line is not None else f"offset {self.top}")
+        self.status_label.config(text=" · ".join(parts))
+
+    def update_status_loop(self):
+        # Refrescar el progreso del índice hasta que termine
+        if self.mapped.closed:
+            return
+        self.update_status()
+        if self.mapped.total_lines is None and self.mapped.size:
+            self.window.after(500, self.update_status_loop)
+
+    def scroll(self, rows):
+        if self.follower:
+            self.text.yview_scroll(rows, 'units')
+            return 'break'
+        if self.mode.get() == 'hex':
+            self.top = max(0, min(self.top + rows * 16, self.mapped.size - 1))
+        else:
+            for _ in range(abs(rows)):
+                if rows > 0:
+                    following = self.mapped.next_line(self.top)
+                    if following >= self.mapped.size:
+                        break
+                    self.top = following
+                else:
+                    self.top = self.mapped.previous_line(self.top)
+        self.render()
+        return 'break'
+
+    def on_scrollbar(self, *args):
+        if args[0] == 'moveto':
+            offset = int(float(args[1]) * self.mapped.size)
+            self.top = offset if self.mode.get() == 'hex' else self.mapped.line_start_of(offset)
+            self.render()
+        elif args[0] == 'scroll':
+            amount = int(args[1])
+            self.scroll(amount * self.visible_rows() if args[2] == 'pages' else amount)
+
+    def go_start(self):
+        if self.follower:
+            self.text.see('1.0')
+            return 'break'
+        self.top = 0
+        self.render()
+        return 'break'
+
+    def go_end(self):
+        if self.follower:
+            self.text.see(tk.END)
+            return 'break'
+        self.top = self.mapped.size
+        if self.mode.get() == 'hex':
+            self.top = max(0, self.top - self.visible_rows() * 16)
+            self.render()
+            return 'break'
+        self.top = self.mapped.line_start_of(self.top)
+        return self.scroll(-(self.visible_rows() - 1))
+
+    def on_mode_change(self):
+        if self.follower:
+            return
+        if self.mode.get() == 'text':
+            self.top = self.mapped.line_start_of(self.top)
+        self.render()
+
+    def goto(self):
+        """Salta a una línea (modo texto) o a un offset (modo hex, admite 0x)"""
+        if self.follower:
+            return
+        value = self.goto_entry.get().strip()
+        try:
+            number = int(value, 0)
+        except ValueError:
+            self.status_label.config(text=f"Valor no válido: {value}")
+            return
+        if self.mode.get() == 'hex':
+            self.top = max(0, min(number, self.mapped.size))
+        else:
+            offset = self.mapped.line_start(max(0, number - 1))
+            if offset is None:
+                self.status_label.config(text="Índice de líneas aún incompleto; inténtelo en unos segundos")
+                return
+            self.top = offset
+        self.render()
+
+    def search(self, backward=False):
+        """Busca el texto (o bytes hex en modo hex) en un hilo"""
+        value = self.search_entry.get()
+        if not value or self.follower:
+            return
+        needle = value.encode('utf-8')
+        if self.mode.get() == 'hex':
+            try:
+                needle = bytes.fromhex(value)
+            except ValueError:
+                pass
+
+        if self.match:
+            start = self.match[0] if backward else self.match[0] + 1
+        else:
+            start = self.top
+        self.search_cancel.set()
+        cancel = self.search_cancel = threading.Event()
+        self.status_label.config(text=f"Buscando '{value}'...")
+
+        def search_thread():
+            position = self.mapped.find(needle, start, backward, cancel)
+            if not cancel.is_set():
+                self.app.call_in_ui(self.show_match, position, len(needle), value)
+
+        thread = threading.Thread(target=search_thread)
+        thread.daemon = True
+        thread.start()
+
+    def show_match(self, position, length, value):
+        if self.mapped.closed:
+            return
+        if position < 0:
+            self.status_label.config(text=f"No se encontró '{value}'")
+            return
+        self.match = (position, length)
+        self.top = position - position % 16 if self.mode.get() == 'hex' else self.mapped.line_start_of(position)
+        self.render()
+
+    def on_follow_toggle(self):
+        if self.follow_var.get():
+            self.start_follow()
+        else:
+            self.stop_follow()
+
+    def start_follow(self):
+        """Pasa a modo seguimiento: muestra la cola del archivo y añade lo nuevo"""
+        try:
+            self.follower = LogFollower(self.path, self.FOLLOW_LINES)
+        except OSError as e:
+            self.follow_var.set(False)
+            messagebox.showerror("Error", f"No se puede seguir el archivo: {str(e)}", parent=self.window)
+            return
+
+        # El modo paginado no vuelve a leer hasta stop_follow
+        self.search_cancel.set()
+        self.mapped.close()
+        for widget in self.paged_controls:
+            widget.state(['disabled'])
+        self.mode.set('text')
+        self.match = None
+        self.text.config(state='normal')
+        self.text.delete('1.0', tk.END)
+        self.text.insert('1.0', '\n'.join(self.follower.lines))
+        self.text.config(state='disabled')
+        self.text.see(tk.END)
+        self.scrollbar.config(command=self.text.yview)
+        self.text.config(yscrollcommand=self.scrollbar.set)
+
+        # inotify dentro del bucle de Tk; sin él, consulta periódica
+        try:
+            self.inotify = Inotify()
+            self.watch_file = self.inotify.add_watch(self.path, Inotify.IN_MODIFY | Inotify.IN_MOVE_SELF
+                                                        | Inotify.IN_DELETE_SELF)
+            self.inotify.add_watch(self.path.parent, Inotify.IN_CREATE | Inotify.IN_MOVED_TO)
+            self.window.tk.createfilehandler(self.inotify.fd, tk.READABLE, self.on_inotify)
+        except (OSError, AttributeError):
+            if self.inotify:
+                self.inotify.close()
+            self.inotify = None
+            self._follow_after = self.window.after(500, self.poll_follow)
+        self.status_label.config(text=f"Siguiendo {self.path.name} (últimas {self.FOLLOW_LINES} líneas)")
+
+    def on_inotify(self, fd, mask):
+        events = self.inotify.read_events()
+        if not any(name in ('', self.path.name) for _, _, name in events):
+            return
+        # Agrupar ráfagas de escrituras en un volcado cada FOLLOW_INTERVAL ms
+        if self._follow_after is None:
+            self._follow_after = self.window.after(self.FOLLOW_INTERVAL, self.flush_follow)
+
+    def poll_follow(self):
+        self.flush_follow()
+        if self.follower and not self.inotify:
+            self._follow_after = self.window.after(500, self.poll_follow)
+
+    def flush_follow(self):
+        """Añade las líneas nuevas al widget, que nunca supera FOLLOW_LINES"""
+        self._follow_after = None
+        if not self.follower:
+            return
+        try:
+            lines, event = self.follower.poll()
+        except OSError:
+            return
+        if event == 'rotated' and self.inotify:
+            try:
+                self.inotify.remove_watch(self.watch_file)
+                self.watch_file = self.inotify.add_watch(self.path, Inotify.IN_MODIFY | Inotify.IN_MOVE_SELF
+                                                            | Inotify.IN_DELETE_SELF)
+            except OSError:
+                pass
+        if not lines and not event:
+            return
+
+        at_bottom = self.text.yview()[1] >= 0.999
+        self.text.config(state='normal')
+        if event == 'truncated':
+            self.text.delete('1.0', tk.END)
+        if event:
+            label = "truncado" if event == 'truncated' else "rotado"
+            self.text.insert(tk.END, f"\n--- archivo {label} ---")
+        if lines:
+            prefix = '\n' if self.text.compare('end-1c', '!=', '1.0') else ''
+            self.text.insert(tk.END, prefix + '\n'.join(lines[-self.FOLLOW_LINES:]))
+        excess = int(self.text.index('end-1c').split('.')[0]) - self.FOLLOW_LINES
+        if excess > 0:
+            self.text.delete('1.0', f"{excess + 1}.0")
+        self.text.config(state='disabled')
+        if at_bottom:
+            self.text.see(tk.END)
+
+    def stop_follow(self, reopen=True):
+        """Vuelve al modo paginado con el tamaño actual del archivo"""
+        if self._follow_after:
+            self.window.after_cancel(self._follow_after)
+            self._follow_after = None
+        if self.inotify:
+            self.window.tk.deletefilehandler(self.inotify.fd)
+            self.inotify.close()
+            self.inotify = None
+        if self.follower:
+            self.follower.close()
+            self.follower = None
+            self.scrollbar.config(command=self.on_scrollbar)
+            self.text.config(yscrollcommand='')
+            for widget in self.paged_controls:
+                widget.state(['!disabled'])
+            if not reopen:
+                return
+            # El archivo cambió mientras se seguía: volver a abrirlo
+            try:
+                self.mapped = MappedFile(self.path)
+            except OSError as e:
+                messagebox.showerror("Error", f"No se puede abrir el archivo: {str(e)}", parent=self.window)
+                self.close()
+                return
+            self.mapped.start_indexing()
+            self.top = 0
+            self.render()
+            self.update_status_loop()
+
+    def close(self):
+        self.search_cancel.set()
+        if self.follower:
+            self.follow_var.set(False)
+            self.stop_follow(reopen=False)
+        self.mapped.close()
+        self.window.destroy()
+
+class JobCancelled(Exception):
+    """La tarea en segundo plano fue cancelada por el usuario"""
+
+class BackgroundJob:
+    """Tarea en segundo plano con progreso consultable y cancelación"""
+
+    def __init__(self, work):
+        self.work = work  # work(job) -> resultado
+        self.cancel_event = threading.Event()
+        self.message = ""
+        self.fraction = None
+        self.result = None
+        self.error = None
+        self.done = False
+
+    def start(self):
+        """Lanza la tarea en un hilo"""
+        thread = threading.Thread(target=self._run)
+        thread.daemon = True
+        thread.start()
+
+    def _run(self):
+        try:
+            self.result = self.work(self)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done = True
+
+    def report(self, message, fraction=None):
+        """Publica el progreso; la interfaz lo consulta periódicamente"""
+        self.message = message
+        if fraction is not None:
+            self.fraction = fraction
+
+    def cancel(self):
+        """Solicita la cancelación de la tarea"""
+        self.cancel_event.set()
+
+    def check_cancelled(self):
+        """Interrumpe la tarea si se solicitó cancelarla"""
+        if self.cancel_event.is_set():
+            raise JobCancelled()
+
+class TrashManager:
+    """Papelera según la especificación freedesktop.org Trash"""
+
+    @staticmethod
+    def home_trash():
+        """Devuelve la papelera del usuario ($XDG_DATA_HOME/Trash)"""
+        data_home = os.environ.get('XDG_DATA_HOME') or str(Path.home() / '.local' / 'share')
+        return os.path.join(data_home, 'Trash')
+
+    @staticmethod
+    def is_trash_dir(path):
+        """Indica si la carpeta es una papelera: la del usuario, $topdir/.Trash-$uid o $topdir/.Trash/$uid"""
+        path = os.path.abspath(str(path))
+        if path == os.path.abspath(TrashManager.home_trash()):
+            return True
+        uid = str(os.getuid())
+        name, parent = os.path.basename(path), os.path.dirname(path)
+        if name == f'.Trash-{uid}':
+            topdir = parent
+        elif name == uid and os.path.basename(parent) == '.Trash':
+            topdir = os.path.dirname(parent)
+        else:
+            return False
+        try:
+            return TrashManager.find_mount_point(topdir) == topdir
+        except OSError:
+            return False
+
+    @staticmethod
+    def contains(path):
+        """Indica si la ruta es una papelera o está dentro de una"""
+        path = os.path.abspath(str(path))
+        while not TrashManager.is_trash_dir(path):
+            parent = os.path.dirname(path)
+            if parent == path:
+                return False
+            path = parent
+        return True
+
+    @staticmethod
+    def info_file(path):
+        """.trashinfo de un elemento de primer nivel de files/ en cualquier papelera, o None"""
+        path = os.path.abspath(str(path))
+        files_dir = os.path.dirname(path)
+        trash_dir = os.path.dirname(files_dir)
+        if os.path.basename(files_dir) != 'files' or not TrashManager.is_trash_dir(trash_dir):
+            return None
+        return os.path.join(trash_dir, 'info', os.path.basename(path) + '.trashinfo')
+
+    @staticmethod
+    def find_mount_point(path):
+        """Sube por la jerarquía mientras no cambie el dispositivo"""
+        path = os.path.abspath(path)
+        dev = os.lstat(path).st_dev
+        while path != '/':
+            parent = os.path.dirname(path)
+            if os.lstat(parent).st_dev != dev:
+                break
+            path = parent
+        return path
+
+    @staticmethod
+    def trash_dir_for(path):
+        """Elige la papelera del mismo sistema de archivos que la ruta
+
+        Devuelve (papelera, topdir); topdir es None para la del usuario.
+        """
+        dev = os.lstat(path).st_dev
+        home_trash = TrashManager.home_trash()
+        os.makedirs(home_trash, mode=0o700, exist_ok=True)
+        if os.lstat(home_trash).st_dev == dev:
+            return home_trash, None
+
+        topdir = TrashManager.find_mount_point(path)
+        uid = os.getuid()
+
+        # $topdir/.Trash compartida: debe ser carpeta real con bit sticky
+        shared = os.path.join(topdir, '.Trash')
+        if (os.path.isdir(shared) and not os.path.islink(shared)
+                and os.lstat(shared).st_mode & 0o1000):
+            try:
+                user_trash = os.path.join(shared, str(uid))
+                os.makedirs(user_trash, mode=0o700, exist_ok=True)
+                return user_trash, topdir
+            except OSError:
+                pass
+
+        user_trash = os.path.join(topdir, f'.Trash-{uid}')
+        os.makedirs(user_trash, mode=0o700, exist_ok=True)
+        return user_trash, topdir
+
+    @staticmethod
+    def trash(path):
+        """Mueve un archivo o carpeta a la papelera con un simple rename"""
+        path = os.path.abspath(str(path))
+        trash_dir, topdir = TrashManager.trash_dir_for(path)
+        files_dir = os.path.join(trash_dir, 'files')
+        info_dir = os.path.join(trash_dir, 'info')
+        os.makedirs(files_dir, mode=0o700, exist_ok=True)
+        os.makedirs(info_dir, mode=0o700, exist_ok=True)
+
+        # Reservar el nombre creando el .trashinfo de forma exclusiva
+        base = os.path.basename(path)
+        name = base
+        counter = 1
+        while True:
+            info_path = os.path.join(info_dir, name + '.trashinfo')
+            try:
+                fd = os.open(info_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+                break
+            except FileExistsError:
+                counter += 1
+                name = f"{base}.{counter}"
+
+        # En las papeleras de $topdir la ruta se guarda relativa a topdir
+        original = os.path.relpath(path, topdir) if topdir else path
+        with os.fdopen(fd, 'w') as f:
+            f.write("[Trash Info]\n")
+            f.write(f"Path={quote(original)}\n")
+            f.write(f"DeletionDate={datetime.now().strftime('%Y-%m-%dT%H:%M:%S')}\n")
+
+        try:
+            os.rename(path, os.path.join(files_dir, name))
+        except OSError:
+            os.unlink(info_path)
+            raise
+        return os.path.join(files_dir, name)
+
+class TreeRemover:
+    """Eliminación permanente recursiva relativa a descriptores de carpeta
+
+    Recorre con os.scandir(fd) y borra con unlink/rmdir(dir_fd=...), el
+    equivalente a unlinkat, sin reconstruir rutas completas ni seguir enlaces.
+    """
+
+    DIR_FLAGS = os.O_RDONLY | os.O_DIRECTORY | os.O_NOFOLLOW
+
+    def __init__(self, job=None):
+        self.job = job
+        self.removed = 0
+
+    def remove(self, path):
+        """Elimina un archivo o una carpeta completa"""
+        path = os.path.abspath(str(path))
+        parent, name = os.path.split(path)
+        parent_fd = os.open(parent, self.DIR_FLAGS)
+        try:
+            if os.path.isdir(path) and not os.path.islink(path):
+                self._remove_tree(parent_fd, name)
+            else:
+                os.unlink(name, dir_fd=parent_fd)
+                self._count()
+        finally:
+            os.close(parent_fd)
+
+    def _remove_tree(self, parent_fd, name):
+        # Pila explícita: la profundidad no depende del límite de recursión
+        fd = os.open(name, self.DIR_FLAGS, dir_fd=parent_fd)
+        stack = [(parent_fd, name, fd, self._list_dir(fd))]
+        try:
+            while stack:
+                if self.job:
+                    self.job.check_cancelled()
+                dir_parent_fd, dir_name, dir_fd, entries = stack[-1]
+                if entries:
+                    entry_name, is_dir = entries.pop()
+                    if is_dir:
+                        child_fd = os.open(entry_name, self.DIR_FLAGS, dir_fd=dir_fd)
+                        stack.append((dir_fd, entry_name, child_fd, self._list_dir(child_fd)))
+                    else:
+                        os.unlink(entry_name, dir_fd=dir_fd)
+                        self._count()
+                else:
+                    stack.pop()
+                    os.close(dir_fd)
+                    os.rmdir(dir_name, dir_fd=dir_parent_fd)
+                    self._count()
+        finally:
+            for _, _, dir_fd, _ in stack:
+                os.close(dir_fd)
+
+    @staticmethod
+    def _list_dir(fd):
+        """Lista una carpeta abierta usando d_type (sin stat)"""
+        with os.scandir(fd) as entries:
+            return [(entry.name, entry.is_dir(follow_symlinks=False)) for entry in entries]
+
+    def _count(self):
+        self.removed += 1
+        if self.job and self.removed % 256 == 0:
+            self.job.report(f"{self.removed} elementos eliminados")
+
+class BatchRenamer:
+    """Renombrado masivo con expresiones regulares y plantillas
+
+    La plantilla admite {name} (nombre tras el reemplazo), {stem}, {ext},
+    {n} (número de secuencia), {mtime} (fecha de modificación) y {size},
+    con especificadores de formato como {n:04} o {mtime:%Y%m%d}.
+    """
+
+    CASES = {
+        'Sin cambios': None,
+        'minúsculas': str.lower,
+        'MAYÚSCULAS': str.upper,
+        'Título': str.title,
+    }
+
+    OK = 'Correcto'
+    CYCLE = 'Intercambio'
+
+    def __init__(self, paths):
+        self.paths = [Path(p) for p in paths]
+        self._stats = {}
+        self._listings = {}  # carpeta -> nombres existentes, leídos una vez
+
+    def _stat(self, path):
+        # Un solo stat por archivo aunque la vista previa se recalcule
+        st = self._stats.get(path)
+        if st is None:
+            st = self._stats[path] = path.lstat()
+        return st
+
+    def _exists(self, target):
+        parent, name = os.path.split(target)
+        names = self._listings.get(parent)
+        if names is None:
+            try:
+                names = self._listings[parent] = set(os.listdir(parent or '.'))
+            except OSError:
+                return os.path.lexists(target)
+        return name in names
+
+    def compute_names(self, pattern='', replacement='', template='{name}', start=1, case='Sin cambios'):
+        """Calcula los nuevos nombres; propaga los errores de la expresión o de la plantilla"""
+        regex = re.compile(pattern) if pattern else None
+        case_func = self.CASES.get(case)
+        needs_stat = '{mtime' in template or '{size' in template
+        names = []
+        for index, path in enumerate(self.paths):
+            name = regex.sub(replacement, path.name) if regex else path.name
+            if template and template != '{name}':
+                stem, ext = os.path.splitext(name)
+                fields = {'name': name, 'stem': stem, 'ext': ext, 'n': start + index}
+                if needs_stat:
+                    st = self._stat(path)
+                    fields['mtime'] = datetime.fromtimestamp(st.st_mtime)
+                    fields['size'] = st.st_size
+                name = template.format(**fields)
+            if case_func:
+                name = case_func(name)
+            names.append(name)
+        return names
+
+    def plan(self, new_names):
+        """Valida los nombres y devuelve [(origen, destino, estado)]"""
+        # Rutas como cadenas: con decenas de miles de elementos pathlib pesa
+        sources = [str(path) for path in self.paths]
+        targets = [os.path.join(os.path.dirname(src), name) for src, name in zip(sources, new_names)]
+        owners = {}
+        for target in targets:
+            owners[target] = owners.get(target, 0) + 1
+
+        statuses = []
+        for path, name, target in zip(self.paths, new_names, targets):
+            if not name or name in ('.', '..') or '/' in name or '\0' in name:
+                statuses.append('Nombre no válido')
+            elif name == path.name:
+                statuses.append('Sin cambios')
+            elif owners[target] > 1:
+                statuses.append('Colisión')
+            else:
+                statuses.append(self.OK)
+
+        # Un destino ocupado solo es válido si su dueño actual también se mueve;
+        # repetir hasta que no haya cambios porque los rechazos se encadenan
+        moving = {src: target for src, target, status in zip(sources, targets, statuses)
+                    if status == self.OK}
+        positions = {src: index for index, src in enumerate(sources)}
+        changed = True
+        while changed:
+            changed = False
+            for src in list(moving):
+                target = moving[src]
+                if target in moving or not self._exists(target):
+                    continue
+                statuses[positions[src]] = 'Ya existe'
+                del moving[src]
+                changed = True
+
+        # Detectar ciclos (a→b, b→a): se resuelven con los nombres temporales.
+        # Cada origen tiene como mucho un sucesor, así que basta un recorrido lineal
+        visited = {}
+        for start in moving:
+            walk = []
+            current = start
+            while current in moving and current not in visited:
+                visited[current] = start
+                walk.append(current)
+                current = moving[current]
+            if current in moving and visited.get(current) == start:
+                for src in walk[walk.index(current):]:
+                    statuses[positions[src]] = self.CYCLE
+
+        return [(path, Path(target), status)
+                for path, target, status in zip(self.paths, targets, statuses)]
+
+    @staticmethod
+    def _temp_name(directory, base):
+        """Nombre temporal libre: os.rename sobrescribiría en silencio uno existente"""
+        candidate = directory / base
+        counter = 1
+        while os.path.lexists(candidate):
+            counter += 1
+            candidate = directory / f"{base}-{counter}"
+        return candidate
+
+    @staticmethod
+    def execute(plan, job=None):
+        """Renombra en dos fases (origen → temporal → destino) para permitir intercambios"""
+        moves = [(src, dst) for src, dst, status in plan
+                    if status in (BatchRenamer.OK, BatchRenamer.CYCLE)]
+        token = f".~renombrar-{os.getpid()}-{int(time.time())}"
+        total = 2 * len(moves) or 1
+        done = []  # Renombrados aplicados, para deshacer si algo falla
+        temps = []
+        try:
+            for index, (src, dst) in enumerate(moves):
+                if job and index % 100 == 0:
+                    job.check_cancelled()
+                    job.report(f"Preparando {index}/{len(moves)}", index / total)
+                temp = BatchRenamer._temp_name(src.parent, f"{token}-{index}")
+                os.rename(src, temp)
+                done.append((src, temp))
+                temps.append(temp)
+
+            for index, (src, dst) in enumerate(moves):
+                if job and index % 100 == 0:
+                    job.check_cancelled()
+                    job.report(f"Renombrando {index}/{len(moves)}", (len(moves) + index) / total)
+                if os.path.lexists(dst):
+                    raise FileExistsError(errno.EEXIST, "Ya existe", str(dst))
+                temp = temps[index]
+                os.rename(temp, dst)
+                done.append((temp, dst))
+        except BaseException:
+            for old, new in reversed(done):
+                try:
+                    os.rename(new, old)
+                except OSError:
+                    pass
+            raise
+        return len(moves)
+
+class StallWatchdog:
+    """Detecta bloqueos del bucle de eventos de Tk
+
+    Un latido con root.after marca cada vuelta del bucle; un hilo aparte
+    comprueba que llegue a tiempo y, mientras no llega, muestrea la pila
+    del hilo principal con sys._current_frames(). Cada bloqueo se anota en
+    stalls.log con su duración y la función de la aplicación responsable.
+    """
+
+    INTERVAL_MS = 50
+    CHECK_INTERVAL = 0.02
+    STACK_LIMIT = 40
+    LOG_MAX_BYTES = 1024 * 1024
+
+    def __init__(self, root, threshold_ms=100, log_path=None):
+        self.root = root
+        self.threshold = threshold_ms / 1000
+        self.log_path = log_path or cache_path('stalls.log')
+        self.main_id = threading.get_ident()  # Se crea desde el hilo de Tk
+        self.last_tick = time.monotonic()
+        self.by_function = {}  # función -> [veces, total ms, máx ms]
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._after = None
+
+    def start(self):
+        self.last_tick = time.monotonic()
+        self._after = self.root.after(self.INTERVAL_MS, self._heartbeat)
+        threading.Thread(target=self._watch, name='stall-watchdog', daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+        if self._after:
+            self.root.after_cancel(self._after)
+            self._after = None
+
+    def _heartbeat(self):
+        self.last_tick = time.monotonic()
+        if not self._stop.is_set():
+            self._after = self.root.after(self.INTERVAL_MS, self._heartbeat)
+
+    def _watch(self):
+        interval = self.INTERVAL_MS / 1000
+        stalled_tick = None
+        samples = []
+        while not self._stop.wait(self.CHECK_INTERVAL):
+            tick = self.last_tick
+            if time.monotonic() - tick - interval >= self.threshold:
+                frame = sys._current_frames().get(self.main_id)
+                if frame is not None:
+                    samples.append(traceback.extract_stack(frame, limit=self.STACK_LIMIT))
+                del frame
+                stalled_tick = tick
+            elif stalled_tick is not None and tick != stalled_tick:
+                # El bucle volvió a girar: el latido tardío marca el final
+                self._record(tick - stalled_tick - interval, samples)
+                stalled_tick = None
+                samples = []
+
+    @staticmethod
+    def culprit(stack):
+        """Marco más interno que pertenece a este programa"""
+        for frame in reversed(stack):
+            if frame.filename == __file__:
+                return frame
+        return stack[-1] if stack else None
+
+    def _record(self, duration, samples):
+        Profiler.record('tk.bloqueo', int(duration * 1e9))
+        if not samples:
+            return
+        # La línea que más aparece en las muestras es la responsable
+        culprits = {}
+        counts = collections.Counter()
+        for sample in samples:
+            frame = self.culprit(sample)
+            if frame:
+                culprits[(frame.name, frame.lineno)] = (frame, sample)
+                counts[(frame.name, frame.lineno)] += 1
+        if not counts:
+            return
+        frame, stack = culprits[counts.most_common(1)[0][0]]
+        function = frame.name
+        milliseconds = duration * 1000
+        with self._lock:
+            entry = self.by_function.setdefault(function, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += milliseconds
+            entry[2] = max(entry[2], milliseconds)
+
+        header = (f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')} bloqueo de {milliseconds:.0f} ms "
+                  f"({len(samples)} muestras) en {function} "
+                  f"({os.path.basename(frame.filename)}:{frame.lineno})\n")
+        try:
+            os.makedirs(os.path.dirname(self.log_path), exist_ok=True)
+            if os.path.exists(self.log_path) and os.path.getsize(self.log_path) > self.LOG_MAX_BYTES:
+                os.replace(self.log_path, self.log_path + '.1')
+            with open(self.log_path, 'a') as f:
+                f.write(header)
+                f.writelines(traceback.format_list(stack))
+                f.write("\n")
+        except OSError:
+            pass
+
+    def ranking(self):
+        """Funciones ordenadas por tiempo total bloqueando la interfaz"""
+        with self._lock:
+            return sorted(((name, *entry) for name, entry in self.by_function.items()),
+                          key=lambda row: row[2], reverse=True)
+
+    def report(self):
+        lines = [f"{'bloqueos de la interfaz (función)':<40} {'veces':>6} {'total ms':>10} {'máx ms':>9}"]
+        for name, count, total, worst in self.ranking():
+            lines.append(f"{name:<40} {count:>6} {total:>10.0f} {worst:>9.0f}")
+        return "\n".join(lines)
+
+class MemoryMonitor:
+    """Diagnóstico de memoria por vista
+
+    Con el modo activo, tracemalloc toma una instantánea antes y después
+    de construir cada listado o búsqueda. El informe guarda lo que ocupa
+    la vista en objetos Python y en RSS (que incluye las filas de Tk), los
+    bytes por elemento y las líneas que más memoria reservaron.
+    """
+
+    TOP_SITES = 10
+    HISTORY = 20
+
+    def __init__(self, budget_mb=0):
+        self.budget = budget_mb * 1024 * 1024  # 0: sin aviso
+        self.reports = collections.deque(maxlen=self.HISTORY)
+
+    @property
+    def enabled(self):
+        return tracemalloc.is_tracing()
+
+    def enable(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def disable(self):
+        tracemalloc.stop()
+
+    @staticmethod
+    def rss():
+        """Memoria residente del proceso en bytes (/proc/self/statm)"""
+        try:
+            with open('/proc/self/statm') as f:
+                return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except (OSError, ValueError, IndexError):
+            return 0
+
+    @staticmethod
+    def snapshot():
+        # Excluir lo que reserva el propio tracemalloc al tomar instantáneas
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+        ])
+
+    def begin(self):
+        """Inicia la medición de una vista; None si el modo está desactivado"""
+        if not self.enabled:
+            return None
+        tracemalloc.reset_peak()
+        return self.snapshot(), tracemalloc.get_traced_memory()[0], self.rss()
+
+    def end(self, view, path, entries, start):
+        """Cierra la medición de begin() y devuelve el informe"""
+        if start is None or not self.enabled:
+            return None
+        before, traced_before, rss_before = start
+        peak = tracemalloc.get_traced_memory()[1] - traced_before
+        stats = self.snapshot().compare_to(before, 'lineno')
+        traced = sum(stat.size_diff for stat in stats)
+        rss = self.rss()
+        sites = [(f"{os.path.basename(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+                  stat.size_diff, stat.count_diff)
+                 for stat in stats[:self.TOP_SITES] if stat.size_diff > 0]
+        report = {
+            'view': view,
+            'path': path,
+            'time': datetime.now().strftime('%H:%M:%S'),
+            'entries': entries,
+            'traced': traced,
+            'per_entry': traced / entries if entries else 0,
+            'peak': peak,
+            'rss': rss,
+            'rss_delta': rss - rss_before,
+            'sites': sites,
+            'over_budget': bool(self.budget) and max(traced, rss - rss_before) > self.budget,
+        }
+        self.reports.append(report)
+        return report
+
+    @classmethod
+    def deep_size(cls, obj, seen=None):
+        """Tamaño aproximado de un objeto y de lo que contiene"""
+        seen = set() if seen is None else seen
+        size = 0
+        stack = [obj]
+        while stack:
+            obj = stack.pop()
+            if id(obj) in seen:
+                continue
+            seen.add(id(obj))
+            size += sys.getsizeof(obj)
+            if isinstance(obj, dict):
+                stack.extend(obj.keys())
+                stack.extend(obj.values())
+            elif isinstance(obj, (list, tuple, set, frozenset, collections.deque)):
+                stack.extend(obj)
+            elif isinstance(obj, PurePath):
+                stack.extend(getattr(obj, slot, None) for slot in ('_str', '_parts', '_drv', '_root'))
+        return size
+
+class StartupTrace:
+    """Tiempos por fase del arranque, impresos con --startup-trace"""
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.start = self.last = time.perf_counter()
+        self.phases = []
+
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def report(self):
+        if not self.enabled:
+            return
+        for phase, elapsed in self.phases:
+            print(f"{phase:<32} {elapsed * 1000:8.1f} ms", file=sys.stderr)
+        print(f"{'total':<32} {(self.last - self.start) * 1000:8.1f} ms", file=sys.stderr)
+
+class BrowserPane:
+    """Estado de una pestaña: carpeta, historial, orden y sus widgets
+
+    FileExplorer expone estos atributos como propiedades de la pestaña
+    activa, así que sus métodos trabajan siempre sobre ella.
+    """
+
+    def __init__(self, path):
+        self.current_path = Path(path)
+        self.history = [self.current_path]
+        self.history_index = 0
+        self.item_data = {}            # iid -> diccionario del elemento listado
+        self.sort_column = 'Nombre'
+        self.sort_reverse = False
+        self.sniff_generation = 0      # Invalida detecciones de listados anteriores
+        self.media_generation = 0
+        self.media_requested = set()   # iids ya encolados en este listado
+        self.media_pending = 0         # Lotes de metadatos encolados y aún sin aplicar
+        self.media_waiters = []        # Se llaman cuando media_pending llega a cero
+        self.sniff_requested = set()   # iids ya encolados para detectar su tipo
+        self.size_generation = 0
+        self.sizes_requested = set()   # Carpetas ya encoladas para medir
+        self.sizes_pending = 0         # Mediciones encoladas y aún sin aplicar
+        self.sizes_waiters = []        # Se llaman cuando sizes_pending llega a cero
+        self.thumbnail_paths = set()   # Miniaturas visibles en la cuadrícula
+        self.name_index = None         # (item_data, NameIndex) para la búsqueda al teclear
+        self.status = ""
+        self.notebook = None
+        self.frame = None
+        self.list_frame = None
+        self.file_tree = None
+        self.grid_frame = None
+        self.grid_canvas = None
+
+    @property
+    def title(self):
+        return self.current_path.name or str(self.current_path)
+
+    def new_listing(self):
+        """Descarta el trabajo en segundo plano del listado anterior"""
+        self.sniff_generation += 1
+        self.sniff_requested = set()
+        self.media_generation += 1
+        self.media_requested = set()
+        self.media_pending = 0
+        self.media_waiters = []
+        self.size_generation += 1
+        self.sizes_requested = set()
+        self.sizes_pending = 0
+        self.sizes_waiters = []
+
+def pane_attribute(name):
+    """Propiedad de FileExplorer que vive en la pestaña activa"""
+    return property(lambda self: getattr(self.pane, name),
+                    lambda self, value: setattr(self.pane, name, value))
+
+class FileExplorer:
+    """Explorador de archivos principal"""
+    
+    # Estado de la pestaña activa (ver BrowserPane)
+    current_path = pane_attribute('current_path')
+    history = pane_attribute('history')
+    history_index = pane_attribute('history_index')
+    item_data = pane_attribute('item_data')
+    sort_column = pane_attribute('sort_column')
+    sort_reverse = pane_attribute('sort_reverse')
+    sniff_generation = pane_attribute('sniff_generation')
+    sniff_requested = pane_attribute('sniff_requested')
+    media_generation = pane_attribute('media_generation')
+    media_requested = pane_attribute('media_requested')
+    sizes_requested = pane_attribute('sizes_requested')
+    file_tree = pane_attribute('file_tree')
+    list_frame = pane_attribute('list_frame')
+    grid_frame = pane_attribute('grid_frame')
+    grid_canvas = pane_attribute('grid_canvas')
+    
+    def __init__(self, root, trace=None, stall_threshold=100, memory_budget=0):
+        self.root = root
+        self.trace = trace or StartupTrace()
+        self.memory = MemoryMonitor(memory_budget)
+        self.memory_diagnostics = tk.BooleanVar(value=self.memory.enabled)
+        self._memory_after = None
+        self.watchdog = StallWatchdog(root, stall_threshold) if stall_threshold > 0 else None
+        self.root.title("Explorador de Archivos Linux")
+        self.root.geometry("1000x700")
+        self.root.minsize(800, 600)
+        
+        # Variables
+        self.pane = BrowserPane(Path.home())  # Pestaña activa
+        self.panes = []
+        self.dual_pane = tk.BooleanVar(value=False)
+        self.listing_cache = ListingCache()  # Compartida por todas las pestañas
+        self.frecency = FrecencyDB()
+        self.address_popup = None
+        self.address_generation = 0
+        self.typeahead = ""
+        self.typeahead_position = -1  # Última coincidencia, para recorrer con la misma letra
+        self._typeahead_after = None
+        self.bookmarks = []
+        self.clipboard = None
+        self.clipboard_operation = None  # 'copy' or 'cut'
+        self.preserve_mode = tk.BooleanVar(value=False)
+        self.view_mode = tk.StringVar(value='list')  # 'list' o 'grid'
+        self.thumbnails = ThumbnailCache()
+        self.grid_images = collections.OrderedDict()  # LRU ruta -> (mtime, PhotoImage)
+        self.show_preview = tk.BooleanVar(value=False)
+        self.preview_generation = 0  # Descarta resultados de selecciones anteriores
+        self.preview_executor = ThreadPoolExecutor(max_workers=1)
+        self._preview_after = None
+        self.sniff_executor = ThreadPoolExecutor(max_workers=4)
+        self.show_media_columns = tk.BooleanVar(value=False)
+        self.media_executor = ThreadPoolExecutor(max_workers=2)
+        self.tree_executor = ThreadPoolExecutor(max_workers=2)  # Árbol del panel lateral
+        self._media_after = None
+        self._types_after = None
+        self.show_folder_sizes = tk.BooleanVar(value=True)
+        self.size_executor = ThreadPoolExecutor(max_workers=2)  # Tamaño de carpetas
+        self._sizes_after = None
+        self.closing = False
+        self.pane_swaps = 0  # Anidamiento de run_in_pane
+        self.ui_calls = queue.Queue()  # Resultados de los hilos de trabajo para el hilo de Tk
+        self.poll_ui_calls()
+        self.volume = VolumeManager()
+        self.volume.add_listener(lambda: self.call_in_ui(self.on_volume_state))
+        self.wifi = WiFiManager()
+        self.wifi.add_listener(lambda: self.call_in_ui(self.update_wifi_status))
+        
+        self.trace.mark("variables")
+        
+        # Configurar estilo
+        self.setup_style()
+        self.trace.mark("estilo")
+        
+        # Crear interfaz (paneles y menús secundarios se crean al usarlos)
+        self.create_menubar()
+        self.create_toolbar()
+        self.trace.mark("menús y barra de herramientas")
+        self.create_main_frame()
+        self.create_status_bar()
+        self.trace.mark("marco principal")
+        
+        # Cargar configuración
+        self.load_config()
+        self.populate_sidebar()
+        if self.view_mode.get() == 'grid':
+            self.set_view_mode(save=False)
+        if self.show_preview.get():
+            self.toggle_preview_pane(save=False)
+        self.toggle_media_columns(save=False)
+        if self.dual_pane.get():
+            self.toggle_dual_pane(save=False)
+        self.trace.mark("configuración")
+        
+        # Actualizar vista inicial
+        self.refresh_view()
+        self.trace.mark("primer listado")
+        
+        # Configurar eventos
+        self.setup_events()
+        self.trace.mark("eventos")
+    
+    def call_in_ui(self, fn, *args):
+        """Encola fn para el hilo principal; es seguro llamarla desde cualquier hilo
+
+        Tkinter no es seguro entre hilos, ni siquiera root.after: los hilos
+        de trabajo solo dejan aquí sus resultados.
+        """
+        self.ui_calls.put((fn, args))
+    
+    def poll_ui_calls(self):
+        """Ejecuta en el hilo principal lo encolado con call_in_ui"""
+        deadline = time.monotonic() + 0.05  # No bloquear la interfaz con una ráfaga
+        while time.monotonic() < deadline:
+            try:
+                fn, args = self.ui_calls.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                fn(*args)
+            except Exception:
+                self.root.report_callback_exception(*sys.exc_info())
+        if not self.closing:
+            self.root.after(1 if not self.ui_calls.empty() else 30, self.poll_ui_calls)
+    
+    def start_background_services(self):
+        """Arranca lo que no hace falta para el primer dibujado"""
+        if self.watchdog:
+            self.watchdog.start()
+        self.volume.start()
+        self.wifi.start()
+        # Precalentar el índice de aplicaciones para el primer doble clic
+        DesktopEntryIndex.warm_up()
+    
+    def setup_style(self):
+        """Configura el estilo de la aplicación"""
+        style = ttk.Style()
+        
+        # Configurar temas
+        available_themes = style.theme_names()
+        if 'clam' in available_themes:
+            style.theme_use('clam')
+        
+        # Personalizar colores
+        style.configure('Treeview', rowheight=25)
+        style.configure('Treeview.Heading', font=('Arial', 10, 'bold'))
+    
+    def create_menubar(self):
+        """Crea la barra de menú"""
+        menubar = tk.Menu(self.root)
+        self.root.config(menu=menubar)
+        
+        # Menú Archivo
+        file_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="Archivo", menu=file_menu)
+        file_menu.add_command(label="Nueva Carpeta", command=self.create_folder, accelerator="Ctrl+N")
+        file_menu.add_command(label="Nuevo Archivo", command=self.create_file)
+        file_menu.add_separator()
+        file_menu.add_command(label="Copiar", command=self.copy_file, accelerator="Ctrl+C")
+        file_menu.add_command(label="Cortar", command=self.cut_file, accelerator="Ctrl+X")
+        file_menu.add_command(label="Pegar", command=self.paste_file, accelerator="Ctrl+V")
+        file_menu.add_command(label="Copiar al otro panel", accelerator="F5",
+                                command=lambda: self.transfer_to_other_pane('copy'))
+        file_menu.add_command(label="Mover al otro panel", accelerator="F6",
+                                command=lambda: self.transfer_to_other_pane('cut'))
+        file_menu.add_checkbutton(label="Preservar dispersos y enlaces duros",
+                                    variable=self.preserve_mode, command=self.save_config)
+        file_menu.add_separator()
+        file_menu.add_command(label="Eliminar", command=self.delete_file, accelerator="Del")
+        file_menu.add_command(label="Eliminar permanentemente",
+                                command=lambda: self.delete_file(permanent=True), accelerator="Shift+Del")
+        file_menu.add_command(label="Renombrar", command=self.rename_file, accelerator="F2")
+        file_menu.add_command(label="Renombrado masivo...", command=self.batch_rename, accelerator="Shift+F2")
+        file_menu.add_separator()
+        file_menu.add_command(label="Propiedades", command=self.show_properties)
+        file_menu.add_separator()
+        file_menu.add_command(label="Salir", command=self.root.quit, accelerator="Ctrl+Q")
+        
+        # Menú Ver
+        view_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="Ver", menu=view_menu)
+        view_menu.add_command(label="Actualizar", command=lambda: self.refresh_view(force=True),
+                                accelerator="Ctrl+R")
+        view_menu.add_command(label="Nueva pestaña", command=self.new_tab, accelerator="Ctrl+T")
+        view_menu.add_command(label="Cerrar pestaña", command=self.close_tab, accelerator="Ctrl+W")
+        view_menu.add_checkbutton(label="Panel doble", variable=self.dual_pane,
+                                    command=self.toggle_dual_pane, accelerator="F9")
+        view_menu.add_command(label="Mostrar Archivos Ocultos", command=self.toggle_hidden_files)
+        view_menu.add_checkbutton(label="Panel de vista previa", variable=self.show_preview,
+                                    command=self.toggle_preview_pane, accelerator="F3")
+        view_menu.add_checkbutton(label="Columnas multimedia (dimensiones, duración)",
+                                    variable=self.show_media_columns, command=self.toggle_media_columns)
+        view_menu.add_checkbutton(label="Tamaño de carpetas", variable=self.show_folder_sizes,
+                                    command=self.toggle_folder_sizes)
+        view_menu.add_separator()
+        view_menu.add_radiobutton(label="Vista de lista", variable=self.view_mode, value='list',
+                                    command=self.set_view_mode, accelerator="Ctrl+1")
+        view_menu.add_radiobutton(label="Vista de iconos", variable=self.view_mode, value='grid',
+                                    command=self.set_view_mode, accelerator="Ctrl+2")
+        view_menu.add_separator()
+        view_menu.add_command(label="Ir a Carpeta Personal", command=self.go_home)
+        view_menu.add_command(label="Ir a Escritorio", command=self.go_desktop)
+        view_menu.add_command(label="Ir a Documentos", command=self.go_documents)
+        view_menu.add_command(label="Ir a Descargas", command=self.go_downloads)
+        
+        # Menú Marcadores
+        bookmarks_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="Marcadores", menu=bookmarks_menu)
+        bookmarks_menu.add_command(label="Agregar Marcador", command=self.add_bookmark)
+        bookmarks_menu.add_command(label="Gestionar Marcadores", command=self.manage_bookmarks)
+        
+        # Menú Sistema
+        system_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="Sistema", menu=system_menu)
+        system_menu.add_command(label="Gestión WiFi", command=self.open_wifi_manager)
+        system_menu.add_command(label="Control de Volumen", command=self.open_volume_control)
+        system_menu.add_separator()
+        system_menu.add_command(label="Terminal", command=self.open_terminal)
+        system_menu.add_command(label="Monitor del Sistema", command=self.open_system_monitor)
+        
+        # Menú Ayuda
+        help_menu = tk.Menu(menubar, tearoff=0)
+        menubar.add_cascade(label="Ayuda", menu=help_menu)
+        help_menu.add_command(label="Instalar Dependencias", command=self.install_dependencies)
+        help_menu.add_command(label="Tiempos de operaciones...", command=self.open_profiler_window)
+        help_menu.add_checkbutton(label="Diagnóstico de memoria (tracemalloc)",
+                                    variable=self.memory_diagnostics,
+                                    command=self.toggle_memory_diagnostics)
+        help_menu.add_command(label="Informe de memoria...", command=self.open_memory_window)
+        help_menu.add_command(label="Acerca de", command=self.show_about)
+    
+    def create_toolbar(self):
+        """Crea la barra de herramientas"""
+        toolbar_frame = ttk.Frame(self.root)
+        toolbar_frame.pack(fill='x', padx=5, pady=2)
+        
+        # Botones de navegación
+        ttk.Button(toolbar_frame, text="←", command=self.go_back, width=3).pack(side='left', padx=1)
+        ttk.Button(toolbar_frame, text="→", command=self.go_forward, width=3).pack(side='left', padx=1)
+        ttk.Button(toolbar_frame, text="↑", command=self.go_up, width=3).pack(side='left', padx=1)
+        ttk.Button(toolbar_frame, text="🏠", command=self.go_home, width=3).pack(side='left', padx=1)
+        ttk.Button(toolbar_frame, text="🔄", command=self.refresh_view, width=3).pack(side='left', padx=1)
+        
+        # Separador
+        ttk.Separator(toolbar_frame, orient='vertical').pack(side='left', fill='y', padx=5)
+        
+        # Barra de dirección
+        ttk.Label(toolbar_frame, text="Ruta:").pack(side='left', padx=2)
+        self.address_bar = ttk.Entry(toolbar_frame)
+        self.address_bar.pack(side='left', fill='x', expand=True, padx=2)
+        self.address_bar.bind('<Return>', self.navigate_to_address)
+        self.address_bar.bind('<KeyRelease>', self.on_address_key)
+        self.address_bar.bind('<Down>', lambda e: self.move_address_suggestion(1))
+        self.address_bar.bind('<Up>', lambda e: self.move_address_suggestion(-1))
+        self.address_bar.bind('<Tab>', self.complete_address)
+        self.address_bar.bind('<Escape>', lambda e: self.hide_address_suggestions())
+        self.address_bar.bind('<FocusOut>', lambda e: self.root.after(200, self.hide_address_suggestions))
+        
+        # Botón ir
+        ttk.Button(toolbar_frame, text="Ir", command=self.navigate_to_address).pack(side='left', padx=2)
+        
+        # Separador
+        ttk.Separator(toolbar_frame, orient='vertical').pack(side='left', fill='y', padx=5)
+        
+        # Buscador
+        ttk.Label(toolbar_frame, text="Buscar:").pack(side='left', padx=2)
+        self.search_entry = ttk.Entry(toolbar_frame, width=20)
+        self.search_entry.pack(side='left', padx=2)
+        self.search_entry.bind('<Return>', self.search_files)
+        ttk.Button(toolbar_frame, text="🔍", command=self.search_files, width=3).pack(side='left', padx=1)
+    
+    def create_main_frame(self):
+        """Crea el marco principal con panel lateral y vista de archivos"""
+        # Frame principal con panel
+        main_paned = ttk.PanedWindow(self.root, orient='horizontal')
+        main_paned.pack(fill='both', expand=True, padx=5, pady=2)
+        self.main_paned = main_paned
+        
+        # Panel lateral
+        self.create_sidebar(main_paned)
+        
+        # Vista de archivos
+        self.create_file_view(main_paned)
+        
+        # Vista previa: se crea y se añade al panel al activarla
+        self.preview_frame = None
+    
+    def create_preview_pane(self, parent):
+        """Crea el panel de vista previa"""
+        self.preview_frame = ttk.Frame(parent)
+        
+        self.preview_info = ttk.Label(self.preview_frame, text="", font=('Arial', 10, 'bold'), wraplength=300)
+        self.preview_info.pack(fill='x', padx=5, pady=5)
+        
+        self.preview_image = ttk.Label(self.preview_frame)
+        self.preview_text = tk.Text(self.preview_frame, wrap='none', width=40, font=('Monospace', 9))
+        self.preview_text.pack(fill='both', expand=True, padx=5, pady=(0, 5))
+        self.preview_text.config(state='disabled')
+    
+    def toggle_preview_pane(self, save=True):
+        """Muestra u oculta el panel de vista previa"""
+        if self.show_preview.get():
+            if self.preview_frame is None:
+                self.create_preview_pane(self.main_paned)
+            self.main_paned.add(self.preview_frame, weight=2)
+            self.schedule_preview()
+        elif self.preview_frame is not None:
+            self.main_paned.forget(self.preview_frame)
+        if save:
+            self.save_config()
+    
+    def schedule_preview(self, event=None):
+        """Programa la vista previa de la selección, agrupando cambios seguidos"""
+        if not self.show_preview.get():
+            return
+        self.preview_generation += 1
+        if self._preview_after:
+            self.root.after_cancel(self._preview_after)
+        self._preview_after = self.root.after(100, self.start_preview)
+    
+    def start_preview(self):
+        """Calcula la vista previa fuera del hilo de la interfaz"""
+        self._preview_after = None
+        files = self.get_selected_files()
+        if not files:
+            self.display_preview({'kind': 'info', 'info': ""})
+            return
+        
+        generation = self.preview_generation
+        path = files[0]
+        is_current = lambda: generation == self.preview_generation
+        
+        def compute():
+            if not is_current():
+                return  # La selección ya cambió antes de empezar
+            try:
+                result = FilePreview.compute(path, is_current)
+            except Exception as e:
+                result = {'kind': 'info', 'info': f"Sin vista previa: {str(e)}"}
+            if result is not None and is_current():
+                self.call_in_ui(lambda: is_current() and self.display_preview(result))
+        
+        self.preview_info.config(text=f"{path.name}...")
+        self.preview_executor.submit(compute)
+    
+    def display_preview(self, result):
+        """Muestra el resultado de la vista previa en el panel"""
+        self.preview_info.config(text=result.get('info', ""))
+        self.preview_text.config(state='normal')
+        self.preview_text.delete('1.0', tk.END)
+        
+        if result['kind'] == 'image':
+            self.preview_text.config(state='disabled')
+            self.preview_text.pack_forget()
+            self.preview_photo = ImageTk.PhotoImage(result['image'])
+            self.preview_image.config(image=self.preview_photo)
+            self.preview_image.pack(fill='both', expand=True, padx=5, pady=(0, 5))
+            return
+        
+        self.preview_image.pack_forget()
+        self.preview_image.config(image='')
+        self.preview_photo = None
+        self.preview_text.pack(fill='both', expand=True, padx=5, pady=(0, 5))
+        if result['kind'] in ('text', 'hex'):
+            self.preview_text.insert('1.0', result['text'])
+        self.preview_text.config(state='disabled')
+    
+    def create_sidebar(self, parent):
+        """Crea el panel lateral con accesos rápidos"""
+        sidebar_frame = ttk.Frame(parent)
+        parent.add(sidebar_frame, weight=1)
+        
+        # Título
+        ttk.Label(sidebar_frame, text="Accesos Rápidos", font=('Arial', 12, 'bold')).pack(pady=5)
+        
+        # Accesos rápidos como raíces de un árbol de carpetas que se lee al expandir
+        self.sidebar_tree = ttk.Treeview(sidebar_frame, show='tree', selectmode='browse')
+        self.sidebar_tree.pack(fill='both', expand=True, padx=5, pady=5)
+        
+        # Eventos (se puebla tras cargar la configuración)
+        self.sidebar_tree.bind('<Double-1>', self.on_sidebar_double_click)
+        self.sidebar_tree.bind('<<TreeviewOpen>>', self.on_sidebar_open)
+    
+    def populate_sidebar(self):
+        """Puebla el panel lateral con accesos rápidos"""
+        # Limpiar
+        for item in self.sidebar_tree.get_children():
+            self.sidebar_tree.delete(item)
+        
+        # Lugares comunes
+        places = [
+            ("🏠 Inicio", str(Path.home())),
+            ("🖥️ Escritorio", str(Path.home() / "Desktop")),
+            ("📁 Documentos", str(Path.home() / "Documents")),
+            ("⬇️ Descargas", str(Path.home() / "Downloads")),
+            ("🎵 Música", str(Path.home() / "Music")),
+            ("🖼️ Imágenes", str(Path.home() / "Pictures")),
+            ("🎬 Videos", str(Path.home() / "Videos")),
+            ("💾 Raíz", "/"),
+            ("🖴 Media", "/media"),
+            ("🔧 Temp", "/tmp"),
+            ("🗑️ Papelera", os.path.join(TrashManager.home_trash(), 'files')),
+        ]
+        
+        # La existencia se comprueba en segundo plano: /media puede ser lento
+        self.sidebar_places = {}
+        for name, path in places:
+            self.sidebar_places[self.add_sidebar_node('', name, path)] = path
+        self.check_sidebar_places()
+        
+        # Separador
+        self.sidebar_tree.insert('', 'end', text="─" * 20, values=("",))
+        
+        # Marcadores
+        for bookmark in self.bookmarks:
+            name = f"⭐ {os.path.basename(bookmark)}"
+            self.add_sidebar_node('', name, bookmark)
+    
+    def add_sidebar_node(self, parent, text, path):
+        """Inserta una carpeta expandible sin leer su contenido"""
+        iid = self.sidebar_tree.insert(parent, 'end', text=text, values=(path,))
+        # Hijo provisional para que aparezca la flecha de expandir
+        self.sidebar_tree.insert(iid, 'end', text="…", tags=('placeholder',))
+        return iid
+    
+    def on_sidebar_open(self, event):
+        """Lee las subcarpetas del nodo que se expande (solo ese nivel)"""
+        iid = self.sidebar_tree.focus()
+        values = self.sidebar_tree.item(iid, 'values')
+        if not values or not values[0]:
+            return
+        path = str(values[0])
+        show_hidden = getattr(self, 'show_hidden', False)
+        
+        def work():
+            try:
+                names = FolderTree.subdirectories(path, show_hidden)
+            except OSError:
+                names = []
+            self.call_in_ui(self.fill_sidebar_node, iid, path, names)
+        
+        self.tree_executor.submit(work)
+    
+    def fill_sidebar_node(self, iid, path, names):
+        """Sincroniza los hijos del nodo conservando los que ya estaban expandidos"""
+        if not self.sidebar_tree.exists(iid):
+            return
+        existing = {}
+        for child in self.sidebar_tree.get_children(iid):
+            if self.sidebar_tree.tag_has('placeholder', child):
+                self.sidebar_tree.delete(child)
+            else:
+                existing[os.path.basename(str(self.sidebar_tree.item(child, 'values')[0]))] = child
+        for index, name in enumerate(names):
+            child = existing.pop(name, None)
+            if child is None:
+                child = self.add_sidebar_node(iid, f"📁 {name}", os.path.join(path, name))
+            self.sidebar_tree.move(child, iid, index)
+        for child in existing.values():
+            self.sidebar_tree.delete(child)
+    
+    def check_sidebar_places(self):
+        """Quita del panel lateral los lugares que no existen"""
+        places = dict(self.sidebar_places)
+        
+        def check():
+            missing = [iid for iid, path in places.items() if not os.path.exists(path)]
+            if missing:
+                self.call_in_ui(lambda: [self.sidebar_tree.delete(iid) for iid in missing
+                                         if self.sidebar_tree.exists(iid)])
+        
+        threading.Thread(target=check, daemon=True).start()
+    
+    def create_file_view(self, parent):
+        """Crea la zona de archivos: un cuaderno de pestañas y, en modo doble, otro al lado"""
+        self.file_area = ttk.PanedWindow(parent, orient='horizontal')
+        parent.add(self.file_area, weight=3)
+        
+        self.notebooks = []
+        for _ in range(2):
+            notebook = ttk.Notebook(self.file_area)
+            notebook.bind('<<NotebookTabChanged>>', lambda e, n=notebook: self.on_tab_changed(n))
+            # Pulsar una pestaña del otro panel lo activa
+            notebook.bind('<ButtonRelease-1>', lambda e, n=notebook: self.activate_pane(self.selected_pane(n)))
+            self.notebooks.append(notebook)
+        self.file_area.add(self.notebooks[0], weight=1)
+        
+        # El menú contextual se crea la primera vez que se usa
+        self.context_menu = None
+        self.add_tab(self.notebooks[0], self.pane)
+    
+    def add_tab(self, notebook, pane):
+        """Crea los widgets de una pestaña y la añade al cuaderno"""
+        pane.notebook = notebook
+        pane.frame = ttk.Frame(notebook)
+        self.panes.append(pane)
+        self.create_pane_view(pane)
+        notebook.add(pane.frame, text=pane.title)
+    
+    def create_pane_view(self, pane):
+        """Crea la vista de lista de una pestaña"""
+        # Vista de lista; la cuadrícula muestra los mismos elementos
+        pane.list_frame = ttk.Frame(pane.frame)
+        pane.list_frame.pack(fill='both', expand=True)
+        file_frame = pane.list_frame
+        
+        # Treeview para archivos
+        columns = ('Nombre', 'Tamaño', 'Tipo', 'Modificado') + self.MEDIA_COLUMNS
+        tree = pane.file_tree = ttk.Treeview(file_frame, columns=columns, show='tree headings')
+        
+        # Configurar columnas
+        tree.heading('#0', text='', anchor='w')
+        tree.column('#0', width=30, minwidth=30)
+        
+        for col in columns:
+            tree.heading(col, text=col, anchor='w',
+                            command=lambda c=col: (self.activate_pane(pane), self.sort_by(c)))
+            if col == 'Nombre':
+                tree.column(col, width=300, minwidth=200)
+            elif col == 'Tamaño':
+                tree.column(col, width=100, minwidth=80)
+            elif col == 'Tipo':
+                tree.column(col, width=150, minwidth=100)
+            elif col in self.MEDIA_COLUMNS:
+                tree.column(col, width=100, minwidth=80)
+            else:
+                tree.column(col, width=150, minwidth=120)
+        tree.configure(displaycolumns=self.display_columns())
+        
+        # Scrollbars
+        v_scrollbar = ttk.Scrollbar(file_frame, orient='vertical', command=tree.yview)
+        h_scrollbar = ttk.Scrollbar(file_frame, orient='horizontal', command=tree.xview)
+        
+        def on_scroll(first, last):
+            # Los metadatos multimedia solo se piden para las filas visibles
+            v_scrollbar.set(first, last)
+            if pane is self.pane:
+                self.schedule_visible_types()
+                self.schedule_media_info()
+                self.schedule_folder_sizes()
+        
+        tree.configure(yscrollcommand=on_scroll, xscrollcommand=h_scrollbar.set)
+        
+        # Empaquetar
+        tree.pack(side='left', fill='both', expand=True)
+        v_scrollbar.pack(side='right', fill='y')
+        h_scrollbar.pack(side='bottom', fill='x')
+        
+        # Eventos: cualquier interacción activa primero la pestaña
+        activate = self.pane_handler(pane)
+        tree.bind('<Button-1>', activate(lambda e: None))
+        tree.bind('<FocusIn>', activate(lambda e: None))
+        tree.bind('<Double-1>', activate(self.on_file_double_click))
+        tree.bind('<Button-3>', activate(self.show_context_menu))
+        tree.bind('<KeyPress>', activate(self.on_typeahead_key))
+        # La selección también cambia al borrar filas: no debe activar la pestaña
+        tree.bind('<<TreeviewSelect>>', lambda e: pane is self.pane and self.schedule_preview())
+    
+    def pane_handler(self, pane):
+        """Envuelve manejadores de eventos para que actúen sobre su pestaña"""
+        def wrap(handler):
+            def wrapper(event):
+                self.activate_pane(pane)
+                return handler(event)
+            return wrapper
+        return wrap
+    
+    def run_in_pane(self, pane, function, *args):
+        """Ejecuta un método de la vista sobre una pestaña sin activarla"""
+        active = self.pane
+        self.pane = pane
+        self.pane_swaps += 1
+        try:
+            return function(*args)
+        finally:
+            self.pane_swaps -= 1
+            self.pane = active
+    
+    def show_view_error(self, message):
+        """Muestra un error de la vista fuera de run_in_pane
+
+        Un diálogo modal atiende eventos mientras espera; dentro de
+        run_in_pane esos eventos verían como activa una pestaña que no lo es.
+        """
+        if self.pane_swaps:
+            self.root.after_idle(messagebox.showerror, "Error", message)
+        else:
+            messagebox.showerror("Error", message)
+    
+    def selected_pane(self, notebook):
+        """Pestaña seleccionada de un cuaderno"""
+        selected = notebook.select()
+        for pane in self.panes:
+            if str(pane.frame) == selected:
+                return pane
+        return None
+    
+    def other_pane(self):
+        """Pestaña visible del panel contrario, o None fuera del modo doble"""
+        if not self.dual_pane.get():
+            return None
+        for notebook in self.notebooks:
+            if notebook is not self.pane.notebook:
+                return self.selected_pane(notebook)
+        return None
+    
+    def activate_pane(self, pane):
+        """Hace que la barra de dirección, el estado y los comandos usen esta pestaña"""
+        if pane is None or pane is self.pane:
+            return
+        self.pane = pane
+        self.reset_typeahead()
+        self.update_address_bar()
+        self.status_label.config(text=pane.status)
+        self.apply_view_mode()
+        self.schedule_preview()
+    
+    def on_tab_changed(self, notebook):
+        if notebook is self.pane.notebook:
+            self.activate_pane(self.selected_pane(notebook))
+    
+    def new_tab(self, path=None):
+        """Abre una pestaña nueva en el panel activo"""
+        pane = BrowserPane(path or self.current_path)
+        self.add_tab(self.pane.notebook, pane)
+        self.activate_pane(pane)
+        pane.notebook.select(pane.frame)
+        self.refresh_view()
+    
+    def close_tab(self):
+        """Cierra la pestaña activa (cada panel conserva al menos una)"""
+        pane = self.pane
+        notebook = pane.notebook
+        if len(notebook.tabs()) < 2:
+            return
+        notebook.forget(pane.frame)
+        self.panes.remove(pane)
+        self.activate_pane(self.selected_pane(notebook))
+        pane.new_listing()  # Los resultados en cola no deben tocar widgets destruidos
+        pane.frame.destroy()
+    
+    def toggle_dual_pane(self, save=True):
+        """Muestra u oculta el segundo panel, con su propia pestaña"""
+        right = self.notebooks[1]
+        if self.dual_pane.get():
+            if not right.tabs():
+                pane = BrowserPane(self.current_path)
+                self.add_tab(right, pane)
+                self.run_in_pane(pane, self.apply_view_mode)
+                self.refresh_pane(pane)
+            self.file_area.add(right, weight=1)
+        else:
+            self.file_area.forget(right)
+            if self.pane.notebook is right:
+                self.activate_pane(self.selected_pane(self.notebooks[0]))
+        if save:
+            self.save_config()
+    
+    def refresh_pane(self, pane):
+        """Actualiza una pestaña que no es la activa"""
+        if pane is self.pane:
+            self.refresh_view()
+            return
+        self.run_in_pane(pane, self.refresh_view)
+        self.update_address_bar()
+        self.status_label.config(text=self.pane.status)
+    
+    def refresh_panes(self):
+        """Actualiza la pestaña activa y la visible del otro panel"""
+        self.refresh_view()
+        other = self.other_pane()
+        if other:
+            self.refresh_pane(other)
+    
+    def transfer_to_other_pane(self, operation):
+        """Copia ('copy') o mueve ('cut') la selección a la carpeta del otro panel"""
+        target = self.other_pane()
+        if target is None:
+            return False
+        files = self.get_selected_files()
+        if not files or (operation == 'cut' and not self.check_writable_view()):
+            return True
+        if not target.current_path.is_dir():
+            messagebox.showerror("Error", "La carpeta del otro panel es de solo lectura")
+            return True
+        self.paste_file(files, operation, target.current_path)
+        return True
+    
+    def create_grid_view(self):
+        """Crea la vista de iconos con miniaturas de la pestaña (oculta hasta activarla)"""
+        pane = self.pane
+        pane.grid_frame = ttk.Frame(pane.frame)
+        canvas = pane.grid_canvas = tk.Canvas(pane.grid_frame, background='white', highlightthickness=0)
+        
+        def scroll(*args):
+            canvas.yview(*args)
+            self.run_in_pane(pane, self.render_grid)
+        
+        grid_scrollbar = ttk.Scrollbar(pane.grid_frame, orient='vertical', command=scroll)
+        canvas.configure(yscrollcommand=grid_scrollbar.set)
+        canvas.pack(side='left', fill='both', expand=True)
+        grid_scrollbar.pack(side='right', fill='y')
+        
+        activate = self.pane_handler(pane)
+        canvas.bind('<Configure>', lambda e: self.run_in_pane(pane, self.render_grid))
+        canvas.bind('<Button-1>', activate(self.on_grid_click))
+        canvas.bind('<Control-Button-1>', activate(lambda e: self.on_grid_click(e, toggle=True)))
+        canvas.bind('<Double-1>', activate(self.on_grid_double_click))
+        canvas.bind('<Button-3>', activate(self.on_grid_context_menu))
+        canvas.bind('<KeyPress>', activate(self.on_typeahead_key))
+        canvas.bind('<Button-4>', lambda e: scroll('scroll', -1, 'units'))
+        canvas.bind('<Button-5>', lambda e: scroll('scroll', 1, 'units'))
+        canvas.bind('<MouseWheel>', lambda e: scroll('scroll', -1 if e.delta > 0 else 1, 'units'))
+    
+    GRID_CELL = (150, 170)
+    
+    def set_view_mode(self, save=True):
+        """Alterna entre la vista de lista y la de iconos en todas las pestañas"""
+        for pane in self.panes:
+            self.run_in_pane(pane, self.apply_view_mode)
+        if save:
+            self.save_config()
+    
+    def apply_view_mode(self):
+        """Muestra la lista o la cuadrícula de la pestaña según el modo elegido"""
+        if self.view_mode.get() == 'grid':
+            if self.grid_frame is None:
+                self.create_grid_view()
+            self.list_frame.pack_forget()
+            self.grid_frame.pack(fill='both', expand=True)
+            if not ThumbnailCache.available():
+                self.status_label.config(text="Instale Pillow (python3-pil) para ver miniaturas")
+            self.render_grid()
+        elif self.grid_frame is not None:
+            self.grid_frame.pack_forget()
+            self.list_frame.pack(fill='both', expand=True)
+    
+    def grid_index_at(self, event):
+        """Devuelve el elemento de la cuadrícula bajo el cursor"""
+        cell_width, cell_height = self.GRID_CELL
+        columns = max(1, self.grid_canvas.winfo_width() // cell_width)
+        column = int(self.grid_canvas.canvasx(event.x) // cell_width)
+        row = int(self.grid_canvas.canvasy(event.y) // cell_height)
+        items = self.file_tree.get_children()
+        index = row * columns + column
+        if column < columns and 0 <= index < len(items):
+            return items[index]
+        return None
+    
+    def render_grid(self):
+        """Dibuja solo las celdas visibles y pide sus miniaturas"""
+        if self.view_mode.get() != 'grid':
+            return
+        canvas = self.grid_canvas
+        cell_width, cell_height = self.GRID_CELL
+        items = self.file_tree.get_children()
+        columns = max(1, canvas.winfo_width() // cell_width)
+        rows = (len(items) + columns - 1) // columns
+        canvas.configure(scrollregion=(0, 0, columns * cell_width, rows * cell_height),
+                            yscrollincrement=cell_height // 4)
+        
+        top = canvas.canvasy(0)
+        first_row = int(top // cell_height)
+        last_row = int((top + canvas.winfo_height()) // cell_height)
+        selection = set(self.file_tree.selection())
+        
+        canvas.delete('cell')
+        visible = set()
+        self.sniff_types(items[first_row * columns:(last_row + 1) * columns])
+        for index in range(first_row * columns, min(len(items), (last_row + 1) * columns)):
+            iid = items[index]
+            x = (index % columns) * cell_width
+            y = (index // columns) * cell_height
+            name = str(self.file_tree.item(iid, 'values')[0])
+            
+            if iid in selection:
+                canvas.create_rectangle(x + 2, y + 2, x + cell_width - 2, y + cell_height - 2,
+                                        fill='#cce4ff', outline='#3584e4', tags='cell')
+            
+            photo = None
+            if 'file' in self.file_tree.item(iid, 'tags') and name.lower().endswith(ThumbnailCache.IMAGE_EXTENSIONS):
+                path = str(self.current_path / name)
+                photo = self.get_grid_thumbnail(path)
+                visible.add(path)
+            
+            center_x = x + cell_width // 2
+            if photo:
+                canvas.create_image(center_x, y + 8 + ThumbnailCache.SIZE // 2, image=photo, tags='cell')
+            else:
+                canvas.create_text(center_x, y + 8 + ThumbnailCache.SIZE // 2,
+                                    text=self.file_tree.item(iid, 'text'), font=('Arial', 48), tags='cell')
+            label = name if len(name) <= 40 else name[:37] + "..."
+            canvas.create_text(center_x, y + ThumbnailCache.SIZE + 12, text=label, width=cell_width - 10,
+                                anchor='n', font=('Arial', 9), tags='cell')
+        
+        # Lo que ya no se ve en ninguna pestaña no debe ocupar el pool
+        self.pane.thumbnail_paths = visible
+        self.thumbnails.cancel_except(set().union(*(pane.thumbnail_paths for pane in self.panes)))
+        if self.thumbnails.has_pending() and not getattr(self, '_thumbnail_poll', None):
+            self._thumbnail_poll = self.root.after(50, self.poll_thumbnails)
+    
+    def get_grid_thumbnail(self, path):
+        """Devuelve la miniatura cargada o la solicita al pool"""
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            return None
+        
+        cached = self.grid_images.get(path)
+        if cached and cached[0] == mtime:
+            self.grid_images.move_to_end(path)
+            return cached[1]
+        if not ThumbnailCache.available():
+            return None
+        
+        thumbnail = self.thumbnails.lookup(path, mtime)
+        if thumbnail is None:
+            self.thumbnails.request(path, mtime)
+            return None
+        if thumbnail is False:
+            return None
+        return self.load_grid_thumbnail(path, mtime, thumbnail)
+    
+    def load_grid_thumbnail(self, path, mtime, thumbnail):
+        """Carga el PNG de la caché en la LRU de imágenes de Tk"""
+        try:
+            with Image.open(thumbnail) as img:
+                photo = ImageTk.PhotoImage(img)
+        except Exception:
+            return None
+        self.grid_images[path] = (mtime, photo)
+        while len(self.grid_images) > 500:
+            self.grid_images.popitem(last=False)
+        return photo
+    
+    def poll_thumbnails(self):
+        """Recoge las miniaturas terminadas por el pool y redibuja"""
+        self._thumbnail_poll = None
+        updated = False
+        while True:
+            try:
+                path, thumbnail = self.thumbnails.results.get_nowait()
+            except queue.Empty:
+                break
+            if thumbnail:
+                try:
+                    self.load_grid_thumbnail(path, os.stat(path).st_mtime, thumbnail)
+                    updated = True
+                except OSError:
+                    pass
+        if updated:
+            self.render_grid()
+            other = self.other_pane()
+            if other:
+                self.run_in_pane(other, self.render_grid)
+        elif self.thumbnails.has_pending():
+            self._thumbnail_poll = self.root.after(50, self.poll_thumbnails)
+    
+    def on_grid_click(self, event, toggle=False):
+        """Selecciona elementos en la vista de iconos"""
+        iid = self.grid_index_at(event)
+        if iid and toggle:
+            self.file_tree.selection_toggle(iid)
+        elif iid:
+            self.file_tree.selection_set(iid)
+        elif not toggle:
+            self.file_tree.selection_set(())
+        self.schedule_preview()
+        self.grid_canvas.focus_set()
+        self.render_grid()
+    
+    def on_grid_double_click(self, event):
+        """Abre el elemento bajo el cursor en la vista de iconos"""
+        iid = self.grid_index_at(event)
+        if iid:
+            self.file_tree.selection_set(iid)
+            self.on_file_double_click(event)
+    
+    def on_grid_context_menu(self, event):
+        """Muestra el menú contextual en la vista de iconos"""
+        iid = self.grid_index_at(event)
+        if iid:
+            if iid not in self.file_tree.selection():
+                self.file_tree.selection_set(iid)
+                self.render_grid()
+            self.get_context_menu().post(event.x_root, event.y_root)
+    
+    def get_context_menu(self):
+        if self.context_menu is None:
+            self.create_context_menu()
+        return self.context_menu
+    
+    def create_context_menu(self):
+        """Crea el menú contextual"""
+        self.context_menu = tk.Menu(self.root, tearoff=0)
+        self.context_menu.add_command(label="Abrir", command=self.open_selected_file)
+        self.context_menu.add_command(label="Abrir con...", command=self.open_with)
+        self.context_menu.add_command(label="Ver en visor integrado", command=self.open_in_viewer)
+        self.context_menu.add_command(label="Seguir archivo (tail -f)",
+                                        command=lambda: self.open_in_viewer(follow=True))
+        self.context_menu.add_separator()
+        self.context_menu.add_command(label="Cortar", command=self.cut_file)
+        self.context_menu.add_command(label="Copiar", command=self.copy_file)
+        self.context_menu.add_command(label="Pegar", command=self.paste_file)
+        self.context_menu.add_separator()
+        self.context_menu.add_command(label="Comprimir...", command=self.compress_selection)
+        self.context_menu.add_separator()
+        self.context_menu.add_command(label="Eliminar", command=self.delete_file)
+        self.context_menu.add_command(label="Eliminar permanentemente",
+                                        command=lambda: self.delete_file(permanent=True))
+        self.context_menu.add_command(label="Renombrar", command=self.rename_file)
+        self.context_menu.add_command(label="Renombrado masivo...", command=self.batch_rename)
+        self.context_menu.add_separator()
+        self.context_menu.add_command(label="Propiedades", command=self.show_properties)
+    
+    def create_status_bar(self):
+        """Crea la barra de estado"""
+        self.status_bar = ttk.Frame(self.root)
+        self.status_bar.pack(fill='x', side='bottom')
+        
+        # Información de archivos
+        self.status_label = ttk.Label(self.status_bar, text="Listo")
+        self.status_label.pack(side='left', padx=5)
+        
+        # Separador
+        ttk.Separator(self.status_bar, orient='vertical').pack(side='right', fill='y', padx=5)
+        
+        # Control de volumen
+        volume_frame = ttk.Frame(self.status_bar)
+        volume_frame.pack(side='right', padx=5)
+        
+        ttk.Label(volume_frame, text="🔊").pack(side='left')
+        self.volume_scale = ttk.Scale(volume_frame, from_=0, to=100, orient='horizontal', 
+                                        length=100, command=self.on_volume_change)
+        self.volume_scale.pack(side='left', padx=2)
+        self.volume_scale.set(self.volume.get_volume())
+        
+        # WiFi status
+        self.wifi_label = ttk.Label(self.status_bar, text="📶 WiFi")
+        self.wifi_label.pack(side='right', padx=5)
+        self.wifi_label.bind('<Button-1>', lambda e: self.open_wifi_manager())
+        
+        # Actualizar estado WiFi
+        self.update_wifi_status()
+        
+        # Memoria residente (solo en modo diagnóstico de memoria)
+        self.memory_label = ttk.Label(self.status_bar, text="")
+        if self.memory.enabled:
+            self.toggle_memory_diagnostics()
+    
+    def setup_events(self):
+        """Configura los eventos de teclado"""
+        self.root.bind('<Control-n>', lambda e: self.create_folder())
+        self.root.bind('<Control-c>', lambda e: self.copy_file())
+        self.root.bind('<Control-x>', lambda e: self.cut_file())
+        self.root.bind('<Control-v>', lambda e: self.paste_file())
+        self.root.bind('<Delete>', lambda e: self.delete_file())
+        self.root.bind('<Shift-Delete>', lambda e: self.delete_file(permanent=True))
+        self.root.bind('<F2>', lambda e: self.rename_file())
+        self.root.bind('<Shift-F2>', lambda e: self.batch_rename())
+        # En modo doble F5/F6 copian/mueven al otro panel; si no, F5 actualiza
+        self.root.bind('<F5>', lambda e: self.transfer_to_other_pane('copy') or self.refresh_view(force=True))
+        self.root.bind('<F6>', lambda e: self.transfer_to_other_pane('cut'))
+        self.root.bind('<Control-r>', lambda e: self.refresh_view(force=True))
+        # En un campo de texto Ctrl+T intercambia dos caracteres: no abrir además una pestaña
+        self.root.bind('<Control-t>', lambda e: isinstance(e.widget, tk.Entry) or self.new_tab())
+        self.root.bind('<Control-w>', lambda e: self.close_tab())
+        self.root.bind('<F9>', lambda e: (self.dual_pane.set(not self.dual_pane.get()),
+                                          self.toggle_dual_pane()))
+        self.root.bind('<Control-q>', lambda e: self.root.quit())
+        self.root.bind('<Alt-Left>', lambda e: self.go_back())
+        self.root.bind('<Alt-Right>', lambda e: self.go_forward())
+        self.root.bind('<Alt-Up>', lambda e: self.go_up())
+        self.root.bind('<F3>', lambda e: (self.show_preview.set(not self.show_preview.get()),
+                                            self.toggle_preview_pane()))
+        self.root.bind('<Control-Key-1>', lambda e: (self.view_mode.set('list'), self.set_view_mode()))
+        self.root.bind('<Control-Key-2>', lambda e: (self.view_mode.set('grid'), self.set_view_mode()))
+    
+    @Profiler.timed('refresh_view')
+    def refresh_view(self, force=False):
+        """Actualiza la vista de archivos (force: volver a leer aunque esté en caché)"""
+        # Limpiar vista
+        for item in self.file_tree.get_children():
+            self.file_tree.delete(item)
+        self.item_data = {}
+        memory_start = self.memory.begin()
+        
+        # Actualizar barra de dirección y título de la pestaña
+        self.update_address_bar()
+        self.pane.notebook.tab(self.pane.frame, text=self.pane.title)
+        
+        try:
+            # Obtener archivos y carpetas
+            location = self.get_archive_location()
+            if location and location[0] is None:
+                self.reload_archive()
+                return
+            if location:
+                items = self.list_archive(*location)
+            else:
+                items = self.list_directory(self.current_path, force)
+            
+            # Ordenar: carpetas primero, luego por la columna elegida
+            with Profiler.span('refresh_view.sort'):
+                items.sort(key=lambda x: (not x['is_dir'], x['name'].lower()))
+            
+            # Insertar en el treeview
+            self.item_data = {}
+            self.pane.new_listing()
+            with Profiler.span('refresh_view.insert') as span:
+                for item in items:
+                    iid = self.file_tree.insert('', 'end', 
+                                        text=item['icon'],
+                                        values=(item['name'], item['size'], item['type'], item['modified']),
+                                        tags=('directory' if item['is_dir'] else 'file',))
+                    self.item_data[iid] = item
+                span.items = len(items)
+            self.schedule_visible_types()
+            if self.sort_column in self.MEDIA_COLUMNS:
+                self.request_media_info(self.file_tree.get_children(), on_done=self.apply_sort)
+            elif self.sort_column == 'Tamaño' and self.show_folder_sizes.get():
+                self.request_folder_sizes(self.file_tree.get_children(), on_done=self.apply_sort)
+            elif self.sort_column != 'Nombre' or self.sort_reverse:
+                with Profiler.span('refresh_view.sort'):
+                    self.apply_sort()
+            
+            # Actualizar contador de archivos
+            total_items = len(items)
+            dirs = sum(1 for item in items if item['is_dir'])
+            files = total_items - dirs
+            status = f"{total_items} elementos ({dirs} carpetas, {files} archivos)"
+            if location:
+                status += f" - {os.path.basename(location[0].path)} (solo lectura)"
+            self.status_label.config(text=status)
+            self.pane.status = status
+            self.finish_memory_report('refresh_view', total_items, memory_start)
+            
+            if self.view_mode.get() == 'grid':
+                self.grid_canvas.yview_moveto(0)
+                self.render_grid()
+            
+        except PermissionError:
+            self.show_view_error("No tiene permisos para acceder a esta carpeta")
+        except Exception as e:
+            self.show_view_error(f"Error al cargar la carpeta: {str(e)}")
+    
+    def list_directory(self, path, force=False):
+        """Obtiene los elementos de una carpeta como diccionarios para la vista"""
+        return self.listing_cache.list_directory(path, getattr(self, 'show_hidden', False), force)
+    
+    def update_address_bar(self):
+        self.address_bar.delete(0, tk.END)
+        self.address_bar.insert(0, str(self.current_path))
+    
+    SNIFF_BATCH = 128
+    
+    def visible_rows(self):
+        """iids de las filas que se ven ahora en la lista"""
+        children = self.file_tree.get_children()
+        if not children:
+            return ()
+        first, last = self.file_tree.yview()
+        start = int(first * len(children))
+        end = min(len(children), int(last * len(children)) + 1)
+        return children[start:end]
+    
+    def schedule_visible_types(self):
+        if self._types_after:
+            return
+        self._types_after = self.root.after(150, self.load_visible_types)
+    
+    def load_visible_types(self):
+        self._types_after = None
+        if self.view_mode.get() != 'grid':  # La cuadrícula pide sus celdas en render_grid
+            self.sniff_types(self.visible_rows())
+    
+    def sniff_types(self, iids):
+        """Corrige en segundo plano los tipos según el contenido de los archivos"""
+        if self.get_archive_location():
+            return
+        pane = self.pane
+        generation = pane.sniff_generation
+        entries = []
+        for iid in iids:
+            item = self.item_data.get(iid)
+            if iid in self.sniff_requested or not item or item['is_dir']:
+                continue
+            self.sniff_requested.add(iid)
+            entries.append((iid, item['path']))
+        
+        def work(batch):
+            if generation != pane.sniff_generation:
+                return  # Ya se cambió de carpeta
+            updates = []
+            with Profiler.span('sniff_types.batch') as span:
+                for iid, path in batch:
+                    refined = ContentSniffer.refine(path, ContentSniffer.detect(path))
+                    if refined:
+                        updates.append((iid, refined))
+                span.items = len(batch)
+            if updates:
+                self.call_in_ui(self.run_in_pane, pane, self.apply_sniffed_types, generation, updates)
+        
+        for start in range(0, len(entries), self.SNIFF_BATCH):
+            self.sniff_executor.submit(work, entries[start:start + self.SNIFF_BATCH])
+    
+    def apply_sniffed_types(self, generation, updates):
+        if generation != self.sniff_generation:
+            return
+        for iid, (description, category) in updates:
+            if self.file_tree.exists(iid):
+                self.file_tree.set(iid, 'Tipo', description)
+                self.file_tree.item(iid, text=FileLister.ICONS.get(category, '📄'))
+        if self.view_mode.get() == 'grid':
+            self.render_grid()
+    
+    MEDIA_COLUMNS = ('Dimensiones', 'Duración')
+    
+    def display_columns(self):
+        columns = ('Nombre', 'Tamaño', 'Tipo', 'Modificado')
+        if self.show_media_columns.get():
+            columns += self.MEDIA_COLUMNS
+        return columns
+    
+    def toggle_media_columns(self, save=True):
+        """Muestra u oculta las columnas de dimensiones y duración"""
+        for pane in self.panes:
+            pane.file_tree.configure(displaycolumns=self.display_columns())
+        if self.show_media_columns.get():
+            self.schedule_media_info()
+        if save:
+            self.save_config()
+    
+    def schedule_media_info(self):
+        if not self.show_media_columns.get() or self._media_after:
+            return
+        self._media_after = self.root.after(150, self.load_visible_media_info)
+    
+    def load_visible_media_info(self):
+        """Encola los metadatos de las filas visibles que aún no los tienen"""
+        self._media_after = None
+        self.request_media_info(self.visible_rows())
+    
+    def request_media_info(self, iids, on_done=None):
+        """Lee cabeceras en segundo plano
+
+        on_done se llama cuando no queda ningún lote pendiente en la pestaña,
+        incluidos los de las filas visibles encolados antes.
+        """
+        pane = self.pane
+        generation = pane.media_generation
+        entries = []
+        if not self.get_archive_location():
+            for iid in iids:
+                item = self.item_data.get(iid)
+                if iid in self.media_requested or not item or item['is_dir'] or not MediaInfo.is_media(item['path']):
+                    continue
+                self.media_requested.add(iid)
+                entries.append((iid, item['path']))
+        
+        def work():
+            results = []
+            for iid, path in entries:
+                if generation != pane.media_generation:
+                    return
+                results.append((iid, MediaInfo.get(path)))
+            MediaInfo.save_cache()
+            self.call_in_ui(self.run_in_pane, pane, self.apply_media_info, generation, results)
+        
+        if on_done:
+            pane.media_waiters.append(on_done)
+        if entries:
+            pane.media_pending += 1
+            self.media_executor.submit(work)
+        elif not pane.media_pending:
+            self.run_media_waiters()
+    
+    def apply_media_info(self, generation, results):
+        if generation != self.media_generation:
+            return
+        for iid, (width, height, duration) in results:
+            self.item_data[iid]['media'] = (width, height, duration)
+            if self.file_tree.exists(iid):
+                self.file_tree.set(iid, 'Dimensiones', MediaInfo.format_dimensions(width, height))
+                self.file_tree.set(iid, 'Duración', MediaInfo.format_duration(duration))
+        self.pane.media_pending -= 1
+        if not self.pane.media_pending:
+            self.run_media_waiters()
+    
+    def run_media_waiters(self):
+        waiters, self.pane.media_waiters = self.pane.media_waiters, []
+        for callback in waiters:
+            callback()
+    
+    def toggle_folder_sizes(self, save=True):
+        """Activa o desactiva el cálculo del tamaño de las carpetas"""
+        if self.show_folder_sizes.get():
+            self.schedule_folder_sizes()
+        else:
+            # Cancela las mediciones en curso; lo ya medido se queda en la caché
+            for pane in self.panes:
+                pane.size_generation += 1
+                pane.sizes_requested = set()
+                pane.sizes_pending = 0
+                self.run_in_pane(pane, self.run_size_waiters)
+        if save:
+            self.save_config()
+    
+    def schedule_folder_sizes(self):
+        if not self.show_folder_sizes.get() or self._sizes_after:
+            return
+        self._sizes_after = self.root.after(150, self.load_visible_folder_sizes)
+    
+    def load_visible_folder_sizes(self):
+        """Encola la medición de las carpetas visibles"""
+        self._sizes_after = None
+        self.request_folder_sizes(self.visible_rows())
+    
+    def request_folder_sizes(self, iids, on_done=None):
+        """Mide carpetas en segundo plano
+
+        on_done se llama cuando no queda ninguna medición pendiente en la
+        pestaña, incluidas las de las carpetas visibles encoladas antes.
+        """
+        pane = self.pane
+        generation = pane.size_generation
+        entries = []
+        if self.show_folder_sizes.get() and not self.get_archive_location():
+            for iid in iids:
+                item = self.item_data.get(iid)
+                if iid in self.sizes_requested or not item or not item['is_dir']:
+                    continue
+                self.sizes_requested.add(iid)
+                entries.append((iid, item['path']))
+        
+        def cancelled():
+            return self.closing or generation != pane.size_generation
+        
+        def work(iid, path):
+            result = None if cancelled() else FolderSizes.measure(path, cancelled)
+            FolderSizes.save_cache()
+            self.call_in_ui(self.run_in_pane, pane, self.apply_folder_size, generation, iid, result)
+        
+        if on_done:
+            pane.sizes_waiters.append(on_done)
+        for iid, path in entries:
+            pane.sizes_pending += 1
+            self.size_executor.submit(work, iid, path)
+        if not pane.sizes_pending:
+            self.run_size_waiters()
+    
+    def apply_folder_size(self, generation, iid, result):
+        if generation != self.pane.size_generation:
+            return
+        item = self.item_data.get(iid)
+        if item and result:
+            # Copia: el diccionario original puede estar en ListingCache
+            item = self.item_data[iid] = dict(item, bytes=result[0], size=self.format_size(result[0]))
+            if self.file_tree.exists(iid):
+                self.file_tree.set(iid, 'Tamaño', item['size'])
+        self.pane.sizes_pending -= 1
+        if not self.pane.sizes_pending:
+            self.run_size_waiters()
+    
+    def run_size_waiters(self):
+        waiters, self.pane.sizes_waiters = self.pane.sizes_waiters, []
+        for callback in waiters:
+            callback()
+    
+    def sort_by(self, column):
+        """Ordena por la columna pulsada; una segunda pulsación invierte el orden"""
+        if self.sort_column == column:
+            self.sort_reverse = not self.sort_reverse
+        else:
+            self.sort_column, self.sort_reverse = column, False
+        
+        if column in self.MEDIA_COLUMNS:
+            # Hacen falta los metadatos de todos los archivos, no solo los visibles
+            self.status_label.config(text=f"Leyendo cabeceras para ordenar por {column.lower()}...")
+            self.request_media_info(self.file_tree.get_children(), on_done=self.apply_sort)
+        elif column == 'Tamaño' and self.show_folder_sizes.get():
+            self.status_label.config(text="Calculando el tamaño de las carpetas para ordenar...")
+            self.request_folder_sizes(self.file_tree.get_children(), on_done=self.apply_sort)
+        else:
+            self.apply_sort()
+    
+    def apply_sort(self):
+        """Reordena las filas existentes sin volver a leer la carpeta"""
+        column = self.sort_column
+        
+        def key(iid):
+            item = self.item_data.get(iid, {})
+            width, height, duration = item.get('media', (None, None, None))
+            if column == 'Tamaño':
+                value = item.get('bytes', 0)
+            elif column == 'Tipo':
+                value = str(self.file_tree.set(iid, 'Tipo')).lower()
+            elif column == 'Modificado':
+                value = item.get('mtime', 0)
+            elif column == 'Dimensiones':
+                value = (width or 0) * (height or 0)
+            elif column == 'Duración':
+                value = duration or 0
+            else:
+                value = str(self.file_tree.set(iid, 'Nombre')).lower()
+            return value
+        
+        children = self.file_tree.get_children()
+        dirs = [iid for iid in children if 'directory' in self.file_tree.item(iid, 'tags')]
+        files = [iid for iid in children if 'directory' not in self.file_tree.item(iid, 'tags')]
+        # Las carpetas siempre van primero
+        ordered = (sorted(dirs, key=key, reverse=self.sort_reverse)
+                    + sorted(files, key=key, reverse=self.sort_reverse))
+        for index, iid in enumerate(ordered):
+            self.file_tree.move(iid, '', index)
+        
+        for col in self.file_tree['columns']:
+            arrow = (" ▼" if self.sort_reverse else " ▲") if col == column else ""
+            self.file_tree.heading(col, text=col + arrow)
+        if self.view_mode.get() == 'grid':
+            self.render_grid()
+    
+    def list_archive(self, index, inner):
+        """Obtiene los elementos de una carpeta interna de un archivo comprimido"""
+        items = []
+        for name, size, mtime, is_dir in index.list_dir(inner):
+            if name.startswith('.') and not getattr(self, 'show_hidden', False):
+                continue
+            
+            item = self.current_path / name
+            items.append({
+                'name': name,
+                'path': str(item),
+                'is_dir': is_dir,
+                'bytes': 0 if is_dir else size,
+                'mtime': mtime,
+                'size': "" if is_dir else self.format_size(size),
+                'type': "Carpeta" if is_dir else self.get_file_type(item),
+                'modified': datetime.fromtimestamp(mtime).strftime('%Y-%m-%d %H:%M'),
+                'icon': '📁' if is_dir else self.get_file_icon(item)
+            })
+        return items
+    
+    def get_archive_location(self):
+        """Devuelve (índice, ruta interna) si la vista está dentro de un archivo comprimido
+
+        El índice es None si no está en memoria o el archivo cambió: la
+        caché en disco puede ser un JSON grande, así que ni se lee ni se
+        vuelve a escanear aquí, en el hilo de la interfaz, sino con
+        reload_archive.
+        """
+        if self.current_path.is_dir():
+            return None
+        location = ArchiveIndex.split_virtual_path(self.current_path)
+        if not location:
+            return None
+        return ArchiveIndex.cached(location[0]), location[1]
+    
+    def get_file_icon(self, filepath):
+        """Obtiene el icono apropiado para un archivo"""
+        return FileLister.file_icon(filepath)
+    
+    def get_file_type(self, filepath):
+        """Obtiene una descripción del tipo de archivo"""
+        if filepath.is_dir():
+            return "Carpeta"
+        return FileLister.file_type(filepath)
+    
+    def format_size(self, size):
+        """Formatea el tamaño de archivo en formato legible"""
+        return FileLister.format_size(size)
+    
+    # Métodos de navegación
+    def go_back(self):
+        """Va hacia atrás en el historial"""
+        if self.history_index > 0:
+            self.history_index -= 1
+            self.current_path = Path(self.history[self.history_index])
+            self.refresh_view()
+    
+    def go_forward(self):
+        """Va hacia adelante en el historial"""
+        if self.history_index < len(self.history) - 1:
+            self.history_index += 1
+            self.current_path = Path(self.history[self.history_index])
+            self.refresh_view()
+    
+    def go_up(self):
+        """Sube un nivel en la jerarquía de carpetas"""
+        if self.current_path.parent != self.current_path:
+            self.navigate_to_path(self.current_path.parent)
+    
+    def go_home(self):
+        """Va a la carpeta personal"""
+        self.navigate_to_path(Path.home())
+    
+    def go_desktop(self):
+        """Va al escritorio"""
+        desktop = Path.home() / "Desktop"
+        if desktop.exists():
+            self.navigate_to_path(desktop)
+    
+    def go_documents(self):
+        """Va a documentos"""
+        documents = Path.home() / "Documents"
+        if documents.exists():
+            self.navigate_to_path(documents)
+    
+    def go_downloads(self):
+        """Va a descargas"""
+        downloads = Path.home() / "Downloads"
+        if downloads.exists():
+            self.navigate_to_path(downloads)
+    
+    def navigate_to_path(self, path):
+        """Navega a una ruta específica"""
+        path = Path(path)
+        if path.exists() and path.is_dir():
+            self.set_current_path(path)
+            return True
+        
+        # Rutas dentro de un archivo comprimido (/ruta/a.zip/carpeta)
+        location = ArchiveIndex.split_virtual_path(path)
+        if location:
+            self.open_archive(path, *location)
+            return True
+        return False
+    
+    def set_current_path(self, path):
+        """Cambia la carpeta actual y actualiza el historial"""
+        self.current_path = path
+        if path.is_dir():
+            self.frecency.add(path)
+        
+        # Actualizar historial
+        if self.history_index < len(self.history) - 1:
+            self.history = self.history[:self.history_index + 1]
+        
+        if not self.history or self.history[-1] != path:
+            self.history.append(path)
+            self.history_index = len(self.history) - 1
+        
+        self.refresh_view()
+    
+    def open_archive(self, path, archive_path, inner):
+        """Entra en un archivo comprimido como carpeta virtual"""
+        def enter(index):
+            if index.is_dir(inner):
+                self.set_current_path(path)
+            else:
+                messagebox.showerror("Error", f"No existe la carpeta '{inner}' en {archive_path.name}")
+        
+        try:
+            index = ArchiveIndex.cached(archive_path)
+        except OSError as e:
+            messagebox.showerror("Error", f"Error al abrir {archive_path.name}: {str(e)}")
+            return
+        if index:
+            enter(index)
+            return
+        
+        # Leer la caché en disco o, la primera vez, las cabeceras en segundo plano
+        def on_done(job):
+            if isinstance(job.error, JobCancelled):
+                self.status_label.config(text="Lectura cancelada")
+            elif job.error:
+                messagebox.showerror("Error", f"Error al leer {archive_path.name}: {str(job.error)}")
+            else:
+                enter(job.result)
+        
+        self.run_job(f"Leyendo {archive_path.name}", lambda job: ArchiveIndex.load(archive_path, job), on_done)
+    
+    def reload_archive(self):
+        """Carga en segundo plano el índice del archivo comprimido de la vista y la refresca"""
+        archive_path = ArchiveIndex.split_virtual_path(self.current_path)[0]
+        pane = self.pane
+        
+        def on_done(job):
+            if isinstance(job.error, JobCancelled):
+                self.status_label.config(text="Lectura cancelada")
+            elif job.error:
+                messagebox.showerror("Error", f"Error al leer {archive_path.name}: {str(job.error)}")
+            elif pane in self.panes:
+                self.run_in_pane(pane, self.refresh_view)
+        
+        self.run_job(f"Leyendo {archive_path.name}", lambda job: ArchiveIndex.load(archive_path, job), on_done)
+    
+    def navigate_to_address(self, event=None):
+        """Navega a la dirección ingresada en la barra (o a la sugerencia elegida)"""
+        suggestion = self.selected_address_suggestion()
+        self.hide_address_suggestions()
+        address = suggestion or self.address_bar.get().strip()
+        if address:
+            if address.startswith(('/', '~', '.')):
+                # Relativa a la carpeta actual, no al directorio desde el que se lanzó
+                path = os.path.join(str(self.current_path), os.path.expanduser(address))
+                success = self.navigate_to_path(os.path.normpath(path))
+            else:
+                # Modo salto: la carpeta visitada que mejor encaja
+                jumps = self.frecency.query(address, limit=1)
+                success = bool(jumps) and self.navigate_to_path(jumps[0])
+            if not success:
+                messagebox.showerror("Error", f"No se puede acceder a: {address}")
+                self.address_bar.delete(0, tk.END)
+                self.address_bar.insert(0, str(self.current_path))
+    
+    # Autocompletado de la barra de dirección
+    def on_address_key(self, event):
+        if event.keysym in ('Return', 'Escape', 'Up', 'Down', 'Tab', 'Left', 'Right',
+                            'Shift_L', 'Shift_R', 'Control_L', 'Control_R'):
+            return
+        self.update_address_suggestions()
+    
+    def update_address_suggestions(self):
+        """Rutas: subcarpetas del padre por prefijo; otro texto: salto por frecencia"""
+        text = self.address_bar.get()
+        self.address_generation += 1
+        generation = self.address_generation
+        if not text.strip():
+            self.hide_address_suggestions()
+            return
+        
+        if not text.startswith(('/', '~', '.')):
+            # Ordenar la base y comprobar que las carpetas existen: fuera del hilo de la interfaz
+            def jump():
+                matches = self.frecency.query(text)
+                self.call_in_ui(lambda: generation == self.address_generation
+                                and self.show_address_suggestions(matches))
+            
+            self.tree_executor.submit(jump)
+            return
+        
+        # Igual que navigate_to_address: lo relativo parte de la carpeta actual
+        expanded = os.path.join(str(self.current_path), os.path.expanduser(text))
+        parent, prefix = os.path.split(expanded)
+        parent = os.path.normpath(parent)
+        show_hidden = getattr(self, 'show_hidden', False) or prefix.startswith('.')
+        
+        def suggestions(names):
+            return [os.path.join(parent, name) + '/' for name in names]
+        
+        # Con la carpeta ya en caché la respuesta es inmediata (bisect)
+        if FolderTree.cached(parent, show_hidden) is not None:
+            self.show_address_suggestions(suggestions(FolderTree.complete(parent, prefix, show_hidden)))
+            return
+        
+        def work():
+            try:
+                names = FolderTree.complete(parent, prefix, show_hidden)
+            except OSError:
+                names = []
+            self.call_in_ui(lambda: generation == self.address_generation
+                            and self.show_address_suggestions(suggestions(names)))
+        
+        self.tree_executor.submit(work)
+    
+    def show_address_suggestions(self, suggestions):
+        """Lista desplegable bajo la barra de dirección"""
+        if not suggestions:
+            self.hide_address_suggestions()
+            return
+        if self.address_popup is None:
+            self.address_popup = tk.Toplevel(self.root)
+            self.address_popup.wm_overrideredirect(True)
+            self.address_listbox = tk.Listbox(self.address_popup, height=10, activestyle='none', takefocus=0)
+            self.address_listbox.pack(fill='both', expand=True)
+            self.address_listbox.bind('<ButtonRelease-1>', lambda e: self.navigate_to_address())
+        listbox = self.address_listbox
+        listbox.delete(0, tk.END)
+        for suggestion in suggestions:
+            listbox.insert(tk.END, suggestion)
+        listbox.configure(height=min(10, len(suggestions)))
+        x = self.address_bar.winfo_rootx()
+        y = self.address_bar.winfo_rooty() + self.address_bar.winfo_height()
+        self.address_popup.geometry(f"{self.address_bar.winfo_width()}x{listbox.winfo_reqheight()}+{x}+{y}")
+        self.address_popup.deiconify()
+        self.address_popup.lift()
+    
+    def hide_address_suggestions(self):
+        if self.address_popup is not None:
+            self.address_listbox.selection_clear(0, tk.END)
+            self.address_popup.withdraw()
+    
+    def address_suggestions_visible(self):
+        return self.address_popup is not None and self.address_popup.winfo_viewable()
+    
+    def selected_address_suggestion(self):
+        if not self.address_suggestions_visible():
+            return None
+        selection = self.address_listbox.curselection()
+        return self.address_listbox.get(selection[0]) if selection else None
+    
+    def move_address_suggestion(self, step):
+        """Flechas arriba/abajo: recorrer las sugerencias"""
+        if not self.address_suggestions_visible():
+            return
+        listbox = self.address_listbox
+        selection = listbox.curselection()
+        index = (selection[0] + step) if selection else (0 if step > 0 else listbox.size() - 1)
+        index = max(0, min(listbox.size() - 1, index))
+        listbox.selection_clear(0, tk.END)
+        listbox.selection_set(index)
+        listbox.see(index)
+        return 'break'
+    
+    def complete_address(self, event=None):
+        """Tab: completa con la sugerencia elegida o con el prefijo común"""
+        if not self.address_suggestions_visible():
+            return
+        listbox = self.address_listbox
+        selection = listbox.curselection()
+        if selection:
+            completion = listbox.get(selection[0])
+        elif self.address_bar.get().startswith(('/', '~')):
+            completion = os.path.commonprefix(listbox.get(0, tk.END))
+        else:
+            return 'break'  # En modo salto no hay prefijo común útil
+        if completion:
+            self.address_bar.delete(0, tk.END)
+            self.address_bar.insert(0, completion)
+            self.address_bar.icursor(tk.END)
+            self.update_address_suggestions()
+        return 'break'
+    
+    # Búsqueda al teclear
+    TYPEAHEAD_TIMEOUT = 1000  # ms sin teclear para empezar un prefijo nuevo
+    
+    def name_index(self):
+        """Índice de nombres del listado actual; se construye una vez por listado"""
+        cached = self.pane.name_index
+        if cached is None or cached[0] is not self.item_data:
+            index = NameIndex((item['name'], iid) for iid, item in self.item_data.items())
+            self.pane.name_index = cached = (self.item_data, index)
+        return cached[1]
+    
+    def on_typeahead_key(self, event):
+        """Teclear letras con la lista enfocada salta al primer nombre que empieza así"""
+        if event.state & 0x4 or event.state & 0x8:  # Control / Alt: atajos
+            return
+        if event.keysym == 'BackSpace' and self.typeahead:
+            prefix = self.typeahead[:-1]
+        elif event.char and event.char.isprintable() and (event.char != ' ' or self.typeahead):
+            prefix = self.typeahead + event.char
+        else:
+            return
+        
+        if self._typeahead_after:
+            self.root.after_cancel(self._typeahead_after)
+        self._typeahead_after = self.root.after(self.TYPEAHEAD_TIMEOUT, self.reset_typeahead)
+        self.typeahead = prefix
+        if not prefix:
+            self.reset_typeahead()
+            return 'break'
+        
+        index = self.name_index()
+        if len(set(prefix)) == 1 and len(prefix) > 1 and index.find(prefix) is None:
+            # Repetir la misma letra recorre los nombres que empiezan por ella
+            position = index.find(prefix[0], self.typeahead_position + 1)
+        else:
+            position = index.find(prefix)
+        
+        if position is None:
+            self.status_label.config(text=f"Ir a: {prefix} (sin coincidencias)")
+            return 'break'
+        self.status_label.config(text=f"Ir a: {prefix}")
+        self.typeahead_position = position
+        self.select_row(index.values[position])
+        return 'break'
+    
+    def select_row(self, iid):
+        """Selecciona una fila y la hace visible en la lista o en la cuadrícula"""
+        self.file_tree.selection_set(iid)
+        self.file_tree.focus(iid)
+        self.file_tree.see(iid)
+        if self.view_mode.get() == 'grid' and self.grid_canvas is not None:
+            children = self.file_tree.get_children()
+            cell_width, cell_height = self.GRID_CELL
+            columns = max(1, self.grid_canvas.winfo_width() // cell_width)
+            rows = max(1, (len(children) + columns - 1) // columns)
+            row = self.file_tree.index(iid) // columns
+            self.grid_canvas.yview_moveto(row / rows)
+            self.render_grid()
+    
+    def reset_typeahead(self):
+        self._typeahead_after = None
+        self.typeahead_position = -1
+        if self.typeahead:
+            self.typeahead = ""
+            self.status_label.config(text=self.pane.status)
+    
+    # Eventos de archivos
+    def on_file_double_click(self, event):
+        """Maneja doble clic en archivos"""
+        selection = self.file_tree.selection()
+        if selection:
+            item = self.file_tree.item(selection[0])
+            filename = item['values'][0]
+            filepath = self.current_path / filename
+            
+            location = self.get_archive_location()
+            if location:
+                index, inner = location
+                if index is None:
+                    self.refresh_view()  # El archivo cambió desde que se listó
+                    return
+                member = f"{inner}/{filename}" if inner else str(filename)
+                if index.is_dir(member):
+                    self.navigate_to_path(filepath)
+                else:
+                    self.open_archive_member(index, member)
+            elif filepath.is_dir():
+                self.navigate_to_path(filepath)
+            elif ArchiveIndex.is_archive(filepath):
+                self.navigate_to_path(filepath)
+            else:
+                self.open_file(filepath)
+    
+    def open_archive_member(self, index, member):
+        """Extrae un miembro a la caché y lo abre con la aplicación apropiada"""
+        # Tamaño y mtime en la clave: tras reescribir el archivo no se abre la copia vieja
+        st = os.stat(index.path)
+        key = f"{index.path}\0{st.st_size}\0{st.st_mtime_ns}"
+        digest = hashlib.sha1(key.encode('utf-8', 'surrogateescape')).hexdigest()[:16]
+        target = Path(cache_path('extract', digest, member))
+        
+        def work(job):
+            if not target.exists():
+                target.parent.mkdir(parents=True, exist_ok=True)
+                index.extract(member, target, TransferEngine(job=job))
+            return target
+        
+        def on_done(job):
+            if isinstance(job.error, JobCancelled):
+                target.unlink(missing_ok=True)
+            elif job.error:
+                target.unlink(missing_ok=True)
+                messagebox.showerror("Error", f"Error al extraer {member}: {str(job.error)}")
+            else:
+                self.open_file(target)
+        
+        self.run_job("Extrayendo", work, on_done)
+    
+    def check_writable_view(self):
+        """Avisa si la vista actual es un archivo comprimido (solo lectura)"""
+        if self.current_path.is_dir() or not ArchiveIndex.split_virtual_path(self.current_path):
+            return True
+        messagebox.showerror("Error", "El archivo comprimido es de solo lectura")
+        return False
+    
+    def on_sidebar_double_click(self, event):
+        """Maneja doble clic en el panel lateral"""
+        selection = self.sidebar_tree.selection()
+        if selection:
+            item = self.sidebar_tree.item(selection[0])
+            path = item['values'][0] if item['values'] else None
+            if path and path != "":
+                self.navigate_to_path(path)
+    
+    def show_context_menu(self, event):
+        """Muestra el menú contextual"""
+        item = self.file_tree.identify_row(event.y)
+        if item:
+            self.file_tree.selection_set(item)
+            self.get_context_menu().post(event.x_root, event.y_root)
+    
+    def get_selected_files(self):
+        """Obtiene los archivos seleccionados"""
+        selection = self.file_tree.selection()
+        files = []
+        for item in selection:
+            filename = self.file_tree.item(item)['values'][0]
+            filepath = self.current_path / filename
+            files.append(filepath)
+        return files
+    
+    # Operaciones de archivos
+    def open_selected_file(self):
+        """Abre el archivo seleccionado"""
+        files = self.get_selected_files()
+        if files:
+            self.open_file(files[0])
+    
+    # Los editores externos cargan el archivo entero; a partir de aquí se usa el visor
+    LARGE_TEXT_FILE = 64 * 1024 * 1024
+    
+    def open_file(self, filepath):
+        """Abre un archivo con la aplicación apropiada"""
+        try:
+            is_large = filepath.stat().st_size > self.LARGE_TEXT_FILE
+        except OSError:
+            is_large = False
+        if is_large and FileOpener.get_file_type(str(filepath)) == 'text':
+            self.open_in_viewer(filepath)
+            return
+        if not FileOpener.open_file(str(filepath)):
+            messagebox.showerror("Error", f"No se pudo abrir el archivo: {filepath.name}")
+    
+    def open_in_viewer(self, filepath=None, follow=False):
+        """Abre un archivo en el visor integrado de texto/hexadecimal"""
+        if filepath is None:
+            files = self.get_selected_files()
+            if not files:
+                return
+            filepath = files[0]
+        if not filepath.is_file():
+            messagebox.showerror("Error", f"No se puede ver en el visor: {filepath.name}")
+            return
+        try:
+            with filepath.open('rb') as f:
+                mode = 'text' if FilePreview.decode_text(f.read(4096))[0] is not None else 'hex'
+            FileViewerWindow(self, filepath, 'text' if follow else mode, follow)
+        except OSError as e:
+            messagebox.showerror("Error", f"Error al abrir el visor: {str(e)}")
+    
+    def open_with(self):
+        """Abre archivo con aplicación específica"""
+        files = self.get_selected_files()
+        if not files:
+            return
+        filepath = files[0]
+        mime = ContentSniffer.mime_type(filepath)
+        index = DesktopEntryIndex.load()
+        recommended = DesktopEntryIndex.handlers(mime, index)
+        others = [(i, name) for i, name in DesktopEntryIndex.all_applications(index) if i not in recommended]
+        
+        chooser = tk.Toplevel(self.root)
+        chooser.title(f"Abrir con - {filepath.name}")
+        chooser.geometry("420x450")
+        chooser.transient(self.root)
+        
+        ttk.Label(chooser, text=f"Tipo: {mime}").pack(anchor='w', padx=10, pady=(10, 5))
+        
+        list_frame = ttk.Frame(chooser)
+        list_frame.pack(fill='both', expand=True, padx=10)
+        tree = ttk.Treeview(list_frame, show='tree', selectmode='browse')
+        scrollbar = ttk.Scrollbar(list_frame, orient='vertical', command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        tree.pack(side='left', fill='both', expand=True)
+        scrollbar.pack(side='right', fill='y')
+        
+        recommended_node = tree.insert('', 'end', text="Aplicaciones recomendadas", open=True)
+        for desktop_id in recommended:
+            tree.insert(recommended_node, 'end', iid=desktop_id, text=DesktopEntryIndex.entry(desktop_id, index)['name'])
+        others_node = tree.insert('', 'end', text="Otras aplicaciones", open=not recommended)
+        for desktop_id, name in others:
+            tree.insert(others_node, 'end', iid=desktop_id, text=name)
+        if recommended:
+            tree.selection_set(recommended[0])
+        
+        remember_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(chooser, text=f"Usar siempre para archivos {mime}",
+                        variable=remember_var).pack(anchor='w', padx=10, pady=5)
+        
+        def accept(event=None):
+            selection = tree.selection()
+            if not selection or selection[0] in (recommended_node, others_node):
+                return
+            desktop_id = selection[0]
+            if remember_var.get():
+                try:
+                    DesktopEntryIndex.set_default(mime, desktop_id)
+                except OSError as e:
+                    messagebox.showerror("Error", f"No se pudo guardar la asociación: {str(e)}", parent=chooser)
+            if not DesktopEntryIndex.launch(desktop_id, filepath, index):
+                messagebox.showerror("Error", f"Error al abrir con {tree.item(desktop_id, 'text')}", parent=chooser)
+                return
+            chooser.destroy()
+        
+        def custom_command():
+            app = simpledialog.askstring("Abrir con", "Ingrese el comando de la aplicación:", parent=chooser)
+            if app:
+                try:
+                    CommandExecutor.instance().spawn(shlex.split(app) + [str(filepath)])
+                    chooser.destroy()
+                except Exception as e:
+                    messagebox.showerror("Error", f"Error al abrir con {app}: {str(e)}", parent=chooser)
+        
+        tree.bind('<Double-1>', accept)
+        tree.bind('<Return>', accept)
+        
+        button_frame = ttk.Frame(chooser)
+        button_frame.pack(fill='x', padx=10, pady=10)
+        ttk.Button(button_frame, text="Otro comando...", command=custom_command).pack(side='left')
+        ttk.Button(button_frame, text="Cancelar", command=chooser.destroy).pack(side='right')
+        ttk.Button(button_frame, text="Abrir", command=accept).pack(side='right', padx=5)
+    
+    def create_folder(self):
+        """Crea una nueva carpeta"""
+        if not self.check_writable_view():
+            return
+        name = simpledialog.askstring("Nueva Carpeta", "Nombre de la carpeta:")
+        if name:
+            new_folder = self.current_path / name
+            try:
+                new_folder.mkdir(exist_ok=False)
+                self.refresh_view()
+            except FileExistsError:
+                messagebox.showerror("Error", "Ya existe una carpeta con ese nombre")
+            except Exception as e:
+                messagebox.showerror("Error", f"Error al crear carpeta: {str(e)}")
+    
+    def create_file(self):
+        """Crea un nuevo archivo"""
+        if not self.check_writable_view():
+            return
+        name = simpledialog.askstring("Nuevo Archivo", "Nombre del archivo:")
+        if name:
+            new_file = self.current_path / name
+            try:
+                new_file.touch(exist_ok=False)
+                self.refresh_view()
+            except FileExistsError:
+                messagebox.showerror("Error", "Ya existe un archivo con ese nombre")
+            except Exception as e:
+                messagebox.showerror("Error", f"Error al crear archivo: {str(e)}")
+    
+    def copy_file(self):
+        """Copia archivos seleccionados"""
+        files = self.get_selected_files()
+        if files:
+            self.clipboard = files
+            self.clipboard_operation = 'copy'
+            self.status_label.config(text=f"Copiados {len(files)} elementos")
+    
+    def cut_file(self):
+        """Corta archivos seleccionados"""
+        files = self.get_selected_files()
+        if files and self.check_writable_view():
+            self.clipboard = files
+            self.clipboard_operation = 'cut'
+            self.status_label.config(text=f"Cortados {len(files)} elementos")
+    
+    def paste_file(self, sources=None, operation=None, destination=None):
+        """Pega archivos del portapapeles, o sources en destination (entre paneles)"""
+        from_clipboard = sources is None
+        if from_clipboard:
+            if not self.clipboard or not self.check_writable_view():
+                return
+            sources = list(self.clipboard)
+            operation = self.clipboard_operation
+            destination = self.current_path
+        engine = TransferEngine(preserve=self.preserve_mode.get())
+        
+        def work(job):
+            engine.job = job
+            with Profiler.span('paste_file') as span:
+                span.items = len(sources)
+                engine.paste(sources, destination, operation)
+        
+        def on_done(job):
+            if from_clipboard and operation == 'cut' and not job.error:
+                self.clipboard = None
+                self.clipboard_operation = None
+            
+            self.refresh_panes()
+            if isinstance(job.error, JobCancelled):
+                self.status_label.config(text="Operación cancelada")
+                return
+            if job.error:
+                messagebox.showerror("Error", f"Error en la operación: {str(job.error)}")
+                return
+            
+            status = "Operación completada"
+            if engine.apparent_size:
+                status += (f": {self.format_size(engine.bytes_transferred)} transferidos "
+                            f"de {self.format_size(engine.apparent_size)} aparentes")
+                if engine.hardlinks:
+                    status += f", {engine.hardlinks} enlaces duros recreados"
+            self.status_label.config(text=status)
+        
+        self.run_job("Pegando", work, on_done)
+    
+    def compress_selection(self):
+        """Crea un archivo comprimido con la selección en segundo plano"""
+        files = self.get_selected_files()
+        if not files or not self.check_writable_view():
+            return
+        
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Comprimir")
+        dialog.geometry("400x180")
+        dialog.resizable(False, False)
+        dialog.transient(self.root)
+        
+        frame = ttk.Frame(dialog)
+        frame.pack(fill='both', expand=True, padx=10, pady=10)
+        
+        default_name = files[0].stem if len(files) == 1 else self.current_path.name or "archivo"
+        name_var = tk.StringVar(value=default_name)
+        format_var = tk.StringVar(value='zip')
+        level_var = tk.StringVar(value="6")
+        
+        ttk.Label(frame, text="Nombre:").grid(row=0, column=0, sticky='w', pady=2)
+        ttk.Entry(frame, textvariable=name_var).grid(row=0, column=1, sticky='ew', pady=2)
+        ttk.Label(frame, text="Formato:").grid(row=1, column=0, sticky='w', pady=2)
+        ttk.Combobox(frame, textvariable=format_var, values=ArchiveCreator.available_formats(),
+                        state='readonly', width=10).grid(row=1, column=1, sticky='w', pady=2)
+        ttk.Label(frame, text="Nivel:").grid(row=2, column=0, sticky='w', pady=2)
+        ttk.Spinbox(frame, from_=1, to=19, textvariable=level_var, width=5).grid(row=2, column=1, sticky='w', pady=2)
+        frame.columnconfigure(1, weight=1)
+        
+        def start():
+            archive_format = format_var.get()
+            try:
+                # zlib y xz aceptan 1-9; zstd llega hasta 19
+                level = max(1, min(int(level_var.get()), 19 if archive_format == 'tar.zst' else 9))
+            except ValueError:
+                level = 6
+            dst = self.current_path / f"{name_var.get().strip() or default_name}.{archive_format}"
+            if dst.exists() and not messagebox.askyesno("Confirmar", f"{dst.name} ya existe. ¿Reemplazarlo?",
+                                                        parent=dialog):
+                return
+            dialog.destroy()
+            
+            def work(job):
+                return ArchiveCreator(files, dst, archive_format, level, job).create()
+            
+            def on_done(job):
+                self.refresh_view()
+                if isinstance(job.error, JobCancelled):
+                    self.status_label.config(text="Compresión cancelada")
+                elif job.error:
+                    messagebox.showerror("Error", f"Error al comprimir: {str(job.error)}")
+                else:
+                    input_bytes, output_bytes, elapsed = job.result
+                    ratio = output_bytes / input_bytes * 100 if input_bytes else 100
+                    throughput = input_bytes / elapsed if elapsed else input_bytes
+                    messagebox.showinfo("Compresión completada",
+                                        f"{dst.name}\n\n"
+                                        f"Original: {self.format_size(input_bytes)}\n"
+                                        f"Comprimido: {self.format_size(output_bytes)} ({ratio:.1f}%)\n"
+                                        f"Velocidad: {self.format_size(throughput)}/s en {elapsed:.1f} s")
+            
+            self.run_job("Comprimiendo", work, on_done)
+        
+        button_frame = ttk.Frame(frame)
+        button_frame.grid(row=3, column=0, columnspan=2, sticky='ew', pady=(10, 0))
+        ttk.Button(button_frame, text="Comprimir", command=start).pack(side='left')
+        ttk.Button(button_frame, text="Cancelar", command=dialog.destroy).pack(side='right')
+    
+    def delete_file(self, permanent=False):
+        """Mueve a la papelera (o elimina permanentemente) los archivos seleccionados"""
+        files = self.get_selected_files()
+        if not files or not self.check_writable_view():
+            return
+        
+        # Dentro de la papelera solo cabe eliminar definitivamente
+        if TrashManager.contains(self.current_path):
+            permanent = True
+        
+        summary = self.describe_selection(files)
+        if permanent:
+            question = f"¿Eliminar permanentemente {summary}?\n\nEsta acción no se puede deshacer."
+        else:
+            question = f"¿Mover a la papelera {summary}?"
+        if not messagebox.askyesno("Confirmar eliminación", question):
+            return
+        
+        if not permanent:
+            failed = []
+            with Profiler.span('delete_file.trash') as span:
+                for file_path in files:
+                    try:
+                        TrashManager.trash(file_path)
+                    except OSError:
+                        failed.append(file_path)
+                span.items = len(files)
+            
+            self.refresh_panes()
+            self.status_label.config(text=f"{len(files) - len(failed)} elementos movidos a la papelera")
+            if not failed:
+                return
+            if not messagebox.askyesno("Papelera no disponible",
+                                        f"No se pudieron mover a la papelera {self.describe_selection(failed)}.\n"
+                                        "¿Desea eliminarlos permanentemente?"):
+                return
+            files = failed
+        
+        self.delete_permanently(files)
+    
+    def delete_permanently(self, files):
+        """Elimina archivos en segundo plano con progreso y cancelación"""
+        def work(job):
+            remover = TreeRemover(job)
+            with Profiler.span('delete_file.remove') as span:
+                try:
+                    for index, file_path in enumerate(files):
+                        job.check_cancelled()
+                        job.report(f"Eliminando {file_path.name}", index / len(files))
+                        remover.remove(file_path)
+                        # Sin el elemento, su .trashinfo quedaría huérfano
+                        info = TrashManager.info_file(file_path)
+                        if info:
+                            try:
+                                os.unlink(info)
+                            except FileNotFoundError:
+                                pass
+                finally:
+                    span.items = remover.removed
+            return remover.removed
+        
+        def on_done(job):
+            self.refresh_panes()
+            if isinstance(job.error, JobCancelled):
+                self.status_label.config(text="Eliminación cancelada")
+            elif job.error:
+                messagebox.showerror("Error", f"Error al eliminar: {str(job.error)}")
+            else:
+                self.status_label.config(text=f"Eliminados {len(files)} elementos ({job.result} entradas)")
+        
+        self.run_job("Eliminando", work, on_done)
+    
+    def describe_selection(self, files):
+        """Resume una selección como recuento de carpetas y archivos"""
+        dirs = sum(1 for f in files if f.is_dir())
+        parts = []
+        if dirs:
+            parts.append(f"{dirs} carpeta" if dirs == 1 else f"{dirs} carpetas")
+        if len(files) - dirs:
+            count = len(files) - dirs
+            parts.append(f"{count} archivo" if count == 1 else f"{count} archivos")
+        return " y ".join(parts)
+    
+    def run_job(self, title, work, on_done=None):
+        """Ejecuta una tarea en segundo plano con ventana de progreso"""
+        job = BackgroundJob(work)
+        
+        job_window = tk.Toplevel(self.root)
+        job_window.title(title)
+        job_window.geometry("400x150")
+        job_window.resizable(False, False)
+        job_window.transient(self.root)
+        
+        ttk.Label(job_window, text=f"{title}...").pack(pady=(10, 5))
+        progress_bar = ttk.Progressbar(job_window, mode='indeterminate')
+        progress_bar.pack(pady=5, padx=20, fill='x')
+        progress_bar.start()
+        detail_label = ttk.Label(job_window, text="")
+        detail_label.pack(pady=5)
+        ttk.Button(job_window, text="Cancelar", command=job.cancel).pack(pady=5)
+        job_window.protocol("WM_DELETE_WINDOW", job.cancel)
+        
+        def poll():
+            # Consultar el estado en lugar de tocar Tk desde el hilo de trabajo
+            if job.fraction is not None and str(progress_bar.cget('mode')) != 'determinate':
+                progress_bar.stop()
+                progress_bar.config(mode='determinate', maximum=100)
+            if job.fraction is not None:
+                progress_bar.config(value=job.fraction * 100)
+            detail_label.config(text=job.message)
+            if job.done:
+                progress_bar.stop()
+                job_window.destroy()
+                if on_done:
+                    on_done(job)
+            else:
+                job_window.after(100, poll)
+        
+        job.start()
+        poll()
+        return job
+    
+    def rename_file(self):
+        """Renombra el archivo seleccionado"""
+        files = self.get_selected_files()
+        if not files or not self.check_writable_view():
+            return
+        if len(files) > 1:
+            self.batch_rename()
+            return
+        
+        old_name = files[0].name
+        new_name = simpledialog.askstring("Renombrar", f"Nuevo nombre para '{old_name}':", 
+                                            initialvalue=old_name)
+        if new_name and new_name != old_name:
+            try:
+                new_path = files[0].parent / new_name
+                files[0].rename(new_path)
+                self.refresh_view()
+            except Exception as e:
+                messagebox.showerror("Error", f"Error al renombrar: {str(e)}")
+    
+    def batch_rename(self):
+        """Abre la ventana de renombrado masivo sobre la selección"""
+        files = self.get_selected_files()
+        if not files or not self.check_writable_view():
+            return
+        
+        renamer = BatchRenamer(files)
+        rename_window = tk.Toplevel(self.root)
+        rename_window.title(f"Renombrado masivo - {len(files)} elementos")
+        rename_window.geometry("750x500")
+        rename_window.resizable(True, True)
+        
+        # Opciones
+        options_frame = ttk.LabelFrame(rename_window, text="Reglas")
+        options_frame.pack(fill='x', padx=10, pady=5)
+        
+        pattern_var = tk.StringVar()
+        replacement_var = tk.StringVar()
+        template_var = tk.StringVar(value="{name}")
+        start_var = tk.StringVar(value="1")
+        case_var = tk.StringVar(value='Sin cambios')
+        
+        ttk.Label(options_frame, text="Buscar (regex):").grid(row=0, column=0, sticky='w', padx=5, pady=2)
+        ttk.Entry(options_frame, textvariable=pattern_var).grid(row=0, column=1, sticky='ew', padx=5, pady=2)
+        ttk.Label(options_frame, text="Reemplazar:").grid(row=0, column=2, sticky='w', padx=5, pady=2)
+        ttk.Entry(options_frame, textvariable=replacement_var).grid(row=0, column=3, sticky='ew', padx=5, pady=2)
+        ttk.Label(options_frame, text="Plantilla:").grid(row=1, column=0, sticky='w', padx=5, pady=2)
+        ttk.Entry(options_frame, textvariable=template_var).grid(row=1, column=1, sticky='ew', padx=5, pady=2)
+        ttk.Label(options_frame, text="Inicio {n}:").grid(row=1, column=2, sticky='w', padx=5, pady=2)
+        ttk.Spinbox(options_frame, from_=0, to=999999, textvariable=start_var, width=8).grid(
+            row=1, column=3, sticky='w', padx=5, pady=2)
+        ttk.Label(options_frame, text="Mayúsculas:").grid(row=2, column=0, sticky='w', padx=5, pady=2)
+        ttk.Combobox(options_frame, textvariable=case_var, values=list(BatchRenamer.CASES),
+                        state='readonly', width=15).grid(row=2, column=1, sticky='w', padx=5, pady=2)
+        ttk.Label(options_frame, text="Campos: {name} {stem} {ext} {n:04} {mtime:%Y%m%d} {size}",
+                    foreground='gray').grid(row=2, column=2, columnspan=2, sticky='w', padx=5, pady=2)
+        options_frame.columnconfigure(1, weight=1)
+        options_frame.columnconfigure(3, weight=1)
+        
+        # Vista previa
+        preview_frame = ttk.LabelFrame(rename_window, text="Vista previa")
+        preview_frame.pack(fill='both', expand=True, padx=10, pady=5)
+        
+        columns = ('Actual', 'Nuevo', 'Estado')
+        preview_tree = ttk.Treeview(preview_frame, columns=columns, show='headings')
+        for col in columns:
+            preview_tree.heading(col, text=col, anchor='w')
+        preview_tree.column('Actual', width=280, minwidth=150)
+        preview_tree.column('Nuevo', width=280, minwidth=150)
+        preview_tree.column('Estado', width=120, minwidth=80)
+        preview_tree.tag_configure('error', foreground='red')
+        
+        scrollbar = ttk.Scrollbar(preview_frame, orient='vertical', command=preview_tree.yview)
+        preview_tree.configure(yscrollcommand=scrollbar.set)
+        preview_tree.pack(side='left', fill='both', expand=True)
+        scrollbar.pack(side='right', fill='y')
+        
+        # Las filas se crean una vez y después solo se actualizan sus valores
+        rows = [preview_tree.insert('', 'end', values=(f.name, f.name, '')) for f in files]
+        
+        # Botones
+        button_frame = ttk.Frame(rename_window)
+        button_frame.pack(fill='x', padx=10, pady=(0, 10))
+        summary_label = ttk.Label(button_frame, text="")
+        summary_label.pack(side='left')
+        ttk.Button(button_frame, text="Cerrar", command=rename_window.destroy).pack(side='right')
+        apply_button = ttk.Button(button_frame, text="Renombrar")
+        apply_button.pack(side='right', padx=5)
+        
+        state = {'plan': [], 'after_id': None}
+        
+        def update_preview():
+            state['after_id'] = None
+            try:
+                names = renamer.compute_names(pattern_var.get(), replacement_var.get(),
+                                                template_var.get(), int(start_var.get() or 0), case_var.get())
+            except Exception as e:
+                # La plantilla es de str.format: {name.x} o {n[0]} fallan con cualquier excepción
+                state['plan'] = []
+                summary_label.config(text=f"Regla no válida: {e}", foreground='red')
+                apply_button.config(state='disabled')
+                return
+            
+            state['plan'] = renamer.plan(names)
+            valid = 0
+            errors = 0
+            for row, (src, dst, status) in zip(rows, state['plan']):
+                ok = status in (BatchRenamer.OK, BatchRenamer.CYCLE)
+                valid += ok
+                errors += not ok and status != 'Sin cambios'
+                preview_tree.item(row, values=(src.name, dst.name, status), tags=() if ok else ('error',))
+            
+            summary_label.config(text=f"{valid} para renombrar, {errors} con conflictos",
+                                    foreground='red' if errors else '')
+            apply_button.config(state='normal' if valid else 'disabled')
+        
+        def schedule_preview(*args):
+            # Agrupar pulsaciones seguidas en un único recálculo
+            if state['after_id']:
+                rename_window.after_cancel(state['after_id'])
+            state['after_id'] = rename_window.after(150, update_preview)
+        
+        def apply():
+            plan = state['plan']
+            if not plan:
+                return
+            rename_window.destroy()
+            
+            def on_done(job):
+                self.refresh_view()
+                if isinstance(job.error, JobCancelled):
+                    self.status_label.config(text="Renombrado cancelado, cambios revertidos")
+                elif job.error:
+                    messagebox.showerror("Error", f"Error al renombrar (cambios revertidos): {str(job.error)}")
+                else:
+                    self.status_label.config(text=f"Renombrados {job.result} elementos")
+            
+            self.run_job("Renombrando", lambda job: BatchRenamer.execute(plan, job), on_done)
+        
+        apply_button.config(command=apply)
+        for var in (pattern_var, replacement_var, template_var, start_var, case_var):
+            var.trace_add('write', schedule_preview)
+        update_preview()
+    
+    def show_properties(self):
+        """Muestra propiedades del archivo seleccionado"""
+        files = self.get_selected_files()
+        if not files:
+            return
+        
+        file_path = files[0]
+        try:
+            stat = file_path.stat()
+            
+            # Crear ventana de propiedades
+            props_window = tk.Toplevel(self.root)
+            props_window.title(f"Propiedades - {file_path.name}")
+            props_window.geometry("400x300")
+            props_window.resizable(False, False)
+            
+            # Información
+            info_frame = ttk.LabelFrame(props_window, text="Información General")
+            info_frame.pack(fill='x', padx=10, pady=5)
+            
+            ttk.Label(info_frame, text=f"Nombre: {file_path.name}").pack(anchor='w', padx=5, pady=2)
+            ttk.Label(info_frame, text=f"Tipo: {self.get_file_type(file_path)}").pack(anchor='w', padx=5, pady=2)
+            ttk.Label(info_frame, text=f"Ubicación: {file_path.parent}").pack(anchor='w', padx=5, pady=2)
+            
+            if file_path.is_file():
+                ttk.Label(info_frame, text=f"Tamaño: {self.format_size(stat.st_size)}").pack(anchor='w', padx=5, pady=2)
+            elif file_path.is_dir():
+                size_label = ttk.Label(info_frame, text="Tamaño: calculando...")
+                size_label.pack(anchor='w', padx=5, pady=2)
+                
+                def measure():
+                    result = FolderSizes.measure(file_path, lambda: self.closing)
+                    FolderSizes.save_cache()
+                    text = (f"Tamaño: {self.format_size(result[0])} ({result[1]} archivos)"
+                            if result else "Tamaño: no disponible")
+                    self.call_in_ui(lambda: size_label.winfo_exists() and size_label.config(text=text))
+                
+                self.size_executor.submit(measure)
+            
+            # Fechas
+            dates_frame = ttk.LabelFrame(props_window, text="Fechas")
+            dates_frame.pack(fill='x', padx=10, pady=5)
+            
+            created = datetime.fromtimestamp(stat.st_ctime).strftime('%Y-%m-%d %H:%M:%S')
+            modified = datetime.fromtimestamp(stat.st_mtime).strftime('%Y-%m-%d %H:%M:%S')
+            accessed = datetime.fromtimestamp(stat.st_atime).strftime('%Y-%m-%d %H:%M:%S')
+            
+            ttk.Label(dates_frame, text=f"Creado: {created}").pack(anchor='w', padx=5, pady=2)
+            ttk.Label(dates_frame, text=f"Modificado: {modified}").pack(anchor='w', padx=5, pady=2)
+            ttk.Label(dates_frame, text=f"Accedido: {accessed}").pack(anchor='w', padx=5, pady=2)
+            
+            # Permisos
+            perms_frame = ttk.LabelFrame(props_window, text="Permisos")
+            perms_frame.pack(fill='x', padx=10, pady=5)
+            
+            mode = stat.st_mode
+            permissions = []
+            if mode & 0o400: permissions.append("Lectura (propietario)")
+            if mode & 0o200: permissions.append("Escritura (propietario)")
+            if mode & 0o100: permissions.append("Ejecución (propietario)")
+            if mode & 0o040: permissions.append("Lectura (grupo)")
+            if mode & 0o020: permissions.append("Escritura (grupo)")
+            if mode & 0o010: permissions.append("Ejecución (grupo)")
+            if mode & 0o004: permissions.append("Lectura (otros)")
+            if mode & 0o002: permissions.append("Escritura (otros)")
+            if mode & 0o001: permissions.append("Ejecución (otros)")
+            
+            for perm in permissions:
+                ttk.Label(perms_frame, text=f"• {perm}").pack(anchor='w', padx=5, pady=1)
+            
+        except Exception as e:
+            messagebox.showerror("Error", f"Error al obtener propiedades: {str(e)}")
+    
+    # Búsqueda
+    @Profiler.timed('search_files')
+    def search_files(self, event=None):
+        """Busca archivos en la carpeta actual"""
+        query = self.search_entry.get().strip()
+        if not query:
+            self.refresh_view()  # Restaurar vista normal
+            return
+        
+        # Limpiar vista
+        for item in self.file_tree.get_children():
+            self.file_tree.delete(item)
+        self.item_data = {}
+        memory_start = self.memory.begin()
+        
+        try:
+            matches = FileLister.search(self.current_path, query, getattr(self, 'show_hidden', False))
+            
+            # Mostrar resultados
+            self.item_data = {}
+            self.pane.new_listing()
+            with Profiler.span('search_files.insert') as span:
+                for match in matches:
+                    iid = self.file_tree.insert('', 'end',
+                                        text=match['icon'],
+                                        values=(match['name'], match['size'], match['type'], match['modified']),
+                                        tags=('directory' if match['is_dir'] else 'file',))
+                    self.item_data[iid] = match
+                span.items = len(matches)
+            
+            self.status_label.config(text=f"Encontrados {len(matches)} elementos para '{query}'")
+            self.finish_memory_report('search_files', len(matches), memory_start)
+            
+        except Exception as e:
+            messagebox.showerror("Error", f"Error en la búsqueda: {str(e)}")
+    
+    # Marcadores
+    def add_bookmark(self):
+        """Añade la carpeta actual a marcadores"""
+        if str(self.current_path) not in self.bookmarks:
+            self.bookmarks.append(str(self.current_path))
+            self.save_config()
+            self.populate_sidebar()
+            messagebox.showinfo("Marcador", f"Marcador añadido: {self.current_path.name}")
+        else:
+            messagebox.showinfo("Marcador", "Esta carpeta ya está en marcadores")
+    
+    def manage_bookmarks(self):
+        """Abre ventana para gestionar marcadores"""
+        if not self.bookmarks:
+            messagebox.showinfo("Marcadores", "No hay marcadores guardados")
+            return
+        
+        # Crear ventana
+        bookmarks_window = tk.Toplevel(self.root)
+        bookmarks_window.title("Gestionar Marcadores")
+        bookmarks_window.geometry("500x300")
+        bookmarks_window.resizable(True, True)
+        
+        # Lista de marcadores
+        frame = ttk.Frame(bookmarks_window)
+        frame.pack(fill='both', expand=True, padx=10, pady=10)
+        
+        ttk.Label(frame, text="Marcadores guardados:", font=('Arial', 12, 'bold')).pack(anchor='w', pady=(0, 5))
+        
+        listbox = tk.Listbox(frame, selectmode='single')
+        listbox.pack(fill='both', expand=True, pady=(0, 10))
+        
+        # Poblar lista
+        for bookmark in self.bookmarks:
+            display_name = f"{os.path.basename(bookmark)} ({bookmark})"
+            listbox.insert(tk.END, display_name)
+        
+        # Botones
+        button_frame = ttk.Frame(frame)
+        button_frame.pack(fill='x')
+        
+        def go_to_bookmark():
+            selection = listbox.curselection()
+            if selection:
+                bookmark_path = self.bookmarks[selection[0]]
+                if os.path.exists(bookmark_path):
+                    self.navigate_to_path(bookmark_path)
+                    bookmarks_window.destroy()
+                else:
+                    messagebox.showerror("Error", "El marcador ya no existe")
+        
+        def remove_bookmark():
+            selection = listbox.curselection()
+            if selection:
+                removed_bookmark = self.bookmarks.pop(selection[0])
+                listbox.delete(selection[0])
+                self.save_config()
+                self.populate_sidebar()
+                messagebox.showinfo("Marcador", f"Marcador eliminado: {os.path.basename(removed_bookmark)}")
+        
+        ttk.Button(button_frame, text="Ir a", command=go_to_bookmark).pack(side='left', padx=(0, 5))
+        ttk.Button(button_frame, text="Eliminar", command=remove_bookmark).pack(side='left', padx=5)
+        ttk.Button(button_frame, text="Cerrar", command=bookmarks_window.destroy).pack(side='right')
+    
+    # Gestión WiFi
+    def open_wifi_manager(self):
+        """Abre el gestor de WiFi"""
+        wifi_window = tk.Toplevel(self.root)
+        wifi_window.title("Gestión WiFi")
+        wifi_window.geometry("600x400")
+        wifi_window.resizable(True, True)
+        
+        # Frame principal
+        main_frame = ttk.Frame(wifi_window)
+        main_frame.pack(fill='both', expand=True, padx=10, pady=10)
+        
+        # Estado actual
+        status_frame = ttk.LabelFrame(main_frame, text="Estado Actual")
+        status_frame.pack(fill='x', pady=(0, 10))
+        
+        current_conn = self.wifi.get_current_connection()
+        status_text = f"Conectado a: {current_conn}" if current_conn else "Desconectado"
+        self.wifi_status_label = ttk.Label(status_frame, text=status_text, font=('Arial', 11))
+        self.wifi_status_label.pack(pady=10)
+        
+        # Botones de control
+        control_frame = ttk.Frame(status_frame)
+        control_frame.pack(pady=5)
+        
+        ttk.Button(control_frame, text="Escanear Redes", 
+                    command=lambda: self.scan_wifi_networks(networks_tree, rescan=True)).pack(side='left', padx=5)
+        ttk.Button(control_frame, text="Desconectar", 
+                    command=lambda: self.disconnect_wifi(wifi_window)).pack(side='left', padx=5)
+        
+        # Lista de redes
+        networks_frame = ttk.LabelFrame(main_frame, text="Redes Disponibles")
+        networks_frame.pack(fill='both', expand=True, pady=(0, 10))
+        
+        # Treeview para redes
+        columns = ('SSID', 'Señal', 'Seguridad')
+        networks_tree = ttk.Treeview(networks_frame, columns=columns, show='headings', height=10)
+        
+        # Configurar columnas
+        for col in columns:
+            networks_tree.heading(col, text=col)
+            if col == 'SSID':
+                networks_tree.column(col, width=250, minwidth=200)
+            elif col == 'Señal':
+                networks_tree.column(col, width=100, minwidth=80)
+            else:
+                networks_tree.column(col, width=120, minwidth=100)
+        
+        # Scrollbar
+        scrollbar = ttk.Scrollbar(networks_frame, orient='vertical', command=networks_tree.yview)
+        networks_tree.configure(yscrollcommand=scrollbar.set)
+        
+        networks_tree.pack(side='left', fill='both', expand=True)
+        scrollbar.pack(side='right', fill='y')
+        
+        # Evento doble clic
+        networks_tree.bind('<Double-1>', lambda e: self.connect_to_wifi(networks_tree, wifi_window))
+        
+        # Botones inferiores
+        button_frame = ttk.Frame(main_frame)
+        button_frame.pack(fill='x')
+        
+        ttk.Button(button_frame, text="Conectar", 
+                    command=lambda: self.connect_to_wifi(networks_tree, wifi_window)).pack(side='left', padx=5)
+        ttk.Button(button_frame, text="Actualizar", 
+                    command=lambda: self.scan_wifi_networks(networks_tree, rescan=True)).pack(side='left', padx=5)
+        ttk.Button(button_frame, text="Cerrar", command=wifi_window.destroy).pack(side='right')
+        
+        # Mostrar el último escaneo al instante y refrescarlo si ha caducado
+        self.scan_wifi_networks(networks_tree)
+    
+    def scan_wifi_networks(self, tree_widget, rescan=False):
+        """Escanea y muestra redes WiFi"""
+        def show(networks):
+            if not tree_widget.winfo_exists():
+                return
+            for item in tree_widget.get_children():
+                tree_widget.delete(item)
+            self.wifi_networks = {}  # iid -> red, para conectar sin releer la fila
+            for network in networks:
+                signal_bars = "📶" * min(4, network['signal'] // 25 + 1)
+                name = f"Red oculta ({network['bssid']})" if network['hidden'] else network['ssid']
+                iid = tree_widget.insert('', 'end', values=(
+                    name,
+                    f"{signal_bars} {network['signal']}%",
+                    network['security']
+                ))
+                self.wifi_networks[iid] = network
+            
+            if not networks:
+                tree_widget.insert('', 'end', values=("No se encontraron redes", "", ""))
+        
+        cached, fresh = self.wifi.cached_networks()
+        if cached is not None:
+            show(cached)
+            if fresh and not rescan:
+                return
+        
+        def scan_thread():
+            networks = self.wifi.scan_networks(rescan=rescan)
+            # Actualizar en el hilo principal
+            self.call_in_ui(show, networks)
+        
+        thread = threading.Thread(target=scan_thread)
+        thread.daemon = True
+        thread.start()
+    
+    def connect_to_wifi(self, tree_widget, parent_window):
+        """Conecta a la red WiFi seleccionada"""
+        selection = tree_widget.selection()
+        if not selection:
+            messagebox.showwarning("Advertencia", "Seleccione una red para conectar")
+            return
+        
+        network = getattr(self, 'wifi_networks', {}).get(selection[0])
+        if network is None:  # Fila "No se encontraron redes"
+            return
+        ssid = network['ssid']
+        security = network['security']
+        bssid = None
+        if network['hidden']:
+            # El punto de acceso no anuncia su nombre: hay que conocerlo
+            ssid = simpledialog.askstring("Red oculta", f"Nombre (SSID) de la red de {network['bssid']}:",
+                                          parent=parent_window)
+            if not ssid:
+                return
+            bssid = network['bssid']
+        
+        password = None
+        if 'WPA' in security or 'WEP' in security:
+            password = simpledialog.askstring("Contraseña WiFi", 
+                                                f"Ingrese la contraseña para '{ssid}':", 
+                                                show='*', parent=parent_window)
+            if password is None:  # Usuario canceló
+                return
+        
+        # Crear ventana de progreso
+        progress_window = tk.Toplevel(parent_window)
+        progress_window.title("Conectando...")
+        progress_window.geometry("300x100")
+        progress_window.resizable(False, False)
+        progress_window.transient(parent_window)
+        progress_window.grab_set()
+        
+        ttk.Label(progress_window, text=f"Conectando a {ssid}...").pack(pady=10)
+        progress_bar = ttk.Progressbar(progress_window, mode='indeterminate')
+        progress_bar.pack(pady=10, padx=20, fill='x')
+        progress_bar.start()
+        
+        def connect_thread():
+            success, message = self.wifi.connect_to_network(ssid, password, bssid)
+            
+            def update_result():
+                progress_bar.stop()
+                progress_window.destroy()
+                
+                if success:
+                    messagebox.showinfo("Éxito", f"Conectado exitosamente a {ssid}")
+                    parent_window.destroy()
+                else:
+                    messagebox.showerror("Error", f"No se pudo conectar: {message}")
+            
+            self.call_in_ui(update_result)
+        
+        thread = threading.Thread(target=connect_thread)
+        thread.daemon = True
+        thread.start()
+    
+    def disconnect_wifi(self, parent_window):
+        """Desconecta del WiFi actual"""
+        if not messagebox.askyesno("Confirmar", "¿Desea desconectarse de la red WiFi?", parent=parent_window):
+            return
+        
+        def disconnect_thread():
+            success, message = self.wifi.disconnect()
+            
+            def update_result():
+                if success:
+                    messagebox.showinfo("Éxito", "Desconectado exitosamente")
+                    parent_window.destroy()
+                else:
+                    messagebox.showerror("Error", f"Error al desconectar: {message}")
+            
+            self.call_in_ui(update_result)
+        
+        threading.Thread(target=disconnect_thread, daemon=True).start()
+    
+    def update_wifi_status(self):
+        """Actualiza el estado del WiFi en la barra de estado"""
+        current_conn = self.wifi.get_current_connection()
+        if current_conn:
+            self.wifi_label.config(text=f"📶 {current_conn}")
+        else:
+            self.wifi_label.config(text="📶 Sin conexión")
+        if getattr(self, 'wifi_status_label', None) and self.wifi_status_label.winfo_exists():
+            self.wifi_status_label.config(text=f"Conectado a: {current_conn}" if current_conn else "Desconectado")
+    
+    # Control de volumen
+    def open_volume_control(self):
+        """Abre el control de volumen avanzado"""
+        volume_window = tk.Toplevel(self.root)
+        volume_window.title("Control de Volumen")
+        volume_window.geometry("400x200")
+        volume_window.resizable(False, False)
+        
+        # Frame principal
+        main_frame = ttk.Frame(volume_window)
+        main_frame.pack(fill='both', expand=True, padx=20, pady=20)
+        
+        # Título
+        ttk.Label(main_frame, text="Control de Volumen del Sistema", 
+                    font=('Arial', 14, 'bold')).pack(pady=(0, 20))
+        
+        # Control de volumen
+        volume_frame = ttk.Frame(main_frame)
+        volume_frame.pack(fill='x', pady=10)
+        
+        ttk.Label(volume_frame, text="🔊 Volumen:", font=('Arial', 12)).pack(anchor='w')
+        
+        self.volume_var = tk.IntVar(value=self.volume.get_volume())
+        volume_scale = ttk.Scale(volume_frame, from_=0, to=100, orient='horizontal',
+                                variable=self.volume_var, length=300,
+                                command=self.on_volume_control_change)
+        volume_scale.pack(fill='x', pady=5)
+        
+        # Etiqueta de porcentaje
+        self.volume_percent_label = ttk.Label(volume_frame, text=f"{self.volume_var.get()}%", 
+                                            font=('Arial', 11))
+        self.volume_percent_label.pack()
+        
+        # Botones
+        button_frame = ttk.Frame(main_frame)
+        button_frame.pack(fill='x', pady=20)
+        
+        mute_text = "🔇 Dessilenciar" if self.volume.is_muted() else "🔇 Silenciar"
+        self.mute_button = ttk.Button(button_frame, text=mute_text, command=self.toggle_mute_advanced)
+        self.mute_button.pack(side='left')
+        
+        ttk.Button(button_frame, text="Cerrar", command=volume_window.destroy).pack(side='right')
+    
+    def on_volume_control_change(self, value):
+        """Maneja cambios en el control de volumen avanzado"""
+        volume = int(float(value))
+        self.volume.set_volume(volume)
+        self.volume_percent_label.config(text=f"{volume}%")
+        self.volume_scale.set(volume)  # Actualizar control en barra de estado
+    
+    def toggle_mute_advanced(self):
+        """Alterna silencio en control avanzado"""
+        self.volume.toggle_mute()
+    
+    def on_volume_change(self, value):
+        """Maneja cambios en el control de volumen de la barra de estado"""
+        volume = int(float(value))
+        self.volume.set_volume(volume)
+    
+    def on_volume_state(self):
+        """Refleja en los controles un cambio de volumen o silencio del sistema"""
+        volume = self.volume.get_volume()
+        self.volume_scale.set(volume)
+        if getattr(self, 'mute_button', None) and self.mute_button.winfo_exists():
+            self.volume_var.set(volume)
+            self.volume_percent_label.config(text=f"{volume}%")
+            self.mute_button.config(text="🔇 Dessilenciar" if self.volume.is_muted() else "🔇 Silenciar")
+    
+    # Herramientas del sistema
+    def open_terminal(self):
+        """Abre terminal en la carpeta actual"""
+        terminals = ['gnome-terminal', 'konsole', 'xfce4-terminal', 'lxterminal', 'xterm']
+        executor = CommandExecutor.instance()
+        
+        for terminal in terminals:
+            if shutil.which(terminal):
+                try:
+                    if terminal in ['gnome-terminal', 'xfce4-terminal']:
+                        executor.spawn([terminal, '--working-directory', str(self.current_path)])
+                    elif terminal == 'konsole':
+                        executor.spawn([terminal, '--workdir', str(self.current_path)])
+                    else:
+                        executor.spawn([terminal], cwd=str(self.current_path))
+                    return
+                except OSError:
+                    continue
+        
+        messagebox.showerror("Error", "No se pudo abrir terminal")
+    
+    def open_system_monitor(self):
+        """Abre monitor del sistema"""
+        monitors = ['gnome-system-monitor', 'ksysguard', 'xfce4-taskmanager', 'htop']
+        executor = CommandExecutor.instance()
+        
+        for monitor in monitors:
+            if shutil.which(monitor):
+                try:
+                    if monitor == 'htop':
+                        # Abrir htop en terminal
+                        terminals = ['gnome-terminal', 'konsole', 'xfce4-terminal', 'xterm']
+                        for terminal in terminals:
+                            if shutil.which(terminal):
+                                if terminal == 'gnome-terminal':
+                                    executor.spawn([terminal, '--', 'htop'])
+                                elif terminal == 'konsole':
+                                    executor.spawn([terminal, '-e', 'htop'])
+                                else:
+                                    executor.spawn([terminal, '-e', 'htop'])
+                                return
+                    else:
+                        executor.spawn([monitor])
+                        return
+                except OSError:
+                    continue
+        
+        messagebox.showerror("Error", "No se pudo abrir monitor del sistema")
+    
+    # Diagnóstico
+    def open_profiler_window(self):
+        """Ventana con los tiempos por fase de las operaciones y los comandos externos"""
+        window = tk.Toplevel(self.root)
+        window.title("Tiempos de operaciones")
+        window.geometry("760x520")
+        
+        columns = ('Llamadas', 'Elementos', 'Total ms', 'p50 ms', 'p95 ms', 'Máx ms')
+        panes = ttk.PanedWindow(window, orient='vertical')
+        panes.pack(fill='both', expand=True, padx=10, pady=(10, 5))
+        
+        def make_tree(heading, tree_columns):
+            frame = ttk.Frame(panes)
+            tree = ttk.Treeview(frame, columns=tree_columns)
+            tree.heading('#0', text=heading)
+            tree.column('#0', width=240)
+            for column in tree_columns:
+                tree.heading(column, text=column)
+                tree.column(column, width=80, anchor='e')
+            scrollbar = ttk.Scrollbar(frame, orient='vertical', command=tree.yview)
+            tree.configure(yscrollcommand=scrollbar.set)
+            tree.pack(side='left', fill='both', expand=True)
+            scrollbar.pack(side='right', fill='y')
+            panes.add(frame, weight=1)
+            return tree
+        
+        spans_tree = make_tree("Operación", columns)
+        commands_tree = make_tree("Comando", ('Llamadas', 'Errores', 'Total ms', 'p50 ≤ms', 'p95 ≤ms', 'Máx ms'))
+        stalls_tree = make_tree("Bloqueos de la interfaz (función)", ('Veces', 'Total ms', 'Máx ms'))
+        
+        controls = ttk.Frame(window)
+        controls.pack(fill='x', padx=10, pady=(0, 10))
+        operation_var = tk.StringVar(value='refresh_view')
+        operations = ['refresh_view', 'search_files', 'paste_file', 'delete_file.trash',
+                      'delete_file.remove', 'FileOpener.open_file', 'WiFiManager.refresh',
+                      'WiFiManager.scan_networks', 'VolumeManager.refresh']
+        ttk.Combobox(controls, textvariable=operation_var, values=operations, width=26).pack(side='left')
+        capture_label = ttk.Label(controls, text="")
+        
+        def capture():
+            path = Profiler.capture(operation_var.get().strip())
+            capture_label.config(text=f"Pendiente: {os.path.basename(path)}")
+        
+        def copy_report():
+            self.root.clipboard_clear()
+            self.root.clipboard_append(Profiler.report())
+        
+        ttk.Button(controls, text="Perfilar siguiente", command=capture).pack(side='left', padx=5)
+        ttk.Button(controls, text="Copiar informe", command=copy_report).pack(side='right')
+        ttk.Button(controls, text="Reiniciar", command=Profiler.reset).pack(side='right', padx=5)
+        capture_label.pack(side='left', padx=5)
+        
+        def fill(tree, rows):
+            # Actualizar en el sitio para no perder la selección ni el desplazamiento
+            for name, values in rows:
+                if tree.exists(name):
+                    tree.item(name, values=values)
+                else:
+                    tree.insert('', 'end', iid=name, text=name, values=values)
+            names = {name for name, _ in rows}
+            for iid in tree.get_children():
+                if iid not in names:
+                    tree.delete(iid)
+        
+        def update():
+            if not window.winfo_exists():
+                return
+            fill(spans_tree, [(name, (e['count'], e['items'], f"{e['total_ms']:.1f}", f"{e['p50_ms']:.2f}",
+                                      f"{e['p95_ms']:.2f}", f"{e['max_ms']:.2f}"))
+                              for name, e in sorted(Profiler.snapshot().items())])
+            executor = CommandExecutor._instance
+            if executor:
+                fill(commands_tree, [(name, (e['count'], e['errors'] + e['timeouts'], f"{e['total_ms']:.1f}",
+                                             executor.percentile(e, 0.5), executor.percentile(e, 0.95),
+                                             f"{e['max_ms']:.1f}"))
+                                     for name, e in sorted(executor.snapshot().items())])
+            if self.watchdog:
+                fill(stalls_tree, [(name, (count, f"{total:.0f}", f"{worst:.0f}"))
+                                   for name, count, total, worst in self.watchdog.ranking()])
+            pending = Profiler.pending_captures()
+            if pending:
+                capture_label.config(text="Pendiente: " + ", ".join(pending))
+            elif Profiler.last_capture:
+                capture_label.config(text=f"Guardado: {Profiler.last_capture}")
+            window.after(1000, update)
+        
+        update()
+    
+    def toggle_memory_diagnostics(self):
+        """Activa o desactiva tracemalloc y el indicador de RSS"""
+        if self.memory_diagnostics.get():
+            self.memory.enable()
+            self.memory_label.pack(side='right', padx=5)
+            self.update_memory_label()
+        else:
+            self.memory.disable()
+            self.memory_label.pack_forget()
+            if self._memory_after:
+                self.root.after_cancel(self._memory_after)
+                self._memory_after = None
+    
+    def update_memory_label(self):
+        self.memory_label.config(text=f"RSS {self.format_size(self.memory.rss())}")
+        self._memory_after = self.root.after(2000, self.update_memory_label)
+    
+    def finish_memory_report(self, view, entries, memory_start):
+        """Cierra la medición de una vista y avisa si supera el presupuesto"""
+        report = self.memory.end(view, str(self.current_path), entries, memory_start)
+        if not report or not report['over_budget']:
+            return
+        used = max(report['traced'], report['rss_delta'])
+        warning = (f"⚠ La vista ocupa {self.format_size(used)} "
+                   f"(presupuesto {self.format_size(self.memory.budget)})")
+        self.status_label.config(text=warning)
+        print(f"{warning}: {view} {report['path']} ({entries} elementos)", file=sys.stderr)
+    
+    def memory_structures(self):
+        """Tamaño aproximado de las estructuras que crecen durante la sesión"""
+        return [
+            ("Listado actual (item_data)", len(self.item_data), MemoryMonitor.deep_size(self.item_data)),
+            ("Filas del Treeview", len(self.file_tree.get_children()), None),
+            ("Historial", len(self.history), MemoryMonitor.deep_size(self.history)),
+            ("Caché de tipos por contenido", len(ContentSniffer._cache), None),
+            ("Caché multimedia", len(MediaInfo._cache or {}), MemoryMonitor.deep_size(MediaInfo._cache or {})),
+            ("Miniaturas en memoria", len(self.grid_images), None),
+        ]
+    
+    def open_memory_window(self):
+        """Informe de memoria: vistas medidas, líneas que más reservan y estructuras"""
+        window = tk.Toplevel(self.root)
+        window.title("Informe de memoria")
+        window.geometry("760x560")
+        
+        summary = ttk.Label(window, text="")
+        summary.pack(fill='x', padx=10, pady=(10, 5))
+        
+        panes = ttk.PanedWindow(window, orient='vertical')
+        panes.pack(fill='both', expand=True, padx=10, pady=(0, 10))
+        
+        def make_tree(heading, columns):
+            tree = ttk.Treeview(panes, columns=columns, height=6)
+            tree.heading('#0', text=heading)
+            tree.column('#0', width=260)
+            for column in columns:
+                tree.heading(column, text=column)
+                tree.column(column, width=90, anchor='e')
+            panes.add(tree, weight=1)
+            return tree
+        
+        views_tree = make_tree("Vista", ('Elementos', 'Python', 'Bytes/elem.', 'Pico', 'Δ RSS'))
+        sites_tree = make_tree("Líneas que más reservaron (última vista)", ('Bytes', 'Bloques'))
+        structures_tree = make_tree("Estructura", ('Elementos', 'Tamaño aprox.'))
+        
+        def signed_size(size):
+            return ("-" if size < 0 else "") + self.format_size(abs(size))
+        
+        def update():
+            if not window.winfo_exists():
+                return
+            state = "activo" if self.memory.enabled else "desactivado (Ayuda > Diagnóstico de memoria)"
+            traced = tracemalloc.get_traced_memory()[0] if self.memory.enabled else 0
+            summary.config(text=f"RSS {self.format_size(self.memory.rss())} · "
+                                f"Python rastreado {self.format_size(traced)} · tracemalloc {state}")
+            
+            for tree in (views_tree, sites_tree, structures_tree):
+                tree.delete(*tree.get_children())
+            reports = list(self.memory.reports)
+            for report in reversed(reports):
+                tags = ('over',) if report['over_budget'] else ()
+                views_tree.insert('', 'end', text=f"{report['time']} {report['view']}: {report['path']}",
+                                  values=(report['entries'], signed_size(report['traced']),
+                                          f"{report['per_entry']:.0f}", self.format_size(report['peak']),
+                                          signed_size(report['rss_delta'])), tags=tags)
+            views_tree.tag_configure('over', foreground='red')
+            if reports:
+                for site, size, count in reports[-1]['sites']:
+                    sites_tree.insert('', 'end', text=site, values=(self.format_size(size), count))
+            for name, count, size in self.memory_structures():
+                structures_tree.insert('', 'end', text=name,
+                                       values=(count, self.format_size(size) if size is not None else "—"))
+            window.after(3000, update)
+        
+        update()
+    
+    # Configuración
+    def toggle_hidden_files(self):
+        """Alterna mostrar archivos ocultos"""
+        self.show_hidden = not getattr(self, 'show_hidden', False)
+        self.refresh_view()
+        status = "mostrados" if self.show_hidden else "ocultos"
+        self.status_label.config(text=f"Archivos ocultos {status}")
+    
+    def load_config(self):
+        """Carga configuración desde archivo"""
+        config_file = Path.home() / '.file_explorer_config.json'
+        try:
+            if config_file.exists():
+                with open(config_file, 'r') as f:
+                    config = json.load(f)
+                    self.bookmarks = config.get('bookmarks', [])
+                    self.show_hidden = config.get('show_hidden', False)
+                    self.preserve_mode.set(config.get('preserve_mode', False))
+                    self.view_mode.set(config.get('view_mode', 'list'))
+                    self.show_preview.set(config.get('show_preview', False))
+                    self.show_media_columns.set(config.get('show_media_columns', False))
+                    self.show_folder_sizes.set(config.get('show_folder_sizes', True))
+                    self.dual_pane.set(config.get('dual_pane', False))
+        except:
+            self.bookmarks = []
+            self.show_hidden = False
+    
+    def save_config(self):
+        """Guarda configuración a archivo"""
+        config_file = Path.home() / '.file_explorer_config.json'
+        try:
+            config = {
+                'bookmarks': self.bookmarks,
+                'show_hidden': getattr(self, 'show_hidden', False),
+                'preserve_mode': self.preserve_mode.get(),
+                'view_mode': self.view_mode.get(),
+                'show_preview': self.show_preview.get(),
+                'show_media_columns': self.show_media_columns.get(),
+                'show_folder_sizes': self.show_folder_sizes.get(),
+                'dual_pane': self.dual_pane.get()
+            }
+            with open(config_file, 'w') as f:
+                json.dump(config, f, indent=2)
+        except Exception as e:
+            print(f"Error guardando configuración: {e}")
+    
+    def shutdown(self):
+        """Detiene los servicios en segundo plano antes de cerrar"""
+        self.closing = True  # Interrumpe las mediciones de carpetas en curso
+        self.thumbnails.shutdown()
+        self.preview_executor.shutdown(wait=False, cancel_futures=True)
+        self.sniff_executor.shutdown(wait=False, cancel_futures=True)
+        self.media_executor.shutdown(wait=False, cancel_futures=True)
+        self.tree_executor.shutdown(wait=False, cancel_futures=True)
+        self.size_executor.shutdown(wait=False, cancel_futures=True)
+        self.frecency.save(force=True)
+        self.volume.stop()
+        self.wifi.stop()
+        if self.watchdog:
+            self.watchdog.stop()
+        MediaInfo.save_cache(force=True)
+        FolderSizes.save_cache(force=True)
+    
+    # Instalación de dependencias
+    def install_dependencies(self):
+        """Instala dependencias necesarias"""
+        if messagebox.askyesno("Instalar Dependencias", 
+                                "¿Desea instalar todas las dependencias necesarias?\n" +
+                                "Esto incluye visores de imágenes, reproductores de video, " +
+                                "editores de texto y herramientas del sistema.\n\n" +
+                                "Se requieren permisos de administrador."):
+            DependencyManager.install_dependencies()
+    
+    # Acerca de
+    def show_about(self):
+        """Muestra información sobre la aplicación"""
+        about_text = """
+            Explorador de Archivos Linux v1.0
+
+            Diseñado especialmente para usuarios nuevos de Linux.
+
+            Características:
+            • Exploración completa de archivos y carpetas
+            • Gestión de WiFi integrada
+            • Control de volumen del sistema
+            • Instalación automática de dependencias
+            • Soporte para múltiples formatos de archivo
+            • Marcadores y accesos rápidos
+            • Búsqueda de archivos
+            • Terminal integrado
+
+            Desarrollado con Python y Tkinter
+            Autor: Asistente Claude
+
+            © 2024 - Software Libre
+        """
+        
+        messagebox.showinfo("Acerca de", about_text.strip())
+
+def main():
+    """Función principal"""
+    # Verificar que estamos en Linux
+    if sys.platform not in ['linux', 'linux2']:
+        print("Error: Esta aplicación está diseñada solo para sistemas Linux")
+        sys.exit(1)
+    
+    parser = argparse.ArgumentParser(description="Explorador de archivos para Linux")
+    parser.add_argument('--startup-trace', action='store_true',
+                        help="Imprime en stderr el tiempo de cada fase del arranque")
+    parser.add_argument('--stall-threshold', type=int, default=100, metavar='MS',
+                        help="Registra en stalls.log los bloqueos de la interfaz más largos (0 desactiva)")
+    parser.add_argument('--memory', action='store_true',
+                        help="Activa el diagnóstico de memoria (tracemalloc) desde el arranque")
+    parser.add_argument('--memory-budget', type=int, default=0, metavar='MB',
+                        help="Avisa cuando una sola vista ocupe más de estos MB")
+    parser.add_argument('--profile', action='store_true',
+                        help="Imprime en stderr al salir los tiempos por operación y fase")
+    parser.add_argument('--profile-op', metavar='OPERACIÓN',
+                        help="Perfila con cProfile la primera ejecución de la operación (p. ej. refresh_view)")
+    parser.add_argument('--profile-out', metavar='RUTA',
+                        help="Archivo .pstats para --profile-op (por defecto en la caché)")
+    args = parser.parse_args()
+    trace = StartupTrace(args.startup_trace)
+    if args.memory:
+        tracemalloc.start()
+    if args.profile_op:
+        Profiler.capture(args.profile_op, args.profile_out)
+    
+    # Crear ventana principal
+    root = tk.Tk()
+    trace.mark("tk.Tk()")
+    
+    # Configurar tema oscuro si está disponible
+    try:
+        root.tk.call('source', '/usr/share/themes/Adwaita-dark/gtk-3.0/gtk.css')
+    except:
+        pass
+    
+    # Crear aplicación
+    app = FileExplorer(root, trace, args.stall_threshold, args.memory_budget)
+    
+    # Configurar cierre
+    def on_closing():
+        app.save_config()
+        app.shutdown()
+        root.destroy()
+    
+    root.protocol("WM_DELETE_WINDOW", on_closing)
+    
+    # Centrar ventana con el tamaño pedido, sin forzar un cálculo de geometría
+    width, height = 1000, 700
+    x = (root.winfo_screenwidth() - width) // 2
+    y = (root.winfo_screenheight() - height) // 2
+    root.geometry(f"{width}x{height}+{x}+{y}")
+    
+    # Los callbacks de inactividad corren tras el dibujado pendiente
+    def after_first_paint():
+        trace.mark("primer dibujado")
+        app.start_background_services()
+        trace.mark("servicios en segundo plano")
+        trace.report()
+    
+    root.after_idle(after_first_paint)
+    
+    # Iniciar aplicación
+    root.mainloop()
+    
+    if args.profile:
+        print(Profiler.report(), file=sys.stderr)
+        if app.watchdog:
+            print("\n" + app.watchdog.report(), file=sys.stderr)
+    if Profiler.last_capture:
+        print(f"Perfil guardado en {Profiler.last_capture}", file=sys.stderr)
+
+if __name__ == "__main__":
     main()
\ No newline at end of file
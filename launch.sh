@@ -1,3 +1,3 @@
 #!/bin/bash
 cd /opt/linux-file-explorer
-python3 file_explorer.py
\ No newline at end of file
+python3 file_explorer.py "$@"
\ No newline at end of file
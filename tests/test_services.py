@@ -0,0 +1,163 @@
+"""
+Pruebas de VolumeManager y WiFiManager con pactl/nmcli simulados
+
+Los servicios lanzan las herramientas por nombre, así que basta con poner
+en PATH unos scripts que imitan su salida y apuntan cada llamada en un
+registro.
+
+Uso:
+    python3 -m pytest tests
+    python3 -m unittest discover tests
+"""
+
+import os
+import stat
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from file_explorer import VolumeManager, WiFiManager  # noqa: E402
+
+PACTL = """#!/bin/sh
+echo "$*" >> "{log}"
+case "$1" in
+    get-sink-volume) echo "Volume: front-left: 27525 /  $(cat "{state}")% / -13.00 dB" ;;
+    get-sink-mute) echo "Mute: yes" ;;
+    set-sink-volume) echo "${{3%\\%}}" > "{state}" ;;
+    subscribe) exec sleep 30 ;;
+esac
+"""
+
+NMCLI = r"""#!/bin/sh
+echo "$*" >> "{log}"
+case "$*" in
+    *"device status"*)
+        printf '%s\n' 'lo:loopback:unmanaged:'
+        printf '%s\n' 'wlan0:wifi:connected:Casa\:5G'
+        ;;
+    *"wifi connect"*) ;;
+    *"wifi list"*)
+        printf '%s\n' ' :AA\:00\:00\:00\:00\:01:Casa\:5G:70:WPA2'
+        printf '%s\n' ' :AA\:00\:00\:00\:00\:02:Casa\:5G:45:WPA2'
+        printf '%s\n' '*:AA\:00\:00\:00\:00\:03:Oficina:55:WPA1 WPA2'
+        printf '%s\n' ' :AA\:00\:00\:00\:00\:04:Oficina:60:WPA1 WPA2'
+        printf '%s\n' ' :AA\:00\:00\:00\:00\:05:Libre:30:'
+        printf '%s\n' ' :AA\:00\:00\:00\:00\:06:Bar\\Cafe:20:--'
+        printf '%s\n' ' :AA\:00\:00\:00\:00\:07::50:WPA2'
+        printf '%s\n' ' :AA\:00\:00\:00\:00\:08::40:WPA2'
+        ;;
+    monitor) exec sleep 30 ;;
+esac
+"""
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return condition()
+
+class StubToolTest(unittest.TestCase):
+    """Crea los scripts simulados y los antepone en PATH"""
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.log = os.path.join(self.dir.name, 'calls.log')
+        self.state = os.path.join(self.dir.name, 'volume')
+        with open(self.state, 'w') as f:
+            f.write('42\n')
+        open(self.log, 'w').close()
+        self.write_tool('pactl', PACTL)
+        self.write_tool('nmcli', NMCLI)
+        self.path = os.environ.get('PATH', '')
+        os.environ['PATH'] = self.dir.name + os.pathsep + self.path
+
+    def tearDown(self):
+        os.environ['PATH'] = self.path
+        self.dir.cleanup()
+
+    def write_tool(self, name, template):
+        path = os.path.join(self.dir.name, name)
+        with open(path, 'w') as f:
+            f.write(template.format(log=self.log, state=self.state))
+        os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR)
+
+    def calls(self, prefix=''):
+        with open(self.log) as f:
+            return [line.strip() for line in f if line.startswith(prefix)]
+
+class VolumeManagerTest(StubToolTest):
+
+    def test_refresh_reads_volume_and_mute(self):
+        volume = VolumeManager()
+        notified = []
+        volume.add_listener(lambda: notified.append(True))
+        volume.refresh()
+        self.assertEqual(volume.get_volume(), 42)
+        self.assertTrue(volume.is_muted())
+        self.assertEqual(len(notified), 1)
+        volume.refresh()  # Sin cambios no se avisa otra vez
+        self.assertEqual(len(notified), 1)
+
+    def test_set_volume_coalesces_writes(self):
+        volume = VolumeManager()
+        volume.start()
+        try:
+            self.assertTrue(wait_until(lambda: self.calls('subscribe')))
+            for value in range(10, 61):
+                volume.set_volume(value)
+            self.assertTrue(wait_until(lambda: self.calls('set-sink-volume @DEFAULT_SINK@ 60%')))
+            time.sleep(2.0 / VolumeManager.MAX_RATE)
+            writes = self.calls('set-sink-volume')
+            self.assertLess(len(writes), 10)
+            self.assertEqual(writes[-1], 'set-sink-volume @DEFAULT_SINK@ 60%')
+            self.assertEqual(volume.get_volume(), 60)
+        finally:
+            volume.stop()
+
+class WiFiManagerTest(StubToolTest):
+
+    def test_refresh_reads_connection(self):
+        wifi = WiFiManager()
+        wifi.refresh()
+        self.assertEqual(wifi.get_current_connection(), 'Casa:5G')
+        self.assertEqual(wifi.device, 'wlan0')
+
+    def test_scan_networks_parses_terse_output(self):
+        wifi = WiFiManager()
+        networks = wifi.scan_networks()
+        by_ssid = {network['ssid']: network for network in networks if not network['hidden']}
+        self.assertEqual(set(by_ssid), {'Casa:5G', 'Oficina', 'Libre', 'Bar\\Cafe'})
+        self.assertEqual(networks[0]['ssid'], 'Oficina')  # La red en uso va primero
+        self.assertTrue(by_ssid['Oficina']['in_use'])  # Aunque otro punto de acceso sea más fuerte
+        self.assertEqual(by_ssid['Oficina']['signal'], 60)
+        self.assertEqual(by_ssid['Oficina']['security'], 'WPA1 WPA2')
+        self.assertEqual(by_ssid['Casa:5G']['signal'], 70)  # El punto de acceso más fuerte
+        self.assertEqual(by_ssid['Casa:5G']['bssid'], 'AA:00:00:00:00:01')
+        self.assertEqual(by_ssid['Libre']['security'], 'Abierta')
+        self.assertEqual(by_ssid['Bar\\Cafe']['security'], 'Abierta')
+
+    def test_hidden_networks_stay_separate(self):
+        wifi = WiFiManager()
+        hidden = [network for network in wifi.scan_networks() if network['hidden']]
+        self.assertEqual([network['bssid'] for network in hidden], ['AA:00:00:00:00:07', 'AA:00:00:00:00:08'])
+        self.assertTrue(all(network['ssid'] == '' for network in hidden))
+        wifi.connect_to_network('Escondida', 'secreto', hidden[0]['bssid'])
+        self.assertEqual(self.calls('device wifi connect')[-1],
+                         'device wifi connect Escondida password secreto bssid AA:00:00:00:00:07 hidden yes')
+
+    def test_scan_networks_reuses_recent_scan(self):
+        wifi = WiFiManager()
+        first = wifi.scan_networks()
+        self.assertIs(wifi.scan_networks(), first)
+        self.assertEqual(len(self.calls('-t -f IN-USE')), 1)
+        wifi.scan_networks(rescan=True)
+        self.assertEqual(len(self.calls('-t -f IN-USE')), 2)
+
+if __name__ == '__main__':
+    unittest.main()